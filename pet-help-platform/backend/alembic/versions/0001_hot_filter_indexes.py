@@ -0,0 +1,128 @@
+"""hot filter indexes and animal geohash
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created before migrations existed were built by
+Base.metadata.create_all, so every step checks what is already there.
+On Postgres the indexes are built CONCURRENTLY to avoid locking writes
+on large tables.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.geo import encode_geohash
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_animals_status_type_created_at", "animals", ["status", "type", "created_at"]),
+    ("ix_animals_status_id", "animals", ["status", "id"]),
+    ("ix_animals_created_at_id", "animals", ["created_at", "id"]),
+    ("ix_animals_owner_id", "animals", ["owner_id"]),
+    ("ix_swipes_user_created_at", "swipes", ["user_id", "created_at"]),
+    ("ix_swipes_user_match_created_at", "swipes", ["user_id", "is_match", "created_at"]),
+    ("ix_swipes_animal_id", "swipes", ["animal_id"]),
+    ("ix_donations_user_created_at", "donations", ["user_id", "created_at"]),
+    ("ix_donations_animal_status", "donations", ["animal_id", "status"]),
+    ("ix_donations_status_created_at", "donations", ["status", "created_at"]),
+    ("ix_donations_created_at_id", "donations", ["created_at", "id"]),
+    ("ix_shelters_active_created_at", "shelters", ["is_active", "created_at"]),
+    ("ix_shelter_requests_reporter_id", "shelter_requests", ["reporter_id"]),
+    ("ix_faqs_active_category_created_at", "faqs", ["is_active", "category", "created_at"]),
+    ("ix_users_created_at_id", "users", ["created_at", "id"]),
+]
+
+BACKFILL_BATCH = 5000
+
+def _is_postgres():
+    return op.get_bind().dialect.name == "postgresql"
+
+def _index_names(table):
+    inspector = sa.inspect(op.get_bind())
+    names = {index["name"] for index in inspector.get_indexes(table)}
+    names |= {constraint["name"] for constraint in inspector.get_unique_constraints(table)}
+    return names
+
+def _column_names(table):
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+def _create_index(name, table, columns, **kw):
+    if name in _index_names(table):
+        return
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+    else:
+        op.create_index(name, table, columns, **kw)
+
+def _backfill_geohash():
+    bind = op.get_bind()
+    animals = sa.table(
+        "animals",
+        sa.column("id", sa.Integer),
+        sa.column("latitude", sa.Float),
+        sa.column("longitude", sa.Float),
+        sa.column("geohash", sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(animals.c.id, animals.c.latitude, animals.c.longitude)
+            .where(
+                animals.c.id > last_id,
+                animals.c.geohash.is_(None),
+                animals.c.latitude.isnot(None),
+                animals.c.longitude.isnot(None),
+            )
+            .order_by(animals.c.id)
+            .limit(BACKFILL_BATCH)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            animals.update().where(animals.c.id == sa.bindparam("row_id")).values(geohash=sa.bindparam("value")),
+            [{"row_id": row.id, "value": encode_geohash(row.latitude, row.longitude)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+def upgrade():
+    if "geohash" not in _column_names("animals"):
+        op.add_column("animals", sa.Column("geohash", sa.String(12)))
+    _backfill_geohash()
+    _create_index(
+        "ix_animals_geohash", "animals", ["geohash"],
+        postgresql_ops={"geohash": "varchar_pattern_ops"}
+    )
+
+    for name, table, columns in INDEXES:
+        _create_index(name, table, columns)
+
+    if "uq_swipes_user_animal" not in _index_names("swipes"):
+        # The API never allowed duplicate swipes, but nothing enforced it.
+        op.execute(
+            "DELETE FROM swipes WHERE id NOT IN "
+            "(SELECT MIN(id) FROM swipes GROUP BY user_id, animal_id)"
+        )
+        _create_index("uq_swipes_user_animal", "swipes", ["user_id", "animal_id"], unique=True)
+        if _is_postgres():
+            op.execute(
+                "ALTER TABLE swipes ADD CONSTRAINT uq_swipes_user_animal "
+                "UNIQUE USING INDEX uq_swipes_user_animal"
+            )
+
+def downgrade():
+    if _is_postgres():
+        op.drop_constraint("uq_swipes_user_animal", "swipes", type_="unique")
+    else:
+        op.drop_index("uq_swipes_user_animal", table_name="swipes")
+
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+
+    op.drop_index("ix_animals_geohash", table_name="animals")
+    op.drop_column("animals", "geohash")
@@ -0,0 +1,71 @@
+"""points ledger and leaderboard index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+OPENING_BALANCE_SQL = (
+    "INSERT INTO points_ledger (user_id, delta, reason, created_at) "
+    "SELECT users.id, users.points - COALESCE(earned.total, 0), 'opening_balance', CURRENT_TIMESTAMP "
+    "FROM users LEFT JOIN ("
+    "    SELECT user_id, SUM(delta) AS total FROM points_ledger GROUP BY user_id"
+    ") earned ON earned.user_id = users.id "
+    "WHERE users.points <> COALESCE(earned.total, 0) "
+    "AND NOT EXISTS ("
+    "    SELECT 1 FROM points_ledger opening "
+    "    WHERE opening.user_id = users.id AND opening.reason = 'opening_balance'"
+    ")"
+)
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "points_ledger" not in inspector.get_table_names():
+        op.create_table(
+            "points_ledger",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("delta", sa.Integer(), nullable=False),
+            sa.Column("reason", sa.String(50), nullable=False),
+            sa.Column("reference_id", sa.Integer()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_points_ledger_id", "points_ledger", ["id"])
+        op.create_index("ix_points_ledger_user_created_at", "points_ledger", ["user_id", "created_at"])
+
+    # NULL balances sort first on Postgres and swallow awards (NULL + delta is NULL)
+    op.execute("UPDATE users SET points = 0 WHERE points IS NULL")
+    points_column = next(column for column in inspector.get_columns("users") if column["name"] == "points")
+    if points_column["nullable"]:
+        with op.batch_alter_table("users") as batch:
+            batch.alter_column(
+                "points", existing_type=sa.Integer(), nullable=False, server_default=sa.text("0")
+            )
+
+    # Points earned before the ledger existed become one opening entry per
+    # user, so the ledger always sums to users.points. The table may already
+    # exist (create_all at startup), so this runs every time and only fills
+    # users that have no opening entry and a balance the ledger lacks.
+    op.execute(OPENING_BALANCE_SQL)
+
+    if "ix_users_points_id" not in {index["name"] for index in sa.inspect(bind).get_indexes("users")}:
+        if bind.dialect.name == "postgresql":
+            with op.get_context().autocommit_block():
+                op.create_index("ix_users_points_id", "users", ["points", "id"], postgresql_concurrently=True)
+        else:
+            op.create_index("ix_users_points_id", "users", ["points", "id"])
+
+def downgrade():
+    op.drop_index("ix_users_points_id", table_name="users")
+    with op.batch_alter_table("users") as batch:
+        batch.alter_column("points", existing_type=sa.Integer(), nullable=True, server_default=None)
+    op.drop_table("points_ledger")
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""per-animal engagement counters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# Recount from swipes, the source of truth. An upsert rather than a plain
+# INSERT, because the table usually exists already: create_all at startup
+# makes it, and the swipe endpoints may have counted only recent swipes.
+BACKFILL_SQL = (
+    "INSERT INTO animal_engagement (animal_id, likes, super_likes, passes, matches, updated_at) "
+    "SELECT animal_id, "
+    "SUM(CASE WHEN direction = 'RIGHT' THEN 1 ELSE 0 END), "
+    "SUM(CASE WHEN direction = 'SUPER_LIKE' THEN 1 ELSE 0 END), "
+    "SUM(CASE WHEN direction = 'LEFT' THEN 1 ELSE 0 END), "
+    "SUM(CASE WHEN direction IN ('RIGHT', 'SUPER_LIKE') THEN 1 ELSE 0 END), "
+    "CURRENT_TIMESTAMP "
+    "FROM swipes GROUP BY animal_id "
+    "ON CONFLICT (animal_id) DO UPDATE SET "
+    "likes = excluded.likes, "
+    "super_likes = excluded.super_likes, "
+    "passes = excluded.passes, "
+    "matches = excluded.matches, "
+    "updated_at = excluded.updated_at"
+)
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "animal_engagement" not in inspector.get_table_names():
+        op.create_table(
+            "animal_engagement",
+            sa.Column("animal_id", sa.Integer(), sa.ForeignKey("animals.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("likes", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("super_likes", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("passes", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("matches", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+    if "ix_animal_engagement_matches" not in {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("animal_engagement")}:
+        op.create_index("ix_animal_engagement_matches", "animal_engagement", ["matches", "animal_id"])
+
+    # One last GROUP BY over swipes seeds the counters; from here on they are
+    # maintained incrementally by the swipe endpoints. Rerunning it is safe.
+    op.execute(BACKFILL_SQL)
+    op.execute(
+        "UPDATE animal_engagement SET likes = 0, super_likes = 0, passes = 0, matches = 0 "
+        "WHERE animal_id NOT IN (SELECT animal_id FROM swipes)"
+    )
+
+def downgrade():
+    op.drop_table("animal_engagement")
\ No newline at end of file
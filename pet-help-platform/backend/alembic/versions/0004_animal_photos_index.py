@@ -0,0 +1,30 @@
+"""animal_photos lookup index for primary thumbnails
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "ix_animal_photos_animal_primary" in {index["name"] for index in inspector.get_indexes("animal_photos")}:
+        return
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_animal_photos_animal_primary", "animal_photos", ["animal_id", "is_primary"],
+                postgresql_concurrently=True
+            )
+    else:
+        op.create_index("ix_animal_photos_animal_primary", "animal_photos", ["animal_id", "is_primary"])
+
+def downgrade():
+    op.drop_index("ix_animal_photos_animal_primary", table_name="animal_photos")
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""photo variants and processing status
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("animal_photos")}
+
+    if "variants" not in columns:
+        op.add_column("animal_photos", sa.Column("variants", sa.JSON()))
+    if "processing_status" not in columns:
+        op.add_column("animal_photos", sa.Column("processing_status", sa.String(20)))
+        # Photos uploaded before the pipeline already have their thumbnail
+        op.execute("UPDATE animal_photos SET processing_status = 'ready'")
+
+def downgrade():
+    with op.batch_alter_table("animal_photos") as batch:
+        batch.drop_column("processing_status")
+        batch.drop_column("variants")
\ No newline at end of file
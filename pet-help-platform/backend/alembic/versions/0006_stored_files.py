@@ -0,0 +1,34 @@
+"""content-addressed stored files
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if "stored_files" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    # Files uploaded before this revision keep their uuid names and have no
+    # row; deleting their only photo removes them as before.
+    op.create_table(
+        "stored_files",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("sha256", sa.String(64), nullable=False, unique=True),
+        sa.Column("url", sa.String(500), nullable=False, unique=True),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("analysis_data", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_stored_files_id", "stored_files", ["id"])
+
+def downgrade():
+    op.drop_table("stored_files")
\ No newline at end of file
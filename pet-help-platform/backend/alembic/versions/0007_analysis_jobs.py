@@ -0,0 +1,40 @@
+"""AI analysis job queue
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if "analysis_jobs" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("photo_id", sa.Integer(), sa.ForeignKey("animal_photos.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("animal_id", sa.Integer(), sa.ForeignKey("animals.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("photo_url", sa.String(500), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("locked_at", sa.DateTime()),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("analysis_id", sa.Integer(), sa.ForeignKey("animal_analyses.id", ondelete="SET NULL")),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_analysis_jobs_id", "analysis_jobs", ["id"])
+    op.create_index("ix_analysis_jobs_photo_id", "analysis_jobs", ["photo_id"])
+    op.create_index("ix_analysis_jobs_status_run_after", "analysis_jobs", ["status", "run_after"])
+
+def downgrade():
+    op.drop_table("analysis_jobs")
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""perceptual-hash cache of AI analyses
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if "analysis_cache" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "analysis_cache",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("dhash", sa.BigInteger(), nullable=False),
+        sa.Column("band0", sa.Integer(), nullable=False),
+        sa.Column("band1", sa.Integer(), nullable=False),
+        sa.Column("band2", sa.Integer(), nullable=False),
+        sa.Column("band3", sa.Integer(), nullable=False),
+        sa.Column("analysis_data", sa.JSON(), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("last_used_at", sa.DateTime()),
+    )
+    op.create_index("ix_analysis_cache_id", "analysis_cache", ["id"])
+    for column in ("band0", "band1", "band2", "band3", "created_at", "last_used_at"):
+        op.create_index(f"ix_analysis_cache_{column}", "analysis_cache", [column])
+
+def downgrade():
+    op.drop_table("analysis_cache")
\ No newline at end of file
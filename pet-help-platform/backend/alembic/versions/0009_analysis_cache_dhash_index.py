@@ -0,0 +1,27 @@
+"""analysis_cache index for exact perceptual-hash lookups
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "ix_analysis_cache_dhash" in {index["name"] for index in inspector.get_indexes("analysis_cache")}:
+        return
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index("ix_analysis_cache_dhash", "analysis_cache", ["dhash"], postgresql_concurrently=True)
+    else:
+        op.create_index("ix_analysis_cache_dhash", "analysis_cache", ["dhash"])
+
+def downgrade():
+    op.drop_index("ix_analysis_cache_dhash", table_name="analysis_cache")
\ No newline at end of file
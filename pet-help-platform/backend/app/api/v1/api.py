@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, animals, shelters, donations, swipes, faqs, upload
+from app.api.v1.endpoints import auth, users, animals, shelters, donations, swipes, faqs, upload, export, metrics
 
 api_router = APIRouter()
 
@@ -10,4 +10,6 @@ api_router.include_router(shelters.router, prefix="/shelters", tags=["shelters"]
 api_router.include_router(donations.router, prefix="/donations", tags=["donations"])
 api_router.include_router(swipes.router, prefix="/swipes", tags=["swipes"])
 api_router.include_router(faqs.router, prefix="/faqs", tags=["faqs"])
-api_router.include_router(upload.router, prefix="/upload", tags=["upload"])
\ No newline at end of file
+api_router.include_router(upload.router, prefix="/upload", tags=["upload"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
@@ -1,15 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from pathlib import Path
+import csv
+import hashlib
+import io
+import json
 
+from app.core.cache import animal_detail_cache
+from app.core.config import settings
 from app.core.database import get_db
-from app.models import Animal, AnimalPhoto, User, Swipe
+from app.core.http import etag_matches
+from app.core.pagination import paginate
+from app.models import Animal, AnimalEngagement, AnimalPhoto, User, Swipe
 from app.models.animal import AnimalType, AnimalStatus, AnimalSize
-from app.schemas import Animal as AnimalSchema, AnimalCreate, AnimalUpdate
+from app.schemas import Animal as AnimalSchema, AnimalCreate, AnimalUpdate, AnimalDetail
 from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.endpoints.upload import release_photos
+from app.services import content_store, geo
+from app.services.ai_service import match_lost_pets
+from app.services.feed_service import candidate_query, feed_service, FEED_STATUSES
+from app.services.ranking import build_profile, rank_candidates
+from app.services.lost_matching import animal_record, lost_pet_index
+from app.services.recommendations import recommender
 
 router = APIRouter()
 
+MAX_RADIUS_KM = 200
+
+# The response schema embeds photos and analyses; load them for a whole page
+# in two IN queries instead of two lazy loads per animal.
+MEDIA_OPTIONS = (selectinload(Animal.photos), selectinload(Animal.analyses))
+
+MOST_WANTED_SORTS = {
+    "matches": AnimalEngagement.matches,
+    "likes": AnimalEngagement.likes,
+    "super_likes": AnimalEngagement.super_likes,
+    "match_rate": AnimalEngagement.matches * 1.0 / (AnimalEngagement.matches + AnimalEngagement.passes),
+}
+
+def _parse_bbox(value: str) -> geo.BBox:
+    try:
+        return geo.parse_bbox(value)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid bbox: {e}"
+        )
+
+def _distance_cursor_error() -> HTTPException:
+    # Cursors encode (created_at, id); distance order has no such key
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="cursor is not supported with sort=distance; use skip"
+    )
+
 @router.post("/", response_model=AnimalSchema)
 def create_animal(
     animal_data: AnimalCreate,
@@ -24,19 +71,137 @@ def create_animal(
     db.add(new_animal)
     db.commit()
     db.refresh(new_animal)
+    lost_pet_index.sync(new_animal)
     return new_animal
 
+def _iter_import_rows(upload: UploadFile, fmt: str) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (row, error) pairs, reading the spooled upload one line at a time"""
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        try:
+            for row in csv.DictReader(text):
+                yield {key: (value if value != "" else None) for key, value in row.items() if key}, None
+        except (ValueError, csv.Error) as e:
+            yield None, f"Unreadable row, import stopped: {e}"
+    else:
+        while True:
+            try:
+                line = text.readline()
+            except ValueError as e:
+                yield None, f"Unreadable row, import stopped: {e}"
+                return
+            if not line:
+                return
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line), None
+            except ValueError as e:
+                yield None, f"Invalid JSON: {e}"
+
+def _import_format(upload: UploadFile, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    suffix = Path(upload.filename or "").suffix.lower()
+    if suffix == ".csv" or upload.content_type == "text/csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl") or upload.content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cannot detect import format, pass ?format=csv or ?format=ndjson"
+    )
+
+@router.post("/import")
+def import_animals(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    fmt = _import_format(file, format)
+    imported = 0
+    imported_lost = False
+    failed = 0
+    errors = []
+    batch = []
+    batch_rows = []
+
+    def report(row_number: int, detail):
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.IMPORT_MAX_ERRORS:
+            errors.append({"row": row_number, "errors": detail})
+
+    def flush():
+        nonlocal imported, imported_lost
+        if not batch:
+            return
+        try:
+            db.execute(insert(Animal), batch)
+            db.commit()
+            imported += len(batch)
+            imported_lost = imported_lost or any(values.get("status") == AnimalStatus.LOST for values in batch)
+        except Exception as e:
+            db.rollback()
+            for row_number in batch_rows:
+                report(row_number, [{"msg": f"Insert failed: {e.__class__.__name__}"}])
+        batch.clear()
+        batch_rows.clear()
+
+    for row_number, (raw, error) in enumerate(_iter_import_rows(file, fmt), start=1):
+        if error:
+            report(row_number, [{"msg": error}])
+            continue
+
+        try:
+            animal_data = AnimalCreate(**raw)
+        except ValidationError as e:
+            report(row_number, e.errors(include_url=False, include_context=False, include_input=False))
+            continue
+        except TypeError:
+            report(row_number, [{"msg": "Row must be a JSON object"}])
+            continue
+
+        values = animal_data.dict()
+        values["owner_id"] = current_user.id
+        values["geohash"] = geo.geohash_for(values.get("latitude"), values.get("longitude"))
+        batch.append(values)
+        batch_rows.append(row_number)
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            flush()
+
+    flush()
+    if imported_lost:
+        # Bulk inserts bypass the per-animal hooks
+        lost_pet_index.request_rebuild()
+
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors)
+    }
+
 @router.get("/", response_model=List[AnimalSchema])
 def get_animals(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     animal_type: Optional[AnimalType] = None,
     status: Optional[AnimalStatus] = None,
     size: Optional[AnimalSize] = None,
     location: Optional[str] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=MAX_RADIUS_KM),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    sort: Optional[str] = Query(None, pattern="^distance$"),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Animal)
+    query = db.query(Animal).options(*MEDIA_OPTIONS)
+    near = lat is not None and lng is not None
 
     if animal_type:
         query = query.filter(Animal.type == animal_type)
@@ -46,37 +211,159 @@ def get_animals(
         query = query.filter(Animal.size == size)
     if location:
         query = query.filter(Animal.location.ilike(f"%{location}%"))
+    if bbox:
+        query = query.filter(geo.bbox_filter(Animal, _parse_bbox(bbox)))
+
+    if not near:
+        return paginate(query, Animal, response, skip=skip, limit=limit, cursor=cursor)
 
-    animals = query.offset(skip).limit(limit).all()
+    # Radius search: the indexed geohash cells narrow the scan to the
+    # bounding box (two across the antimeridian); the exact great-circle distance is filtered, ordered
+    # and limited in SQL, so only the requested page is loaded.
+    query = query.filter(geo.radius_filter(Animal, lat, lng, radius_km))
+
+    if sort == "distance":
+        if cursor:
+            raise _distance_cursor_error()
+        distance = geo.distance_km_expr(Animal, lat, lng)
+        animals = query.order_by(distance, Animal.id).offset(skip).limit(limit).all()
+    else:
+        animals = paginate(query, Animal, response, skip=skip, limit=limit, cursor=cursor)
+
+    for animal in animals:
+        animal.distance_km = round(geo.haversine_km(lat, lng, animal.latitude, animal.longitude), 3)
     return animals
 
 @router.get("/feed", response_model=List[AnimalSchema])
 def get_animal_feed(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     limit: int = 10
 ):
-    swiped_animal_ids = db.query(Swipe.animal_id).filter(
-        Swipe.user_id == current_user.id
-    ).subquery()
+    animal_ids = feed_service.pop(current_user.id, limit)
+    if feed_service.needs_refill(current_user.id):
+        background_tasks.add_task(feed_service.refill, current_user.id)
+
+    if animal_ids is None:
+        # First page before the queue exists: rank the newest unswiped animals
+        swiped_animal_ids = db.query(Swipe.animal_id).filter(
+            Swipe.user_id == current_user.id
+        ).subquery()
+        candidates = candidate_query(db, current_user.id).filter(
+            Animal.id.notin_(swiped_animal_ids)
+        ).limit(settings.FEED_BATCH_SIZE).all()
+        animal_ids = rank_candidates(candidates, build_profile(db, current_user))[:limit]
+
+        animals = {animal.id: animal for animal in db.query(Animal).options(*MEDIA_OPTIONS).filter(
+            Animal.id.in_(animal_ids)
+        )}
+        return [animals[i] for i in animal_ids if i in animals]
+
+    if not animal_ids:
+        return []
+
+    # The queue may lag behind swipes made through another worker process
+    # or status changes, so recheck just the popped ids.
+    swiped = {row[0] for row in db.query(Swipe.animal_id).filter(
+        Swipe.user_id == current_user.id,
+        Swipe.animal_id.in_(animal_ids)
+    )}
+    animals = {animal.id: animal for animal in db.query(Animal).options(*MEDIA_OPTIONS).filter(
+        Animal.id.in_(animal_ids),
+        Animal.status.in_(FEED_STATUSES)
+    )}
+    return [animals[i] for i in animal_ids if i in animals and i not in swiped]
+
+@router.get("/recommended", response_model=List[AnimalSchema])
+def get_recommended_animals(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=50)
+):
+    # Over-fetch: left swipes, adopted animals and the user's own animals are
+    # not known to the model and get filtered below.
+    wanted = limit * 3
+    ranked = [i for i, _ in recommender.recommend(current_user.id, wanted)]
+    if len(ranked) < wanted:
+        ranked += [i for i, _ in recommender.popular(wanted - len(ranked), exclude=ranked + recommender.liked_items(current_user.id))]
+    if not ranked:
+        return []
 
-    animals = db.query(Animal).filter(
-        Animal.status.in_([AnimalStatus.AVAILABLE, AnimalStatus.IN_SHELTER]),
-        Animal.id.notin_(swiped_animal_ids),
+    swiped = {row[0] for row in db.query(Swipe.animal_id).filter(
+        Swipe.user_id == current_user.id,
+        Swipe.animal_id.in_(ranked)
+    )}
+    animals = {animal.id: animal for animal in db.query(Animal).options(*MEDIA_OPTIONS).filter(
+        Animal.id.in_(ranked),
+        Animal.status.in_(FEED_STATUSES),
         Animal.owner_id != current_user.id
-    ).limit(limit).all()
+    )}
+    return [animals[i] for i in ranked if i in animals and i not in swiped][:limit]
 
-    return animals
+@router.get("/most-wanted", response_model=List[AnimalDetail])
+def get_most_wanted_animals(
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    sort: str = Query("matches", pattern="^(matches|likes|super_likes|match_rate)$"),
+    min_swipes: int = Query(0, ge=0),
+    status: Optional[AnimalStatus] = None,
+    db: Session = Depends(get_db)
+):
+    # Reads the engagement rollup only; the swipes table is never scanned.
+    query = db.query(Animal).join(Animal.engagement).options(
+        contains_eager(Animal.engagement), *MEDIA_OPTIONS
+    ).filter(AnimalEngagement.matches + AnimalEngagement.passes >= max(min_swipes, 1))
+
+    if status:
+        query = query.filter(Animal.status == status)
+
+    return query.order_by(MOST_WANTED_SORTS[sort].desc(), Animal.id.desc()).offset(skip).limit(limit).all()
+
+def animal_etag(animal: Animal) -> str:
+    parts = [str(animal.id), animal.updated_at.isoformat() if animal.updated_at else ""]
+    if animal.engagement:
+        parts.append(f"e{animal.engagement.likes}:{animal.engagement.super_likes}:{animal.engagement.passes}")
+    parts += [f"p{p.id}:{int(bool(p.is_primary))}:{p.thumbnail_url or ''}:{p.processing_status or ''}" for p in sorted(animal.photos, key=lambda p: p.id)]
+    parts += [f"a{a.id}" for a in sorted(animal.analyses, key=lambda a: a.id)]
+    return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
 
-@router.get("/{animal_id}", response_model=AnimalSchema)
-def get_animal(animal_id: int, db: Session = Depends(get_db)):
+@router.get("/{animal_id}", response_model=AnimalDetail)
+def get_animal(animal_id: int, request: Request, db: Session = Depends(get_db)):
+    cached = animal_detail_cache.get(animal_id)
+    if cached is None:
+        token = animal_detail_cache.token()
+        animal = db.query(Animal).options(*MEDIA_OPTIONS, selectinload(Animal.engagement)).filter(Animal.id == animal_id).first()
+        if not animal:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Animal not found"
+            )
+        cached = (animal_etag(animal), AnimalDetail.model_validate(animal).model_dump_json().encode())
+        animal_detail_cache.set(animal_id, cached, token=token)
+
+    etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/{animal_id}/lost-matches")
+def get_lost_matches(
+    animal_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    min_score: float = Query(0.7, ge=0, le=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     animal = db.query(Animal).filter(Animal.id == animal_id).first()
     if not animal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Animal not found"
         )
-    return animal
+
+    return match_lost_pets(animal_record(animal), db, limit=limit, min_score=min_score)
 
 @router.put("/{animal_id}", response_model=AnimalSchema)
 def update_animal(
@@ -85,7 +372,7 @@ def update_animal(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    animal = db.query(Animal).options(*MEDIA_OPTIONS).filter(Animal.id == animal_id).first()
     if not animal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -102,7 +389,9 @@ def update_animal(
         setattr(animal, key, value)
 
     db.commit()
+    animal_detail_cache.invalidate(animal_id)
     db.refresh(animal)
+    lost_pet_index.sync(animal)
     return animal
 
 @router.delete("/{animal_id}")
@@ -124,8 +413,13 @@ def delete_animal(
             detail="Not authorized to delete this animal"
         )
 
+    # The photo rows go with the animal; their stored files need releasing
+    released = release_photos(db, animal.photos)
     db.delete(animal)
     db.commit()
+    content_store.purge(released)
+    animal_detail_cache.invalidate(animal_id)
+    lost_pet_index.remove(animal_id)
     return {"message": "Animal deleted successfully"}
 
 @router.get("/my/animals", response_model=List[AnimalSchema])
@@ -133,5 +427,5 @@ def get_my_animals(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    animals = db.query(Animal).filter(Animal.owner_id == current_user.id).all()
+    animals = db.query(Animal).options(*MEDIA_OPTIONS).filter(Animal.owner_id == current_user.id).all()
     return animals
\ No newline at end of file
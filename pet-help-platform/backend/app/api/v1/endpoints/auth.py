@@ -1,16 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from typing import Optional
+import time
 
+from app.core.cache import current_user_cache, token_claims_cache
 from app.core.database import get_db
-from app.core.security import create_access_token, verify_password, get_password_hash, decode_token
+from app.core.security import create_access_token, verify_and_update_password, get_password_hash, decode_token
 from app.models import User
 from app.schemas import UserCreate, UserLogin, Token, User as UserSchema
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+def _user_snapshot(user: User) -> User:
+    """Detached copy of the user's columns, safe to share between sessions"""
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def invalidate_current_user(user_id: int):
+    """Drop the cached snapshot after the user row changes (update, delete, deactivation)"""
+    current_user_cache.invalidate(user_id)
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -18,22 +30,33 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = decode_token(token)
+    payload = token_claims_cache.get(token)
     if payload is None:
+        payload = decode_token(token)
+        if payload is None:
+            raise credentials_exception
+        token_claims_cache.set(token, payload, ttl_seconds=payload.get("exp", 0) - time.time())
+
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
         raise credentials_exception
 
-    user_id: int = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    # Common path: attach the cached snapshot to this session without a query
+    snapshot = current_user_cache.get(user_id)
+    if snapshot is not None:
+        return db.merge(snapshot, load=False)
 
+    cache_token = current_user_cache.token()
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
 
+    current_user_cache.set(user_id, _user_snapshot(user), token=cache_token)
     return user
 
 @router.post("/register", response_model=Token)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     existing_user = db.query(User).filter(
         (User.email == user_data.email) | (User.username == user_data.username)
     ).first()
@@ -47,7 +70,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     new_user = User(
         email=user_data.email,
         username=user_data.username,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash(user_data.password),
         full_name=user_data.full_name,
         phone=user_data.phone,
         bio=user_data.bio,
@@ -67,10 +90,11 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     }
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == form_data.username).first()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = await verify_and_update_password(form_data.password, user.hashed_password) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -83,6 +107,13 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             detail="User account is deactivated"
         )
 
+    if new_hash:
+        # Stored hash uses an outdated BCRYPT_ROUNDS; upgrade it transparently
+        user.hashed_password = new_hash
+        db.commit()
+        db.refresh(user)
+        invalidate_current_user(user.id)
+
     access_token = create_access_token(data={"sub": user.id})
 
     return {
@@ -92,5 +123,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     }
 
 @router.get("/me", response_model=UserSchema)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    # Points change on every match without invalidating the cached snapshot
+    db.refresh(current_user)
     return current_user
\ No newline at end of file
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 import uuid
 
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models import Donation, Animal, User
 from app.models.donation import DonationStatus
 from app.schemas import Donation as DonationSchema, DonationCreate
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.points import award_points, points_entry, DONATION_POINTS_PER_UNIT
 
 router = APIRouter()
 
@@ -48,8 +51,10 @@ def create_donation(
 
 @router.get("/", response_model=List[DonationSchema])
 def get_donations(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[DonationStatus] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -64,8 +69,7 @@ def get_donations(
     if status:
         query = query.filter(Donation.status == status)
 
-    donations = query.offset(skip).limit(limit).all()
-    return donations
+    return paginate(query, Donation, response, skip=skip, limit=limit, cursor=cursor)
 
 @router.get("/my", response_model=List[DonationSchema])
 def get_my_donations(
@@ -111,17 +115,24 @@ def complete_donation(
             detail="Donation not found"
         )
 
-    if donation.status != DonationStatus.PENDING:
+    # Conditional update so two concurrent completions cannot both award points
+    completed = db.execute(
+        update(Donation).where(
+            Donation.id == donation_id,
+            Donation.status == DonationStatus.PENDING
+        ).values(status=DonationStatus.COMPLETED, completed_at=datetime.utcnow()),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+
+    if not completed:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Donation is not in pending status"
         )
 
-    donation.status = DonationStatus.COMPLETED
-    donation.completed_at = datetime.utcnow()
-
-    donor = db.query(User).filter(User.id == donation.user_id).first()
-    donor.points += int(donation.amount * 10)
+    award_points(db, [points_entry(
+        donation.user_id, int(donation.amount * DONATION_POINTS_PER_UNIT), "donation", donation.id
+    )])
 
     db.commit()
     db.refresh(donation)
@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
+from typing import Iterator, Optional
+from datetime import datetime
+import csv
+import enum
+import io
+import json
+
+from app.core.database import SessionLocal
+from app.models import Animal, Donation, ShelterRequest, User
+from app.api.v1.endpoints.auth import get_current_user
+
+router = APIRouter()
+
+EXPORT_CHUNK_ROWS = 1000
+
+# dataset -> (model, expression compared against ?updated_since=)
+EXPORTS = {
+    "animals": (Animal, Animal.updated_at),
+    "donations": (Donation, func.coalesce(Donation.completed_at, Donation.created_at)),
+    "shelter-requests": (
+        ShelterRequest,
+        func.coalesce(ShelterRequest.completed_at, ShelterRequest.responded_at, ShelterRequest.created_at)
+    ),
+}
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _stream_rows(model, changed_column, updated_since: Optional[datetime], fmt: str) -> Iterator[str]:
+    """Yield the table as NDJSON or CSV text in chunks of EXPORT_CHUNK_ROWS rows"""
+    columns = [column.key for column in model.__table__.columns]
+    db = SessionLocal()
+    try:
+        query = db.query(*[getattr(model, name) for name in columns])
+        if updated_since:
+            query = query.filter(changed_column >= updated_since)
+        # Server-side cursor: rows are fetched from the database as the
+        # client consumes them, so memory stays flat for any table size.
+        query = query.order_by(model.id).execution_options(stream_results=True).yield_per(EXPORT_CHUNK_ROWS)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+
+        count = 0
+        for row in query:
+            values = [_plain(value) for value in row]
+            if writer:
+                writer.writerow([json.dumps(v) if isinstance(v, (dict, list)) else v for v in values])
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                buffer.write("\n")
+
+            count += 1
+            if count % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    updated_since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to export data"
+        )
+
+    if dataset not in EXPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export. Available: {', '.join(EXPORTS)}"
+        )
+
+    model, changed_column = EXPORTS[dataset]
+    return StreamingResponse(
+        _stream_rows(model, changed_column, updated_since, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'}
+    )
\ No newline at end of file
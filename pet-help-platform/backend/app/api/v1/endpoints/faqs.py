@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models import FAQ, User
 from app.schemas import FAQ as FAQSchema, FAQCreate, FAQUpdate
 from app.api.v1.endpoints.auth import get_current_user
@@ -29,8 +30,10 @@ def create_faq(
 
 @router.get("/", response_model=List[FAQSchema])
 def get_faqs(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     category: Optional[str] = None,
     is_active: bool = True,
     db: Session = Depends(get_db)
@@ -40,8 +43,7 @@ def get_faqs(
     if category:
         query = query.filter(FAQ.category == category)
 
-    faqs = query.offset(skip).limit(limit).all()
-    return faqs
+    return paginate(query, FAQ, response, skip=skip, limit=limit, cursor=cursor)
 
 @router.get("/search", response_model=List[FAQSchema])
 def search_faqs(
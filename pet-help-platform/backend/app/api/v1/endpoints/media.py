@@ -0,0 +1,145 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+import mimetypes
+import os
+import stat
+
+from app.core.config import settings
+from app.core.http import FileRangeResponse, etag_matches, range_header_value, range_spec, resolve_range
+from app.services.storage import LocalStorage, S3Storage, get_storage, s3_error_code
+
+router = APIRouter()
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+def media_etag(key: str) -> str:
+    # Stored names are content hashes (variants add a size suffix), so the
+    # name alone is a strong validator and a 304 needs no storage lookup.
+    return '"' + key.rsplit("/", 1)[-1] + '"'
+
+def _not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="File not found"
+    )
+
+def _unsatisfiable(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail="Requested range not satisfiable",
+        headers={"Content-Range": f"bytes */{size}"}
+    )
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def serve_media(key: str, request: Request):
+    # Dot-files are upload staging files, never finished media
+    if not key or key.rsplit("/", 1)[-1].startswith("."):
+        raise _not_found()
+
+    etag = media_etag(key)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    spec = range_spec(request.headers.get("range"))
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range.strip() != etag:
+        spec = None
+
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    head_only = request.method == "HEAD"
+    storage = get_storage()
+    if isinstance(storage, S3Storage):
+        return _serve_s3(storage, key, spec, headers, media_type, head_only)
+    return _serve_local(storage, key, spec, headers, media_type, head_only)
+
+def _serve_local(
+    storage: LocalStorage,
+    key: str,
+    spec: Optional[Tuple[Optional[int], Optional[int]]],
+    headers: Dict[str, str],
+    media_type: str,
+    head_only: bool
+):
+    try:
+        path = storage.path(key)
+    except ValueError:
+        raise _not_found()
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        # nginx streams the file with sendfile and answers ranges itself
+        headers["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + key
+        return Response(headers=headers, media_type=media_type)
+
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        raise _not_found()
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise _not_found()
+
+    size = stat_result.st_size
+    start, end, status_code = 0, size - 1, status.HTTP_200_OK
+    if spec is not None:
+        try:
+            start, end = resolve_range(spec, size)
+        except ValueError:
+            raise _unsatisfiable(size)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+    headers["Last-Modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+
+    return FileRangeResponse(
+        str(path), start, end, status_code=status_code, headers=headers, media_type=media_type, send_header_only=head_only
+    )
+
+def _iter_body(body):
+    try:
+        yield from body.iter_chunks(STREAM_CHUNK_SIZE)
+    finally:
+        body.close()
+
+def _serve_s3(
+    storage: S3Storage,
+    key: str,
+    spec: Optional[Tuple[Optional[int], Optional[int]]],
+    headers: Dict[str, str],
+    media_type: str,
+    head_only: bool
+):
+    from botocore.exceptions import ClientError
+
+    if head_only:
+        meta = storage.head(key)
+        if meta is None:
+            raise _not_found()
+        headers["Content-Length"] = str(meta["ContentLength"])
+        return Response(headers=headers, media_type=media_type)
+
+    # The range is forwarded, so S3 only sends the requested bytes
+    try:
+        obj = storage.get_object(key, range_header_value(spec) if spec else None)
+    except ClientError as e:
+        if s3_error_code(e) != "InvalidRange":
+            raise
+        size = e.response.get("Error", {}).get("ActualObjectSize")
+        if size is None:
+            meta = storage.head(key)
+            size = meta["ContentLength"] if meta else 0
+        raise _unsatisfiable(int(size))
+    if obj is None:
+        raise _not_found()
+
+    headers["Content-Length"] = str(obj["ContentLength"])
+    status_code = status.HTTP_200_OK
+    if obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+
+    return StreamingResponse(_iter_body(obj["Body"]), status_code=status_code, headers=headers, media_type=media_type)
\ No newline at end of file
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.cache import animal_detail_cache, current_user_cache, token_claims_cache
+from app.core.security import password_hasher
+from app.models import User
+from app.services.analysis_cache import analysis_cache
+from app.services.analysis_queue import analysis_queue
+from app.services.image_pipeline import image_pipeline
+from app.services.lost_matching import lost_pet_index
+from app.services.recommendations import recommender
+from app.services.swipe_ingest import swipe_buffer
+from app.api.v1.endpoints.auth import get_current_user
+
+router = APIRouter()
+
+@router.get("/")
+def get_metrics(current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view metrics"
+        )
+
+    return {
+        "swipe_buffer": swipe_buffer.stats(),
+        "animal_detail_cache": animal_detail_cache.stats(),
+        "token_claims_cache": token_claims_cache.stats(),
+        "current_user_cache": current_user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "image_pipeline": image_pipeline.stats(),
+        "analysis_queue": analysis_queue.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "recommender": recommender.stats(),
+        "lost_pet_index": lost_pet_index.stats(),
+    }
\ No newline at end of file
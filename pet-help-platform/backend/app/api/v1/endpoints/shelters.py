@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models import Shelter, ShelterRequest, User, Animal
 from app.models.shelter import RequestStatus
 from app.schemas import (
@@ -44,8 +45,10 @@ def create_shelter(
 
 @router.get("/", response_model=List[ShelterSchema])
 def get_shelters(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     city: Optional[str] = None,
     is_active: bool = True,
     db: Session = Depends(get_db)
@@ -55,8 +58,7 @@ def get_shelters(
     if city:
         query = query.filter(Shelter.city.ilike(f"%{city}%"))
 
-    shelters = query.offset(skip).limit(limit).all()
-    return shelters
+    return paginate(query, Shelter, response, skip=skip, limit=limit, cursor=cursor)
 
 @router.get("/{shelter_id}", response_model=ShelterSchema)
 def get_shelter(shelter_id: int, db: Session = Depends(get_db)):
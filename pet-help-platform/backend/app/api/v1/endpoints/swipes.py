@@ -1,21 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session, contains_eager, noload
+from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.cache import animal_detail_cache
+from app.core.config import settings
+from app.core.database import get_db, insert_ignore_conflicts
+from app.core.pagination import paginate
 from app.models import Swipe, Animal, User
 from app.models.swipe import SwipeDirection
-from app.schemas import Swipe as SwipeSchema, SwipeCreate
+from app.schemas import Swipe as SwipeSchema, SwipeCreate, SwipeBatchResult, SwipeMatch
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.engagement import record_swipes
+from app.services.feed_service import feed_service
+from app.services.recommendations import recommender
+from app.services.points import award_points, points_entry, SWIPE_MATCH_POINTS
+from app.services.swipe_ingest import swipe_buffer
 
 router = APIRouter()
 
+MAX_SWIPE_BATCH = 500
+
 @router.post("/", response_model=SwipeSchema)
 def create_swipe(
     swipe_data: SwipeCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    if settings.SWIPE_INGESTION_MODE == "buffered":
+        if not swipe_buffer.submit(current_user.id, swipe_data.animal_id, swipe_data.direction):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Swipe ingestion is overloaded, retry later",
+                headers={"Retry-After": "1"}
+            )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"animal_id": swipe_data.animal_id, "direction": swipe_data.direction.value, "status": "accepted"}
+        )
+
     animal = db.query(Animal).filter(Animal.id == swipe_data.animal_id).first()
     if not animal:
         raise HTTPException(
@@ -44,36 +67,112 @@ def create_swipe(
     )
 
     db.add(new_swipe)
-
+    db.flush()
+    record_swipes(db, [(new_swipe.animal_id, new_swipe.direction)])
     if is_match:
-        current_user.points += 5
+        award_points(db, [points_entry(current_user.id, SWIPE_MATCH_POINTS, "swipe_match", new_swipe.id)])
 
     db.commit()
     db.refresh(new_swipe)
+    animal_detail_cache.invalidate(new_swipe.animal_id)
+    feed_service.mark_swiped(current_user.id, new_swipe.animal_id)
+    if is_match:
+        recommender.add_positive(current_user.id, new_swipe.animal_id)
     return new_swipe
 
-@router.get("/matches", response_model=List[SwipeSchema])
+@router.post("/batch", response_model=List[SwipeBatchResult])
+def create_swipes_batch(
+    swipes_data: List[SwipeCreate] = Body(..., max_length=MAX_SWIPE_BATCH),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    animal_ids = {swipe.animal_id for swipe in swipes_data}
+    existing_animals = {row[0] for row in db.query(Animal.id).filter(Animal.id.in_(animal_ids))}
+
+    # The first swipe per animal in the batch is the one written
+    rows = {}
+    for swipe_data in swipes_data:
+        if swipe_data.animal_id in existing_animals and swipe_data.animal_id not in rows:
+            rows[swipe_data.animal_id] = {
+                "user_id": current_user.id,
+                "animal_id": swipe_data.animal_id,
+                "direction": swipe_data.direction,
+                "is_match": swipe_data.direction in [SwipeDirection.RIGHT, SwipeDirection.SUPER_LIKE]
+            }
+
+    created = {}
+    if rows:
+        # Swipes already stored, e.g. by an overlapping retry, are skipped by the
+        # unique constraint instead of failing the batch; only returned rows are new
+        stmt = insert_ignore_conflicts(Swipe, ["user_id", "animal_id"]).returning(
+            Swipe.id, Swipe.user_id, Swipe.animal_id, Swipe.direction, Swipe.is_match, Swipe.created_at
+        )
+        created = {row.animal_id: SwipeSchema.model_validate(row) for row in db.execute(stmt, list(rows.values()))}
+        record_swipes(db, [(swipe.animal_id, swipe.direction) for swipe in created.values()])
+        award_points(db, [
+            points_entry(current_user.id, SWIPE_MATCH_POINTS, "swipe_match", swipe.id)
+            for swipe in created.values() if swipe.is_match
+        ])
+        db.commit()
+
+        for swipe in created.values():
+            animal_detail_cache.invalidate(swipe.animal_id)
+            feed_service.mark_swiped(current_user.id, swipe.animal_id)
+            if swipe.is_match:
+                recommender.add_positive(current_user.id, swipe.animal_id)
+
+    results = []
+    for swipe_data in swipes_data:
+        if swipe_data.animal_id not in existing_animals:
+            results.append({"animal_id": swipe_data.animal_id, "status": "not_found"})
+            continue
+        swipe = created.pop(swipe_data.animal_id, None)
+        if swipe is None:
+            results.append({"animal_id": swipe_data.animal_id, "status": "duplicate"})
+        else:
+            results.append({"animal_id": swipe_data.animal_id, "status": "created", "swipe": swipe})
+
+    return results
+
+@router.get("/matches", response_model=List[SwipeMatch])
 def get_matches(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    embed: Optional[str] = Query(None, pattern="^animal$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    matches = db.query(Swipe).filter(
+    query = db.query(Swipe).filter(
         Swipe.user_id == current_user.id,
         Swipe.is_match == True
-    ).all()
-    return matches
+    )
+
+    if embed == "animal":
+        # Summary columns and the thumbnail subquery come back in the same
+        # SELECT as the swipes, so a page of matches is a single query.
+        query = query.join(Swipe.animal).options(
+            contains_eager(Swipe.animal).load_only(
+                Animal.id, Animal.name, Animal.type, Animal.status, Animal.primary_thumbnail_url
+            )
+        )
+    else:
+        query = query.options(noload(Swipe.animal))
+
+    return paginate(query, Swipe, response, skip=skip, limit=limit, cursor=cursor)
 
 @router.get("/history", response_model=List[SwipeSchema])
 def get_swipe_history(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    swipes = db.query(Swipe).filter(
-        Swipe.user_id == current_user.id
-    ).order_by(Swipe.created_at.desc()).offset(skip).limit(limit).all()
-    return swipes
+    query = db.query(Swipe).filter(Swipe.user_id == current_user.id)
+    return paginate(query, Swipe, response, skip=skip, limit=limit, cursor=cursor)
 
 @router.delete("/{swipe_id}")
 def delete_swipe(
@@ -93,5 +192,10 @@ def delete_swipe(
         )
 
     db.delete(swipe)
+    record_swipes(db, [(swipe.animal_id, swipe.direction)], sign=-1)
     db.commit()
+    animal_detail_cache.invalidate(swipe.animal_id)
+    feed_service.forget_swipe(current_user.id, swipe.animal_id)
+    if swipe.is_match:
+        recommender.remove_positive(current_user.id, swipe.animal_id)
     return {"message": "Swipe deleted successfully"}
\ No newline at end of file
@@ -1,25 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
-import os
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
+import hashlib
 import uuid
 from pathlib import Path
-from PIL import Image
-import io
+import aiofiles
+import aiofiles.os
+from datetime import datetime
 
+from app.core.cache import animal_detail_cache
 from app.core.database import get_db
 from app.core.config import settings
-from app.models import User, Animal, AnimalPhoto
-from app.api.v1.endpoints.auth import get_current_user
-from app.services.ai_service import analyze_animal_photo
+from app.models import User, Animal, AnimalPhoto, AnalysisJob
+from app.models.analysis_job import AnalysisJobStatus
+from app.models.animal import PhotoProcessingStatus
+from app.schemas import AnalysisJob as AnalysisJobSchema
+from app.api.v1.endpoints.auth import get_current_user, invalidate_current_user
+from app.services import content_store
+from app.services.ai_service import record_analysis
+from app.services.analysis_queue import analysis_queue, enqueue_analysis
+from app.services.image_pipeline import image_pipeline
 
 router = APIRouter()
 
 UPLOAD_DIR = Path(settings.UPLOAD_DIR)
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-def save_upload_file(upload_file: UploadFile, subfolder: str = "animals") -> tuple[str, str]:
-    """Save uploaded file and return URLs"""
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes"
+    )
+
+async def _stream_to_disk(upload_file: UploadFile, partial_path: Path) -> tuple[str, int]:
+    """Copy the upload in UPLOAD_CHUNK_SIZE chunks, hashing as it goes; returns (sha256, size)"""
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        async with aiofiles.open(partial_path, "wb") as out:
+            while chunk := await upload_file.read(settings.UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > settings.MAX_UPLOAD_SIZE:
+                    raise _too_large()
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        if partial_path.exists():
+            await aiofiles.os.remove(partial_path)
+        raise
+    return digest.hexdigest(), written
+
+async def save_upload_file(upload_file: UploadFile, db: Session, subfolder: str = "animals") -> tuple[str, bool]:
+    """Store the upload under its content hash; returns (url, created).
+
+    Identical bytes map to the same file, so a repeat upload only adds a
+    reference. The caller commits the reference with the row that uses it.
+    """
     file_extension = Path(upload_file.filename).suffix.lower()
 
     if file_extension not in settings.ALLOWED_EXTENSIONS:
@@ -28,30 +65,36 @@ def save_upload_file(upload_file: UploadFile, subfolder: str = "animals") -> tup
             detail=f"File type {file_extension} not allowed"
         )
 
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-
     upload_path = UPLOAD_DIR / subfolder
     upload_path.mkdir(exist_ok=True)
 
-    file_path = upload_path / unique_filename
-    thumbnail_path = upload_path / f"thumb_{unique_filename}"
-
-    file_content = upload_file.file.read()
-
-    with open(file_path, "wb") as f:
-        f.write(file_content)
+    partial_path = upload_path / f".{uuid.uuid4()}.part"
+    sha256, size = await _stream_to_disk(upload_file, partial_path)
 
     try:
-        img = Image.open(io.BytesIO(file_content))
-        img.thumbnail((300, 300))
-        img.save(thumbnail_path)
-    except:
-        thumbnail_path = file_path
-
-    file_url = f"/uploads/{subfolder}/{unique_filename}"
-    thumbnail_url = f"/uploads/{subfolder}/thumb_{unique_filename}"
-
-    return file_url, thumbnail_url
+        # The upsert and the storage write (an S3 upload, possibly multipart) block
+        return await run_in_threadpool(
+            content_store.acquire, db, sha256, size, partial_path, subfolder, file_extension
+        )
+    except BaseException:
+        if partial_path.exists():
+            await aiofiles.os.remove(partial_path)
+        raise
+
+def _derived_urls(photo: AnimalPhoto) -> set:
+    urls = {photo.thumbnail_url} if photo.thumbnail_url else set()
+    for files in (photo.variants or {}).values():
+        urls.update(value for value in files.values() if isinstance(value, str))
+    return urls
+
+def release_photos(db: Session, photos: List[AnimalPhoto]) -> List[Optional[content_store.Released]]:
+    """Drop the photos' file references and analysis jobs; pass the result to purge() after commit"""
+    if not photos:
+        return []
+    db.query(AnalysisJob).filter(
+        AnalysisJob.photo_id.in_([photo.id for photo in photos])
+    ).delete(synchronize_session=False)
+    return [content_store.release(db, photo.url, _derived_urls(photo)) for photo in photos]
 
 @router.post("/animal/{animal_id}/photo")
 async def upload_animal_photo(
@@ -74,14 +117,13 @@ async def upload_animal_photo(
             detail="Not authorized to upload photos for this animal"
         )
 
-    if file.size > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes"
-        )
+    # Cheap early rejection when the size is known; the real limit is
+    # enforced while streaming, since file.size comes from the client.
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise _too_large()
 
     try:
-        file_url, thumbnail_url = save_upload_file(file)
+        file_url, created = await save_upload_file(file, db)
 
         if is_primary:
             db.query(AnimalPhoto).filter(
@@ -92,26 +134,59 @@ async def upload_animal_photo(
         photo = AnimalPhoto(
             animal_id=animal_id,
             url=file_url,
-            thumbnail_url=thumbnail_url,
             is_primary=is_primary
         )
 
+        # Same bytes uploaded before: reuse its variants instead of re-rendering
+        sibling = None if created else db.query(AnimalPhoto).filter(AnimalPhoto.url == file_url).first()
+        reuse = sibling is not None and sibling.processing_status != PhotoProcessingStatus.FAILED.value
+        if reuse:
+            photo.thumbnail_url = sibling.thumbnail_url
+            photo.variants = sibling.variants
+            photo.processing_status = sibling.processing_status
+
         db.add(photo)
         db.commit()
+        animal_detail_cache.invalidate(animal_id)
         db.refresh(photo)
 
-        try:
-            analysis = await analyze_animal_photo(file_url, animal_id, db)
-        except:
-            pass
+        if not reuse:
+            # Sizes and WebP copies are rendered in the background; the photo
+            # reports processing_status until its variants are recorded.
+            image_pipeline.submit(file_url)
+        elif photo.processing_status == PhotoProcessingStatus.PENDING.value:
+            # The sibling may have finished before this row was committed
+            db.refresh(sibling)
+            if sibling.processing_status != PhotoProcessingStatus.PENDING.value:
+                photo.thumbnail_url = sibling.thumbnail_url
+                photo.variants = sibling.variants
+                photo.processing_status = sibling.processing_status
+                db.commit()
+                animal_detail_cache.invalidate(animal_id)
+                db.refresh(photo)
+
+        cached_analysis = None if created else content_store.cached_analysis(db, file_url)
+        if cached_analysis:
+            record_analysis(db, animal_id, cached_analysis)
+            db.commit()
+            animal_detail_cache.invalidate(animal_id)
+        elif settings.OPENAI_API_KEY:
+            # Analysed by the background queue; see GET /upload/photo/{id}/analysis.
+            # Also for repeat bytes whose first analysis is pending or dead.
+            enqueue_analysis(db, photo)
+            db.commit()
+            analysis_queue.notify()
 
         return {
             "id": photo.id,
             "url": photo.url,
             "thumbnail_url": photo.thumbnail_url,
-            "is_primary": photo.is_primary
+            "is_primary": photo.is_primary,
+            "processing_status": photo.processing_status
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -124,20 +199,22 @@ async def upload_avatar(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    if file.size > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes"
-        )
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise _too_large()
 
     try:
-        file_url, _ = save_upload_file(file, subfolder="avatars")
+        # Avatar references are never released: avatar_url is also settable
+        # through PUT /users/me, so the old value may not be ours to drop.
+        file_url, _ = await save_upload_file(file, db, subfolder="avatars")
 
         current_user.avatar_url = file_url
         db.commit()
+        invalidate_current_user(current_user.id)
 
         return {"avatar_url": file_url}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -164,19 +241,69 @@ def delete_animal_photo(
             detail="Not authorized to delete this photo"
         )
 
-    try:
-        file_path = Path(photo.url.replace("/uploads/", str(UPLOAD_DIR) + "/"))
-        if file_path.exists():
-            os.remove(file_path)
-
-        if photo.thumbnail_url:
-            thumb_path = Path(photo.thumbnail_url.replace("/uploads/", str(UPLOAD_DIR) + "/"))
-            if thumb_path.exists():
-                os.remove(thumb_path)
-    except:
-        pass
-
+    # Files are only removed when no other photo or avatar references them,
+    # and only after the commit, so a failed delete leaves them in place
+    released = release_photos(db, [photo])
     db.delete(photo)
     db.commit()
+    content_store.purge(released)
+    animal_detail_cache.invalidate(photo.animal_id)
+
+    return {"message": "Photo deleted successfully"}
+
+def _photo_for_owner(db: Session, photo_id: int, current_user: User) -> AnimalPhoto:
+    photo = db.query(AnimalPhoto).filter(AnimalPhoto.id == photo_id).first()
+    if not photo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Photo not found"
+        )
 
-    return {"message": "Photo deleted successfully"}
\ No newline at end of file
+    animal = db.query(Animal).filter(Animal.id == photo.animal_id).first()
+    if animal.owner_id != current_user.id and current_user.role not in ["admin", "shelter_admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this photo's analysis"
+        )
+    return photo
+
+def _latest_job(db: Session, photo_id: int) -> AnalysisJob:
+    job = db.query(AnalysisJob).filter(AnalysisJob.photo_id == photo_id).order_by(AnalysisJob.id.desc()).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No analysis job for this photo"
+        )
+    return job
+
+@router.get("/photo/{photo_id}/analysis", response_model=AnalysisJobSchema)
+def get_photo_analysis_status(
+    photo_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _photo_for_owner(db, photo_id, current_user)
+    return _latest_job(db, photo_id)
+
+@router.post("/photo/{photo_id}/analysis/retry", response_model=AnalysisJobSchema)
+def retry_photo_analysis(
+    photo_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    _photo_for_owner(db, photo_id, current_user)
+    job = _latest_job(db, photo_id)
+    if job.status != AnalysisJobStatus.DEAD.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only dead-lettered analysis jobs can be retried"
+        )
+
+    job.status = AnalysisJobStatus.QUEUED.value
+    job.attempts = 0
+    job.run_after = datetime.utcnow()
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+    analysis_queue.notify()
+    return job
\ No newline at end of file
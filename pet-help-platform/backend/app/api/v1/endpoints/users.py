@@ -1,23 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.core.database import get_db
+from app.core.pagination import paginate
 from app.models import User
-from app.schemas import User as UserSchema, UserUpdate
-from app.api.v1.endpoints.auth import get_current_user
+from app.schemas import User as UserSchema, UserUpdate, LeaderboardEntry
+from app.api.v1.endpoints.auth import get_current_user, invalidate_current_user
 
 router = APIRouter()
 
 @router.get("/", response_model=List[UserSchema])
 def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    return paginate(db.query(User), User, response, skip=skip, limit=limit, cursor=cursor)
+
+@router.get("/leaderboard", response_model=List[LeaderboardEntry])
+def get_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    # Walks ix_users_points_id from the top instead of sorting the users table
+    rows = db.query(User.id, User.username, User.avatar_url, User.points).filter(
+        User.is_active == True
+    ).order_by(User.points.desc(), User.id.desc()).limit(limit).all()
+
+    return [
+        {"rank": rank, "user_id": user_id, "username": username, "avatar_url": avatar_url, "points": points or 0}
+        for rank, (user_id, username, avatar_url, points) in enumerate(rows, start=1)
+    ]
 
 @router.get("/{user_id}", response_model=UserSchema)
 def get_user(user_id: int, db: Session = Depends(get_db)):
@@ -49,6 +66,7 @@ def update_current_user(
         current_user.preferences = user_update.preferences
 
     db.commit()
+    invalidate_current_user(current_user.id)
     db.refresh(current_user)
     return current_user
 
@@ -57,6 +75,8 @@ def delete_current_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    user_id = current_user.id
     db.delete(current_user)
     db.commit()
+    invalidate_current_user(user_id)
     return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .config import settings
+
+class LRUCache:
+    """Bounded, thread-safe LRU mapping.
+
+    Readers that fill the cache from the database take a token() first and
+    pass it to set(); if any key was invalidated in between, the possibly
+    stale value is dropped instead of cached.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def token(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def set(self, key: Hashable, value: Any, token: Optional[int] = None):
+        with self._lock:
+            if token is not None and token != self._generation:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+class TTLCache(LRUCache):
+    """LRUCache whose entries also expire ttl_seconds after they were set"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        super().__init__(maxsize)
+        self.ttl_seconds = ttl_seconds
+        self.expired = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = super().get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            with self._lock:
+                self.hits -= 1
+                self.misses += 1
+                self.expired += 1
+                if self._data.get(key) is entry:
+                    del self._data[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any, token: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        super().set(key, (time.monotonic() + ttl, value), token=token)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            stats.update(ttl_seconds=self.ttl_seconds, expired=self.expired)
+        return stats
+
+# Serialized GET /animals/{id} bodies keyed by animal id: (etag, body bytes)
+animal_detail_cache = LRUCache(maxsize=settings.ANIMAL_DETAIL_CACHE_SIZE)
+
+# Verified JWT claims keyed by the raw token, never kept past the token's exp
+token_claims_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS)
+
+# Detached User snapshots keyed by user id, for get_current_user
+current_user_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS)
\ No newline at end of file
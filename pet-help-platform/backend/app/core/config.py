@@ -15,14 +15,50 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
 
+    # Changing the cost rehashes each user's password on their next login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    # Hashes queued or running before logins get 503; about 8 per worker keeps
+    # the wait near 2 s at cost 12. Waiting requests hold no thread.
+    PASSWORD_HASH_MAX_PENDING: int = int(
+        os.getenv("PASSWORD_HASH_MAX_PENDING", str(8 * max(PASSWORD_HASH_WORKERS, 1)))
+    )
+
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
 
     AWS_ACCESS_KEY_ID: Optional[str] = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY: Optional[str] = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
     S3_BUCKET_NAME: Optional[str] = os.getenv("S3_BUCKET_NAME")
+    # Set for S3-compatible services (MinIO, moto server); None means AWS
+    S3_ENDPOINT_URL: Optional[str] = os.getenv("S3_ENDPOINT_URL")
+    S3_KEY_PREFIX: str = os.getenv("S3_KEY_PREFIX", "")
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024
+    S3_MULTIPART_CHUNKSIZE: int = 8 * 1024 * 1024
+    S3_MAX_CONCURRENCY: int = 10
+
+    # "local" keeps media in UPLOAD_DIR, "s3" shares it between API replicas
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
 
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+    # Any OpenAI-compatible chat completions server
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    AI_VISION_MODEL: str = os.getenv("AI_VISION_MODEL", "gpt-4-vision-preview")
+    AI_ANALYSIS_CONCURRENCY: int = int(os.getenv("AI_ANALYSIS_CONCURRENCY", "4"))
+    AI_ANALYSIS_TIMEOUT_SECONDS: float = 60.0
+    AI_ANALYSIS_MAX_ATTEMPTS: int = 5
+    AI_ANALYSIS_BACKOFF_SECONDS: float = 2.0
+    AI_ANALYSIS_MAX_BACKOFF_SECONDS: float = 300.0
+    # Idle workers look for retries and other replicas' jobs this often
+    AI_ANALYSIS_POLL_SECONDS: float = 5.0
+    # A running job not finished within this window is assumed lost and reclaimed
+    AI_ANALYSIS_VISIBILITY_SECONDS: int = 300
+    # Near-duplicate photos (dHash within this Hamming distance, at most 3)
+    # reuse a cached analysis instead of calling the model; -1 disables the cache
+    AI_CACHE_MAX_DISTANCE: int = int(os.getenv("AI_CACHE_MAX_DISTANCE", "3"))
+    AI_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    AI_CACHE_MAX_ENTRIES: int = 100000
 
     STRIPE_SECRET_KEY: Optional[str] = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_WEBHOOK_SECRET: Optional[str] = os.getenv("STRIPE_WEBHOOK_SECRET")
@@ -32,8 +68,48 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = os.getenv("SMTP_USER")
     SMTP_PASSWORD: Optional[str] = os.getenv("SMTP_PASSWORD")
 
+    FEED_BATCH_SIZE: int = 200
+    # Newest unswiped animals ranked per refill; the best FEED_BATCH_SIZE are queued
+    FEED_CANDIDATE_POOL: int = 1000
+    FEED_LOW_WATERMARK: int = 20
+    FEED_MAX_USERS: int = 10000
+
+    ANIMAL_DETAIL_CACHE_SIZE: int = 10000
+
+    # get_current_user caches; the TTL bounds staleness across worker processes
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 30
+
+    RECOMMENDER_REBUILD_SECONDS: int = 3600
+
+    # Lost/found matching: reports further apart than this get no location credit
+    LOST_MATCH_RADIUS_KM: float = 25.0
+    LOST_MATCH_MAX_CANDIDATES: int = 20000
+    # Until the index is built, only this many recent lost reports are scored
+    LOST_MATCH_COLD_CANDIDATES: int = 2000
+    LOST_PET_INDEX_REBUILD_SECONDS: int = 900
+
+    # "sync" writes each swipe in its request, "buffered" uses the write-behind buffer
+    SWIPE_INGESTION_MODE: str = os.getenv("SWIPE_INGESTION_MODE", "sync")
+    SWIPE_BUFFER_MAX_ROWS: int = 1000
+    SWIPE_BUFFER_FLUSH_MS: int = 50
+    SWIPE_BUFFER_MAX_PENDING: int = 100000
+    # A batch that fails to flush is retried with backoff up to this many times
+    SWIPE_BUFFER_MAX_ATTEMPTS: int = 5
+    SWIPE_BUFFER_MAX_BACKOFF_MS: int = 5000
+
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_ERRORS: int = 1000
+
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    # Stored media is named by content hash and never rewritten
+    MEDIA_CACHE_MAX_AGE: int = 365 * 24 * 3600
+    # When set (e.g. "/_media/"), local files are handed to an nginx internal
+    # location via X-Accel-Redirect so nginx streams them with sendfile
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX")
+    IMAGE_PIPELINE_WORKERS: int = int(os.getenv("IMAGE_PIPELINE_WORKERS", "2"))
     ALLOWED_EXTENSIONS: set = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 
     class Config:
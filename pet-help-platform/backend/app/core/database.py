@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+import math
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -9,6 +11,41 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+SQLITE_MATH_FUNCTIONS = {
+    "radians": (1, math.radians),
+    "sin": (1, math.sin),
+    "cos": (1, math.cos),
+    "asin": (1, math.asin),
+    "sqrt": (1, math.sqrt),
+    "power": (2, math.pow),
+}
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _register_math_functions(dbapi_connection, connection_record):
+        # SQLite builds without SQLITE_ENABLE_MATH_FUNCTIONS lack these (used by radius search)
+        try:
+            dbapi_connection.execute("SELECT sin(0)")
+            return
+        except Exception:
+            pass
+        for name, (arity, fn) in SQLITE_MATH_FUNCTIONS.items():
+            dbapi_connection.create_function(
+                name, arity, lambda *args, fn=fn: None if None in args else fn(*args), deterministic=True
+            )
+
+def dialect_insert(model):
+    """INSERT supporting ON CONFLICT clauses (Postgres, or SQLite for local runs)"""
+    if engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
+
+def insert_ignore_conflicts(model, conflict_columns):
+    """INSERT ... ON CONFLICT DO NOTHING"""
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=conflict_columns)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,103 @@
+import os
+import re
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def range_spec(range_header: Optional[str]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """(first, last) of a single byte range; None when absent or to be ignored.
+
+    Multi-range and malformed headers are ignored, which RFC 9110 allows:
+    the client then simply gets the whole representation.
+    """
+    match = RANGE_PATTERN.match(range_header.strip()) if range_header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first = int(match.group(1)) if match.group(1) else None
+    last = int(match.group(2)) if match.group(2) else None
+    if first is not None and last is not None and last < first:
+        return None
+    return first, last
+
+def resolve_range(spec: Tuple[Optional[int], Optional[int]], size: int) -> Tuple[int, int]:
+    """Inclusive (start, end) within size; ValueError when unsatisfiable"""
+    first, last = spec
+    if first is None:
+        if last == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - last, 0), size - 1
+    if first >= size:
+        raise ValueError("Unsatisfiable range")
+    return first, size - 1 if last is None else min(last, size - 1)
+
+def range_header_value(spec: Tuple[Optional[int], Optional[int]]) -> str:
+    first, last = spec
+    return f"bytes={'' if first is None else first}-{'' if last is None else last}"
+
+class FileRangeResponse(Response):
+    """Sends bytes start..end (inclusive) of a local file.
+
+    When the server offers the zerocopysend extension the kernel copies the
+    file straight to the socket (sendfile); otherwise it is read in chunks
+    off the event loop. Behind nginx, prefer X-Accel-Redirect instead.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        send_header_only: bool = False
+    ):
+        self.path = path
+        self.start = start
+        self.count = end - start + 1
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.send_header_only = send_header_only
+        self.init_headers({**(headers or {}), "content-length": str(self.count)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        with open(self.path, "rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.count,
+                    "more_body": False
+                })
+                return
+
+            offset, remaining = self.start, self.count
+            while remaining:
+                chunk = await anyio.to_thread.run_sync(os.pread, file.fileno(), min(self.chunk_size, remaining), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining:
+                # The file shrank underneath us; end the body rather than hang
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
\ No newline at end of file
@@ -0,0 +1,54 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def paginate(
+    query,
+    model,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> list:
+    """Page through newest-first rows by (created_at, id).
+
+    With a cursor the page is located by a keyset seek, so deep pages cost the
+    same as the first one; without one the legacy skip/offset is applied. The
+    cursor for the following page is returned in the X-Next-Cursor header.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, item_id))
+    elif skip:
+        query = query.offset(skip)
+
+    items = query.limit(limit).all()
+
+    if items and len(items) == limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
+    return items
\ No newline at end of file
@@ -1,11 +1,115 @@
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import threading
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min == max == rounds, so hashes with any other cost count as outdated
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+# Starlette's request threadpool has 40 threads; inline hashing must leave most for requests
+INLINE_MAX_PENDING = 16
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool.
+
+    bcrypt is deliberately slow CPU work; in worker processes it neither holds
+    the GIL nor occupies more than `workers` cores. Callers await the result,
+    so a waiting login holds no request thread either. At most max_pending
+    calls may be queued or running; beyond that callers get 503 instead of
+    waiting indefinitely. With workers=0 hashing runs in the request
+    threadpool, and max_pending is capped below that pool's size.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending if workers else min(max_pending, INLINE_MAX_PENDING)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many authentication requests, retry later",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+            if self._executor is None and self.workers:
+                # spawn: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            executor = self._executor
+
+        try:
+            if executor is None:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.wrap_future(executor.submit(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(_verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            "queue_depth": max(pending - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        }
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -17,11 +121,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify, and return a new hash when the stored one uses an outdated cost"""
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
 
 def decode_token(token: str) -> Optional[dict]:
     try:
@@ -5,6 +5,11 @@ from .shelter import Shelter, ShelterRequest
 from .donation import Donation
 from .swipe import Swipe
 from .faq import FAQ
+from .points import PointsLedgerEntry
+from .engagement import AnimalEngagement
+from .stored_file import StoredFile
+from .analysis_job import AnalysisJob
+from .analysis_cache import AnalysisCacheEntry
 
 __all__ = [
     "Base",
@@ -16,5 +21,10 @@ __all__ = [
     "ShelterRequest",
     "Donation",
     "Swipe",
-    "FAQ"
+    "FAQ",
+    "PointsLedgerEntry",
+    "AnimalEngagement",
+    "StoredFile",
+    "AnalysisJob",
+    "AnalysisCacheEntry"
 ]
\ No newline at end of file
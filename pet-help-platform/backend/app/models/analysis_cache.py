@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, JSON
+from datetime import datetime
+
+from app.core.database import Base
+
+# AI analysis keyed by a 64-bit perceptual hash (dHash) of the photo. The hash
+# is also stored as four 16-bit bands: two hashes within Hamming distance 3
+# share at least one band, so near-duplicates are found by exact band lookups.
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    dhash = Column(BigInteger, nullable=False, index=True)
+    band0 = Column(Integer, nullable=False, index=True)
+    band1 = Column(Integer, nullable=False, index=True)
+    band2 = Column(Integer, nullable=False, index=True)
+    band3 = Column(Integer, nullable=False, index=True)
+    analysis_data = Column(JSON, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
\ No newline at end of file
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import enum
+
+from app.core.database import Base
+
+class AnalysisJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    # Retries exhausted or a permanent error; kept for inspection and requeue
+    DEAD = "dead"
+
+# One AI analysis of an uploaded photo, processed by the analysis queue
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    photo_id = Column(Integer, ForeignKey("animal_photos.id", ondelete="CASCADE"), nullable=False, index=True)
+    animal_id = Column(Integer, ForeignKey("animals.id", ondelete="CASCADE"), nullable=False)
+    photo_url = Column(String(500), nullable=False)
+    status = Column(String(20), nullable=False, default=AnalysisJobStatus.QUEUED.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # Earliest time of the next attempt; pushed back by the retry backoff
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    analysis_id = Column(Integer, ForeignKey("animal_analyses.id", ondelete="SET NULL"))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    analysis = relationship("AnimalAnalysis")
\ No newline at end of file
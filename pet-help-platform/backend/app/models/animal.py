@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, Float, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, Float, ForeignKey, JSON, Index, event, select, func
+from sqlalchemy.orm import relationship, column_property
 from datetime import datetime
 import enum
 
 from app.core.database import Base
+from app.services.geo import geohash_for
 
 class AnimalType(str, enum.Enum):
     DOG = "dog"
@@ -25,8 +26,20 @@ class AnimalSize(str, enum.Enum):
     MEDIUM = "medium"
     LARGE = "large"
 
+class PhotoProcessingStatus(str, enum.Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
 class Animal(Base):
     __tablename__ = "animals"
+    __table_args__ = (
+        Index("ix_animals_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+        Index("ix_animals_status_type_created_at", "status", "type", "created_at"),
+        Index("ix_animals_status_id", "status", "id"),
+        Index("ix_animals_created_at_id", "created_at", "id"),
+        Index("ix_animals_owner_id", "owner_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100))
@@ -46,6 +59,7 @@ class Animal(Base):
     location = Column(String(200))
     latitude = Column(Float)
     longitude = Column(Float)
+    geohash = Column(String(12))
 
     owner_id = Column(Integer, ForeignKey("users.id"))
     shelter_id = Column(Integer, ForeignKey("shelters.id"))
@@ -67,19 +81,43 @@ class Animal(Base):
     swipes = relationship("Swipe", back_populates="animal", cascade="all, delete-orphan")
     donations = relationship("Donation", back_populates="animal", cascade="all, delete-orphan")
     shelter_requests = relationship("ShelterRequest", back_populates="animal", cascade="all, delete-orphan")
+    engagement = relationship("AnimalEngagement", back_populates="animal", uselist=False, cascade="all, delete-orphan")
+
+@event.listens_for(Animal, "before_insert")
+@event.listens_for(Animal, "before_update")
+def _sync_geohash(mapper, connection, target):
+    target.geohash = geohash_for(target.latitude, target.longitude)
 
 class AnimalPhoto(Base):
     __tablename__ = "animal_photos"
+    __table_args__ = (
+        Index("ix_animal_photos_animal_primary", "animal_id", "is_primary"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     animal_id = Column(Integer, ForeignKey("animals.id"), nullable=False)
     url = Column(String(500), nullable=False)
     thumbnail_url = Column(String(500))
+    # {"thumb": {"width", "height", "jpeg" | "png", "webp"}, "medium": ..., "large": ...}
+    variants = Column(JSON)
+    processing_status = Column(String(20), default=PhotoProcessingStatus.PENDING.value)
     is_primary = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     animal = relationship("Animal", back_populates="photos")
 
+# Primary photo's thumbnail (else the first photo's) as one correlated
+# subquery, so list views can show it without loading Animal.photos.
+Animal.primary_thumbnail_url = column_property(
+    select(func.coalesce(AnimalPhoto.thumbnail_url, AnimalPhoto.url))
+    .where(AnimalPhoto.animal_id == Animal.id)
+    .order_by(AnimalPhoto.is_primary.desc(), AnimalPhoto.id)
+    .limit(1)
+    .correlate_except(AnimalPhoto)
+    .scalar_subquery(),
+    deferred=True
+)
+
 class AnimalAnalysis(Base):
     __tablename__ = "animal_analyses"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -13,6 +13,12 @@ class DonationStatus(str, enum.Enum):
 
 class Donation(Base):
     __tablename__ = "donations"
+    __table_args__ = (
+        Index("ix_donations_user_created_at", "user_id", "created_at"),
+        Index("ix_donations_animal_status", "animal_id", "status"),
+        Index("ix_donations_status_created_at", "status", "created_at"),
+        Index("ix_donations_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.core.database import Base
+
+class AnimalEngagement(Base):
+    __tablename__ = "animal_engagement"
+    __table_args__ = (
+        Index("ix_animal_engagement_matches", "matches", "animal_id"),
+    )
+
+    animal_id = Column(Integer, ForeignKey("animals.id", ondelete="CASCADE"), primary_key=True)
+    likes = Column(Integer, nullable=False, default=0)
+    super_likes = Column(Integer, nullable=False, default=0)
+    passes = Column(Integer, nullable=False, default=0)
+    # likes + super_likes, kept as a column so "most wanted" can use an index
+    matches = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    animal = relationship("Animal", back_populates="engagement")
+
+    @property
+    def total_swipes(self) -> int:
+        return self.matches + self.passes
+
+    @property
+    def match_rate(self) -> float:
+        return self.matches / self.total_swipes if self.total_swipes else 0.0
\ No newline at end of file
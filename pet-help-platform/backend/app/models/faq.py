@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Index
 from datetime import datetime
 
 from app.core.database import Base
 
 class FAQ(Base):
     __tablename__ = "faqs"
+    __table_args__ = (
+        Index("ix_faqs_active_category_created_at", "is_active", "category", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     question = Column(Text, nullable=False)
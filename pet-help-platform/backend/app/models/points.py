@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+
+from app.core.database import Base
+
+class PointsLedgerEntry(Base):
+    __tablename__ = "points_ledger"
+    __table_args__ = (
+        Index("ix_points_ledger_user_created_at", "user_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    delta = Column(Integer, nullable=False)
+    reason = Column(String(50), nullable=False)
+    reference_id = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -14,6 +14,9 @@ class RequestStatus(str, enum.Enum):
 
 class Shelter(Base):
     __tablename__ = "shelters"
+    __table_args__ = (
+        Index("ix_shelters_active_created_at", "is_active", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
@@ -41,6 +44,9 @@ class Shelter(Base):
 
 class ShelterRequest(Base):
     __tablename__ = "shelter_requests"
+    __table_args__ = (
+        Index("ix_shelter_requests_reporter_id", "reporter_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     shelter_id = Column(Integer, ForeignKey("shelters.id"), nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON
+from datetime import datetime
+
+from app.core.database import Base
+
+# One row per unique upload content; photos and avatars reference it by url
+class StoredFile(Base):
+    __tablename__ = "stored_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    url = Column(String(500), unique=True, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)
+    # AI analysis of this content, reused when the same photo is uploaded again
+    analysis_data = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
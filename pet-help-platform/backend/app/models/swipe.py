@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -12,6 +12,12 @@ class SwipeDirection(str, enum.Enum):
 
 class Swipe(Base):
     __tablename__ = "swipes"
+    __table_args__ = (
+        UniqueConstraint("user_id", "animal_id", name="uq_swipes_user_animal"),
+        Index("ix_swipes_user_created_at", "user_id", "created_at"),
+        Index("ix_swipes_user_match_created_at", "user_id", "is_match", "created_at"),
+        Index("ix_swipes_animal_id", "animal_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,15 +1,15 @@
-from .user import UserCreate, UserUpdate, User, UserLogin, Token, TokenData
-from .animal import AnimalCreate, AnimalUpdate, Animal, AnimalPhoto, AnimalAnalysis
+from .user import UserCreate, UserUpdate, User, UserLogin, Token, TokenData, LeaderboardEntry
+from .animal import AnimalCreate, AnimalUpdate, Animal, AnimalPhoto, AnimalAnalysis, AnalysisJob, AnimalEngagement, AnimalDetail, AnimalSummary
 from .shelter import ShelterCreate, ShelterUpdate, Shelter, ShelterRequest, ShelterRequestCreate
 from .donation import DonationCreate, Donation
-from .swipe import SwipeCreate, Swipe
+from .swipe import SwipeCreate, Swipe, SwipeBatchResult, SwipeMatch
 from .faq import FAQCreate, FAQUpdate, FAQ
 
 __all__ = [
-    "UserCreate", "UserUpdate", "User", "UserLogin", "Token", "TokenData",
-    "AnimalCreate", "AnimalUpdate", "Animal", "AnimalPhoto", "AnimalAnalysis",
+    "UserCreate", "UserUpdate", "User", "UserLogin", "Token", "TokenData", "LeaderboardEntry",
+    "AnimalCreate", "AnimalUpdate", "Animal", "AnimalPhoto", "AnimalAnalysis", "AnalysisJob", "AnimalEngagement", "AnimalDetail", "AnimalSummary",
     "ShelterCreate", "ShelterUpdate", "Shelter", "ShelterRequest", "ShelterRequestCreate",
     "DonationCreate", "Donation",
-    "SwipeCreate", "Swipe",
+    "SwipeCreate", "Swipe", "SwipeBatchResult", "SwipeMatch",
     "FAQCreate", "FAQUpdate", "FAQ"
 ]
\ No newline at end of file
@@ -10,6 +10,8 @@ class AnimalPhotoBase(BaseModel):
 class AnimalPhoto(AnimalPhotoBase):
     id: int
     thumbnail_url: Optional[str] = None
+    variants: Optional[Dict[str, Any]] = None
+    processing_status: Optional[str] = None
     created_at: datetime
 
     class Config:
@@ -29,6 +31,32 @@ class AnimalAnalysis(AnimalAnalysisBase):
     class Config:
         from_attributes = True
 
+class AnalysisJob(BaseModel):
+    id: int
+    photo_id: int
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    analysis: Optional[AnimalAnalysis] = None
+
+    class Config:
+        from_attributes = True
+
+class AnimalEngagement(BaseModel):
+    likes: int = 0
+    super_likes: int = 0
+    passes: int = 0
+    matches: int = 0
+    total_swipes: int = 0
+    match_rate: float = 0.0
+
+    class Config:
+        from_attributes = True
+
 class AnimalBase(BaseModel):
     name: Optional[str] = None
     type: AnimalType
@@ -73,11 +101,25 @@ class Animal(AnimalBase):
     longitude: Optional[float] = None
     owner_id: Optional[int] = None
     shelter_id: Optional[int] = None
+    distance_km: Optional[float] = None
     found_date: datetime
     created_at: datetime
     updated_at: datetime
     photos: List[AnimalPhoto] = []
     analyses: List[AnimalAnalysis] = []
 
+    class Config:
+        from_attributes = True
+
+class AnimalDetail(Animal):
+    engagement: Optional[AnimalEngagement] = None
+
+class AnimalSummary(BaseModel):
+    id: int
+    name: Optional[str] = None
+    type: AnimalType
+    status: AnimalStatus
+    primary_thumbnail_url: Optional[str] = None
+
     class Config:
         from_attributes = True
\ No newline at end of file
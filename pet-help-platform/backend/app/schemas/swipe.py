@@ -1,6 +1,8 @@
 from pydantic import BaseModel
+from typing import Optional
 from datetime import datetime
 from app.models.swipe import SwipeDirection
+from app.schemas.animal import AnimalSummary
 
 class SwipeBase(BaseModel):
     animal_id: int
@@ -16,4 +18,12 @@ class Swipe(SwipeBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SwipeBatchResult(BaseModel):
+    animal_id: int
+    status: str
+    swipe: Optional[Swipe] = None
+
+class SwipeMatch(Swipe):
+    animal: Optional[AnimalSummary] = None
\ No newline at end of file
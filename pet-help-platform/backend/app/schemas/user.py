@@ -46,4 +46,11 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     user_id: Optional[int] = None
-    email: Optional[str] = None
\ No newline at end of file
+    email: Optional[str] = None
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    username: str
+    avatar_url: Optional[str] = None
+    points: int
\ No newline at end of file
@@ -1,6 +1,8 @@
 import openai
+import asyncio
 import base64
 import json
+import mimetypes
 from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 import httpx
@@ -8,17 +10,31 @@ import os
 
 from app.core.config import settings
 from app.models import Animal, AnimalAnalysis
+from app.services.lost_matching import lost_pet_index, match_recent_lost
+from app.services.storage import get_storage, key_for_url
+
+def record_analysis(db: Session, animal_id: int, analysis_data: Dict[str, Any]) -> AnimalAnalysis:
+    """Add an AnimalAnalysis from parsed AI output and fill missing animal fields"""
+    new_analysis = AnimalAnalysis(
+        animal_id=animal_id,
+        ai_breed_detection=analysis_data.get("breed", "Unknown"),
+        ai_condition_assessment=analysis_data.get("condition", "Unknown"),
+        ai_age_estimation=analysis_data.get("age_range", "Unknown"),
+        ai_confidence_score=float(analysis_data.get("confidence_score", 0.5)),
+        raw_analysis_data=analysis_data
+    )
 
-async def analyze_animal_photo(photo_url: str, animal_id: int, db: Session) -> Optional[AnimalAnalysis]:
-    """Analyze animal photo using AI (OpenAI Vision API or similar)"""
+    db.add(new_analysis)
 
-    if not settings.OPENAI_API_KEY:
-        return None
+    animal = db.query(Animal).filter(Animal.id == animal_id).first()
+    if animal and not animal.breed:
+        animal.breed = analysis_data.get("breed")
+        if analysis_data.get("color"):
+            animal.color = analysis_data["color"]
 
-    try:
-        openai.api_key = settings.OPENAI_API_KEY
+    return new_analysis
 
-        prompt = """Analyze this photo of an animal and provide the following information in JSON format:
+ANALYSIS_PROMPT = """Analyze this photo of an animal and provide the following information in JSON format:
         {
             "species": "dog/cat/bird/rabbit/other",
             "breed": "estimated breed or 'mixed'",
@@ -30,55 +46,85 @@ async def analyze_animal_photo(photo_url: str, animal_id: int, db: Session) -> O
             "additional_notes": "any other relevant observations"
         }"""
 
-        if photo_url.startswith("http"):
-            image_url = photo_url
-        else:
-            with open(photo_url.replace("/uploads/", str(settings.UPLOAD_DIR) + "/"), "rb") as image_file:
-                image_data = base64.b64encode(image_file.read()).decode('utf-8')
-                image_url = f"data:image/jpeg;base64,{image_data}"
+class AnalysisError(Exception):
+    """A failed analysis attempt; retryable ones are tried again after a backoff"""
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+def create_ai_client(max_connections: int) -> httpx.AsyncClient:
+    """Pooled client for the OpenAI-compatible API at OPENAI_BASE_URL"""
+    return httpx.AsyncClient(
+        base_url=settings.OPENAI_BASE_URL,
+        headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+        timeout=settings.AI_ANALYSIS_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    )
 
-        response = openai.ChatCompletion.create(
-            model="gpt-4-vision-preview",
-            messages=[
+def parse_analysis(text: str) -> Dict[str, Any]:
+    text = text.strip()
+    if text.startswith("```"):
+        # Models often wrap JSON in a markdown fence
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Analysis is not a JSON object")
+    return data
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+def load_photo(photo_url: str) -> bytes:
+    """Bytes of a stored photo; a missing photo is a permanent failure"""
+    try:
+        return get_storage().read_bytes(key_for_url(photo_url))
+    except (FileNotFoundError, ValueError) as e:
+        raise AnalysisError(f"Photo not readable: {e}", retryable=False)
+
+async def fetch_photo_analysis(
+    client: httpx.AsyncClient, photo_url: str, content: Optional[bytes] = None
+) -> Dict[str, Any]:
+    """Ask the vision model about one photo (content if already loaded); returns the parsed analysis"""
+    if photo_url.startswith("http"):
+        image_url = photo_url
+    else:
+        if content is None:
+            content = await asyncio.to_thread(load_photo, photo_url)
+        media_type = mimetypes.guess_type(photo_url)[0] or "image/jpeg"
+        image_url = f"data:{media_type};base64,{base64.b64encode(content).decode('utf-8')}"
+
+    try:
+        response = await client.post("/chat/completions", json={
+            "model": settings.AI_VISION_MODEL,
+            "messages": [
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": prompt},
+                        {"type": "text", "text": ANALYSIS_PROMPT},
                         {"type": "image_url", "image_url": {"url": image_url}}
                     ]
                 }
             ],
-            max_tokens=500
-        )
-
-        analysis_text = response.choices[0].message.content
-        analysis_data = json.loads(analysis_text)
-
-        new_analysis = AnimalAnalysis(
-            animal_id=animal_id,
-            ai_breed_detection=analysis_data.get("breed", "Unknown"),
-            ai_condition_assessment=analysis_data.get("condition", "Unknown"),
-            ai_age_estimation=analysis_data.get("age_range", "Unknown"),
-            ai_confidence_score=float(analysis_data.get("confidence_score", 0.5)),
-            raw_analysis_data=analysis_data
-        )
-
-        db.add(new_analysis)
-
-        animal = db.query(Animal).filter(Animal.id == animal_id).first()
-        if animal and not animal.breed:
-            animal.breed = analysis_data.get("breed")
-            if analysis_data.get("color"):
-                animal.color = analysis_data["color"]
-
-        db.commit()
-        db.refresh(new_analysis)
+            "max_tokens": 500
+        })
+    except httpx.TransportError as e:
+        raise AnalysisError(f"{type(e).__name__}: {e}")
 
-        return new_analysis
+    if response.status_code == 429 or response.status_code >= 500:
+        raise AnalysisError(f"Model server returned {response.status_code}", retry_after=_retry_after(response))
+    if response.status_code >= 400:
+        raise AnalysisError(f"Model server returned {response.status_code}: {response.text[:200]}", retryable=False)
 
-    except Exception as e:
-        print(f"AI analysis error: {e}")
-        return None
+    try:
+        return parse_analysis(response.json()["choices"][0]["message"]["content"])
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise AnalysisError(f"Unparseable model response: {e}")
 
 async def generate_faq_answer(question: str) -> str:
     """Generate FAQ answer using AI"""
@@ -112,43 +158,15 @@ async def generate_faq_answer(question: str) -> str:
         print(f"FAQ AI error: {e}")
         return "Sorry, I couldn't generate an answer at this time. Please try again later."
 
-def match_lost_pets(animal_data: Dict[str, Any], db: Session) -> list:
-    """Match found animals with lost pets database"""
-
-    query = db.query(Animal).filter(
-        Animal.status == "lost",
-        Animal.type == animal_data.get("type")
-    )
-
-    if animal_data.get("breed"):
-        query = query.filter(Animal.breed.ilike(f"%{animal_data['breed']}%"))
-
-    if animal_data.get("color"):
-        query = query.filter(Animal.color.ilike(f"%{animal_data['color']}%"))
-
-    if animal_data.get("size"):
-        query = query.filter(Animal.size == animal_data["size"])
-
-    potential_matches = query.limit(10).all()
-
-    matches = []
-    for animal in potential_matches:
-        match_score = calculate_match_score(animal_data, {
-            "type": animal.type,
-            "breed": animal.breed,
-            "color": animal.color,
-            "size": animal.size,
-            "age": animal.age
-        })
-
-        if match_score > 0.7:
-            matches.append({
-                "animal_id": animal.id,
-                "match_score": match_score,
-                "owner_id": animal.owner_id
-            })
+def match_lost_pets(animal_data: Dict[str, Any], db: Session, limit: int = 10, min_score: float = 0.7) -> list:
+    """Match a found animal against lost pets; best matches first (see lost_matching).
 
-    return sorted(matches, key=lambda x: x["match_score"], reverse=True)
+    The index is built by its background thread from startup on; until the
+    first build finishes, recent lost reports are scored from the database.
+    """
+    if lost_pet_index.built_at is None:
+        return match_recent_lost(db, animal_data, limit=limit, min_score=min_score)
+    return lost_pet_index.match(animal_data, limit=limit, min_score=min_score)
 
 def calculate_match_score(data1: Dict, data2: Dict) -> float:
     """Calculate similarity score between two animals"""
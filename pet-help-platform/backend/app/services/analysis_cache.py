@@ -0,0 +1,166 @@
+import io
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from PIL import Image, ImageOps
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import AnalysisCacheEntry
+
+BANDS = 4
+BAND_BITS = 16
+# Band collisions scored per lookup, most recently used first
+MAX_CANDIDATES = 256
+EVICT_EVERY = 100
+
+def dhash(content: bytes) -> int:
+    """64-bit difference hash: left/right brightness gradients of a 9x8 grayscale thumbnail.
+
+    Re-encoding, resizing and mild compression barely change it, so the same
+    photo uploaded again or cross-posted lands within a few bits.
+    """
+    with Image.open(io.BytesIO(content)) as img:
+        img.draft("L", (64, 64))
+        small = ImageOps.exif_transpose(img).convert("L").resize((9, 8), Image.LANCZOS)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+def hash_bands(value: int) -> List[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (BAND_BITS * i)) & mask for i in range(BANDS)]
+
+def _to_signed(value: int) -> int:
+    # BIGINT is signed; store the unsigned hash in two's complement
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+class PerceptualAnalysisCache:
+    """Cache of AI analyses keyed by perceptual hash, stored in analysis_cache.
+
+    A lookup returns the closest entry within max_distance bits that is
+    younger than ttl_seconds. Entries beyond max_entries are evicted least
+    recently used first, checked every EVICT_EVERY stores. Exact duplicates
+    never get here: StoredFile already carries their analysis.
+    """
+
+    def __init__(self, max_distance: int, ttl_seconds: int, max_entries: int):
+        # Band lookups only guarantee matches up to BANDS - 1 differing bits
+        self.max_distance = min(max_distance, BANDS - 1)
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.near_hits = 0
+        self.stores = 0
+        self.evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_distance >= 0
+
+    def lookup(self, db: Session, value: int) -> Optional[dict]:
+        """Cached analysis for a similar photo; the caller commits the hit bookkeeping"""
+        now = datetime.utcnow()
+        candidates = self._candidates(db, value, now - self.ttl)
+
+        best, best_distance = None, None
+        for entry in candidates:
+            distance = (_to_unsigned(entry.dhash) ^ value).bit_count()
+            if best_distance is None or distance < best_distance:
+                best, best_distance = entry, distance
+
+        with self._lock:
+            self.lookups += 1
+            if best is None or best_distance > self.max_distance:
+                return None
+            self.hits += 1
+            if best_distance:
+                self.near_hits += 1
+
+        # A plain UPDATE: the row may be evicted concurrently
+        db.query(AnalysisCacheEntry).filter(AnalysisCacheEntry.id == best.id).update({
+            "hits": AnalysisCacheEntry.hits + 1,
+            "last_used_at": now,
+        }, synchronize_session=False)
+        return best.analysis_data
+
+    def _candidates(self, db: Session, value: int, since: datetime) -> List[AnalysisCacheEntry]:
+        entries = db.query(AnalysisCacheEntry).filter(AnalysisCacheEntry.created_at >= since)
+        # Re-uploads usually hash identically; no number of band colliders can hide those
+        exact = entries.filter(AnalysisCacheEntry.dhash == _to_signed(value)).order_by(
+            AnalysisCacheEntry.last_used_at.desc()
+        ).first()
+        if exact is not None:
+            return [exact]
+
+        bands = hash_bands(value)
+        return entries.filter(
+            or_(*(getattr(AnalysisCacheEntry, f"band{i}") == band for i, band in enumerate(bands)))
+        ).order_by(
+            AnalysisCacheEntry.last_used_at.desc(), AnalysisCacheEntry.id.desc()
+        ).limit(MAX_CANDIDATES).all()
+
+    def store(self, db: Session, value: int, analysis_data: dict):
+        bands = hash_bands(value)
+        db.add(AnalysisCacheEntry(
+            dhash=_to_signed(value),
+            band0=bands[0],
+            band1=bands[1],
+            band2=bands[2],
+            band3=bands[3],
+            analysis_data=analysis_data
+        ))
+        with self._lock:
+            self.stores += 1
+            due = self.stores % EVICT_EVERY == 0
+        if due:
+            self.evict(db)
+
+    def evict(self, db: Session) -> int:
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        removed = db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.created_at < datetime.utcnow() - self.ttl
+        ).delete(synchronize_session=False)
+
+        excess = db.query(func.count(AnalysisCacheEntry.id)).scalar() - self.max_entries
+        if excess > 0:
+            oldest = db.query(AnalysisCacheEntry.id).order_by(
+                AnalysisCacheEntry.last_used_at, AnalysisCacheEntry.id
+            ).limit(excess).subquery()
+            removed += db.query(AnalysisCacheEntry).filter(
+                AnalysisCacheEntry.id.in_(oldest.select())
+            ).delete(synchronize_session=False)
+
+        with self._lock:
+            self.evicted += removed
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_distance": self.max_distance,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.lookups - self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else None,
+                "stores": self.stores,
+                "evicted": self.evicted,
+            }
+
+analysis_cache = PerceptualAnalysisCache(
+    max_distance=settings.AI_CACHE_MAX_DISTANCE,
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+    max_entries=settings.AI_CACHE_MAX_ENTRIES
+)
\ No newline at end of file
@@ -0,0 +1,336 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.core.cache import animal_detail_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import AnalysisJob, AnimalPhoto
+from app.models.analysis_job import AnalysisJobStatus
+from app.services.ai_service import AnalysisError, create_ai_client, fetch_photo_analysis, load_photo, record_analysis
+from app.services.analysis_cache import analysis_cache, dhash
+from app.services.content_store import remember_analysis
+
+CLAIM_CANDIDATES = 5
+SHUTDOWN_GRACE_SECONDS = 10
+METRICS_WINDOW = 1000
+
+logger = logging.getLogger(__name__)
+
+def enqueue_analysis(db, photo: AnimalPhoto) -> AnalysisJob:
+    """Add a queued job for the photo; the caller commits, then calls analysis_queue.notify()"""
+    job = AnalysisJob(
+        photo_id=photo.id,
+        animal_id=photo.animal_id,
+        photo_url=photo.url,
+        status=AnalysisJobStatus.QUEUED.value,
+        attempts=0,
+        max_attempts=settings.AI_ANALYSIS_MAX_ATTEMPTS,
+        run_after=datetime.utcnow()
+    )
+    db.add(job)
+    return job
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter for the retry after the given attempt"""
+    delay = min(settings.AI_ANALYSIS_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.AI_ANALYSIS_MAX_BACKOFF_SECONDS)
+    return random.uniform(delay / 2, delay)
+
+def _stale(now: datetime):
+    """Running jobs whose worker has not reported back within the visibility timeout"""
+    stale = now - timedelta(seconds=settings.AI_ANALYSIS_VISIBILITY_SECONDS)
+    return and_(AnalysisJob.status == AnalysisJobStatus.RUNNING.value, AnalysisJob.locked_at < stale)
+
+def _claimable(now: datetime):
+    return or_(
+        and_(AnalysisJob.status == AnalysisJobStatus.QUEUED.value, AnalysisJob.run_after <= now),
+        and_(_stale(now), AnalysisJob.attempts < AnalysisJob.max_attempts)
+    )
+
+class AnalysisQueue:
+    """Runs AI photo analysis from the analysis_jobs table.
+
+    Uploads only insert a job row. A background thread runs an event loop
+    with `concurrency` workers sharing one pooled HTTP client, so at most
+    that many model calls are in flight. Failed attempts are retried with
+    exponential backoff; once max_attempts is reached, or on a permanent
+    error, the job is dead-lettered (status dead). Photos whose perceptual
+    hash is close to an analysed one reuse that analysis without a model
+    call. Jobs live in the database, so several API replicas can share the
+    queue, and a job whose worker disappeared is reclaimed after
+    AI_ANALYSIS_VISIBILITY_SECONDS, or dead-lettered if that was its last
+    attempt.
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._shutdown: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._lock = threading.Lock()
+
+        self.claimed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.dead = 0
+        self.in_flight = 0
+        self._latencies_ms = deque(maxlen=METRICS_WINDOW)
+
+    def start(self):
+        if self._thread is not None or not settings.OPENAI_API_KEY:
+            return
+        self._stopping = False
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="analysis-queue", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._call_in_loop(lambda: self._shutdown.set())
+        self._thread.join()
+        self._thread = None
+
+    def notify(self):
+        """Wake idle workers, e.g. right after a job was committed"""
+        self._call_in_loop(lambda: self._wake.set())
+
+    def _call_in_loop(self, callback):
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(callback)
+            except RuntimeError:
+                pass
+
+    def _run(self, ready: threading.Event):
+        asyncio.run(self._main(ready))
+
+    async def _main(self, ready: threading.Event):
+        self._wake = asyncio.Event()
+        self._shutdown = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        ready.set()
+        try:
+            async with create_ai_client(self.concurrency) as client:
+                workers = [asyncio.create_task(self._worker(client)) for _ in range(self.concurrency)]
+                await self._shutdown.wait()
+                self._wake.set()
+                # Jobs cut off here stay running and are reclaimed after the visibility timeout
+                _, unfinished = await asyncio.wait(workers, timeout=SHUTDOWN_GRACE_SECONDS)
+                for task in unfinished:
+                    task.cancel()
+                await asyncio.gather(*unfinished, return_exceptions=True)
+        finally:
+            self._loop = None
+
+    async def _worker(self, client):
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self._claim)
+                if job is not None:
+                    await self._process(client, *job)
+                    continue
+            except Exception:
+                logger.exception("Analysis queue worker error")
+            await self._idle()
+
+    async def _idle(self):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    def _claim(self) -> Optional[Tuple[int, int, str, int]]:
+        """Lock the next due job; returns (job_id, animal_id, photo_url, attempt)"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            self._bury_lost(db, now)
+            # SKIP LOCKED lets replicas pick different rows on Postgres; the
+            # conditional UPDATE below is what makes the claim exclusive.
+            candidates = db.query(AnalysisJob.id).filter(_claimable(now)).order_by(
+                AnalysisJob.run_after, AnalysisJob.id
+            ).limit(CLAIM_CANDIDATES).with_for_update(skip_locked=True).all()
+
+            for (job_id,) in candidates:
+                claimed = db.query(AnalysisJob).filter(AnalysisJob.id == job_id, _claimable(now)).update({
+                    "status": AnalysisJobStatus.RUNNING.value,
+                    "attempts": AnalysisJob.attempts + 1,
+                    "locked_at": now,
+                }, synchronize_session=False)
+                if claimed:
+                    job = db.get(AnalysisJob, job_id)
+                    result = (job.id, job.animal_id, job.photo_url, job.attempts)
+                    db.commit()
+                    with self._lock:
+                        self.claimed += 1
+                    return result
+            db.commit()
+            return None
+        finally:
+            db.close()
+
+    def _bury_lost(self, db, now: datetime):
+        """Dead-letter stale running jobs that have no attempts left to reclaim them with"""
+        buried = db.query(AnalysisJob).filter(
+            _stale(now), AnalysisJob.attempts >= AnalysisJob.max_attempts
+        ).update({
+            "status": AnalysisJobStatus.DEAD.value,
+            "last_error": "Worker lost during the final attempt",
+            "finished_at": now,
+        }, synchronize_session=False)
+        db.commit()
+        if buried:
+            logger.error("Dead-lettered %d analysis jobs whose worker was lost on the final attempt", buried)
+            with self._lock:
+                self.dead += buried
+
+    async def _process(self, client, job_id: int, animal_id: int, photo_url: str, attempt: int):
+        started = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            try:
+                analysis_data, phash, content = await asyncio.to_thread(self._cached_analysis, photo_url)
+                from_cache = analysis_data is not None
+                if not from_cache:
+                    analysis_data = await fetch_photo_analysis(client, photo_url, content)
+            except AnalysisError as e:
+                await asyncio.to_thread(self._fail, job_id, attempt, str(e), e.retryable, e.retry_after)
+            except Exception as e:
+                await asyncio.to_thread(self._fail, job_id, attempt, f"{type(e).__name__}: {e}", True, None)
+            else:
+                cache_key = None if from_cache else phash
+                try:
+                    await asyncio.to_thread(
+                        self._complete, job_id, animal_id, photo_url, attempt, analysis_data, cache_key
+                    )
+                except Exception as e:
+                    await asyncio.to_thread(
+                        self._fail, job_id, attempt, f"Recording analysis failed: {type(e).__name__}: {e}", True, None
+                    )
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self._latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    def _owned_job(self, db, job_id: int, attempt: int) -> Optional[AnalysisJob]:
+        # A job reclaimed after the visibility timeout belongs to a later attempt
+        job = db.get(AnalysisJob, job_id)
+        if job is None or job.status != AnalysisJobStatus.RUNNING.value or job.attempts != attempt:
+            return None
+        return job
+
+    def _cached_analysis(self, photo_url: str) -> Tuple[Optional[dict], Optional[int], Optional[bytes]]:
+        """(analysis of a near-identical photo, perceptual hash, photo bytes) before calling the model"""
+        if photo_url.startswith("http") or not analysis_cache.enabled:
+            return None, None, None
+        content = load_photo(photo_url)
+        try:
+            phash = dhash(content)
+        except Exception:
+            # Not decodable here; the model may still make sense of it
+            return None, None, content
+
+        db = SessionLocal()
+        try:
+            analysis_data = analysis_cache.lookup(db, phash)
+            db.commit()
+        finally:
+            db.close()
+        return analysis_data, phash, content
+
+    def _complete(
+        self, job_id: int, animal_id: int, photo_url: str, attempt: int, analysis_data: dict, cache_key: Optional[int]
+    ):
+        db = SessionLocal()
+        try:
+            job = self._owned_job(db, job_id, attempt)
+            if job is None:
+                return
+            if db.get(AnimalPhoto, job.photo_id) is None:
+                # Photo deleted while the model was working
+                db.delete(job)
+                db.commit()
+                return
+
+            analysis = record_analysis(db, animal_id, analysis_data)
+            remember_analysis(db, photo_url, analysis_data)
+            if cache_key is not None:
+                analysis_cache.store(db, cache_key, analysis_data)
+            db.flush()
+            job.status = AnalysisJobStatus.SUCCEEDED.value
+            job.analysis_id = analysis.id
+            job.last_error = None
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+        animal_detail_cache.invalidate(animal_id)
+        with self._lock:
+            self.succeeded += 1
+
+    def _fail(self, job_id: int, attempt: int, error: str, retryable: bool, retry_after: Optional[float]):
+        db = SessionLocal()
+        try:
+            job = self._owned_job(db, job_id, attempt)
+            if job is None:
+                return
+            job.last_error = error[:2000]
+            if retryable and job.attempts < job.max_attempts:
+                delay = max(backoff_seconds(job.attempts), retry_after or 0)
+                job.status = AnalysisJobStatus.QUEUED.value
+                job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+                retried = True
+            else:
+                job.status = AnalysisJobStatus.DEAD.value
+                job.finished_at = datetime.utcnow()
+                retried = False
+            db.commit()
+        finally:
+            db.close()
+
+        if retried:
+            logger.warning("AI analysis job %d failed (attempt %d), retrying: %s", job_id, attempt, error)
+        else:
+            logger.error("AI analysis job %d dead-lettered after attempt %d: %s", job_id, attempt, error)
+        with self._lock:
+            if retried:
+                self.retried += 1
+            else:
+                self.dead += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            return {
+                "running": self._thread is not None,
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "claimed": self.claimed,
+                "succeeded": self.succeeded,
+                "retried": self.retried,
+                "dead": self.dead,
+                "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+                "p95_ms": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None,
+            }
+
+analysis_queue = AnalysisQueue(
+    concurrency=settings.AI_ANALYSIS_CONCURRENCY,
+    poll_interval=settings.AI_ANALYSIS_POLL_SECONDS
+)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import mimetypes
+import os
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal, dialect_insert
+from app.models import StoredFile
+from app.services.storage import get_storage, key_for_url, url_for_key
+
+def acquire(db: Session, sha256: str, size: int, temp_path: Path, subfolder: str, extension: str) -> Tuple[str, bool]:
+    """Take a reference on the content, storing temp_path if it is new.
+
+    Returns (url, created). The upsert holds the stored_files row lock until
+    the caller commits, so a concurrent upload of the same bytes waits for
+    the file to be in place, and a concurrent release cannot delete it.
+    """
+    url = url_for_key(f"{subfolder}/{sha256}{extension}")
+    stored = StoredFile.__table__
+    stmt = dialect_insert(stored).values(sha256=sha256, url=url, size=size, ref_count=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[stored.c.sha256],
+        set_={"ref_count": stored.c.ref_count + 1}
+    ).returning(stored.c.url, stored.c.ref_count)
+    url, ref_count = db.execute(stmt).one()
+
+    created = ref_count == 1
+    if created:
+        get_storage().save_file(key_for_url(url), temp_path, mimetypes.guess_type(url)[0])
+    else:
+        os.remove(temp_path)
+    return url, created
+
+class Released(NamedTuple):
+    """Content whose last reference was dropped; its files go once the drop is committed"""
+    url: str
+    keys: List[str]
+
+def release(db: Session, url: Optional[str], derived_urls: Iterable[str] = ()) -> Optional[Released]:
+    """Drop a reference. Caller commits, then passes the result to purge().
+
+    The last reference leaves the row at ref_count 0 instead of deleting
+    anything, so a rollback keeps both the row and the files.
+    """
+    if not url:
+        return None
+    stored = StoredFile.__table__
+    remaining = db.execute(
+        update(stored).where(stored.c.url == url).values(ref_count=stored.c.ref_count - 1).returning(stored.c.ref_count)
+    ).scalar()
+
+    # No row: a file stored before content addressing, owned by its only user
+    if remaining is not None and remaining > 0:
+        return None
+    keys = [key_for_url(file_url) for file_url in {url, *derived_urls} if file_url.startswith("/uploads/")]
+    return Released(url, keys)
+
+def purge(released: Iterable[Optional[Released]]):
+    """Delete the files of committed releases, unless the content was uploaded again since"""
+    db = SessionLocal()
+    try:
+        for item in released:
+            if item is None:
+                continue
+            # The row lock makes a concurrent acquire of the same bytes wait
+            # until the files and the row are gone, then store them afresh.
+            row = db.query(StoredFile).filter(StoredFile.url == item.url).with_for_update().first()
+            if row is None or row.ref_count <= 0:
+                get_storage().delete_many(item.keys)
+                if row is not None:
+                    db.delete(row)
+            db.commit()
+    finally:
+        db.close()
+
+def cached_analysis(db: Session, url: str) -> Optional[dict]:
+    return db.query(StoredFile.analysis_data).filter(StoredFile.url == url).scalar()
+
+def remember_analysis(db: Session, url: str, analysis_data: dict):
+    db.query(StoredFile).filter(StoredFile.url == url).update({"analysis_data": analysis_data})
\ No newline at end of file
@@ -0,0 +1,40 @@
+from collections import defaultdict
+from typing import Iterable, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models import AnimalEngagement
+from app.models.swipe import SwipeDirection
+
+COUNTER_FOR_DIRECTION = {
+    SwipeDirection.RIGHT: "likes",
+    SwipeDirection.SUPER_LIKE: "super_likes",
+    SwipeDirection.LEFT: "passes",
+}
+COUNTERS = ("likes", "super_likes", "passes", "matches")
+
+def record_swipes(db: Session, swipes: Iterable[Tuple[int, SwipeDirection]], sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) swipes from the per-animal counters.
+
+    One upsert per animal, incrementing in SQL so concurrent writers never
+    lose counts, and in animal id order to keep row locks ordered. Runs in the
+    caller's transaction, together with the swipe insert or delete itself.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for animal_id, direction in swipes:
+        counter = COUNTER_FOR_DIRECTION[SwipeDirection(direction)]
+        deltas[animal_id][counter] += sign
+        if counter != "passes":
+            deltas[animal_id]["matches"] += sign
+    if not deltas:
+        return
+
+    table = AnimalEngagement.__table__
+    stmt = dialect_insert(table)
+    increments = {name: table.c[name] + stmt.excluded[name] for name in COUNTERS}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.animal_id],
+        set_={**increments, "updated_at": stmt.excluded.updated_at}
+    )
+    db.execute(stmt, [{"animal_id": animal_id, **deltas[animal_id]} for animal_id in sorted(deltas)])
\ No newline at end of file
@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Animal, Swipe, User
+from app.models.animal import AnimalStatus
+from app.services.ranking import CANDIDATE_COLUMNS, build_profile, rank_candidates
+
+FEED_STATUSES = [AnimalStatus.AVAILABLE, AnimalStatus.IN_SHELTER]
+
+class _UserFeed:
+    __slots__ = ("queue", "swiped", "served", "filled", "refilling")
+
+    def __init__(self):
+        self.queue: Deque[int] = deque()
+        self.swiped: Set[int] = set()
+        # Shown but not swiped; skipped until the user has seen everything else
+        self.served: Set[int] = set()
+        self.filled = False
+        self.refilling = False
+
+class FeedService:
+    """Per-user queues of feed candidates, refilled in batches off the request path.
+
+    Each user keeps the ids of the animals they already swiped, so a refill
+    walks the newest feed animals by primary key and skips swiped ones in
+    memory instead of running a NOT IN over the whole swipe history. A
+    refill collects up to pool_size unswiped candidates, ranks the whole
+    pool against the user's profile and queues the best batch_size; the
+    rest compete again, with newer arrivals, at the next refill. Serving
+    the feed is a pop. Animals served but not swiped stay out of refills
+    until one finds nothing else, then the feed starts over.
+    """
+
+    def __init__(self, batch_size: int, pool_size: int, low_watermark: int, max_users: int):
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        self.low_watermark = low_watermark
+        self.max_users = max_users
+        self._feeds: "OrderedDict[int, _UserFeed]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, user_id: int) -> Optional[_UserFeed]:
+        feed = self._feeds.get(user_id)
+        if feed is not None:
+            self._feeds.move_to_end(user_id)
+        return feed
+
+    def pop(self, user_id: int, limit: int) -> Optional[List[int]]:
+        """Take up to `limit` candidate ids, or None if the user's queue is cold"""
+        with self._lock:
+            feed = self._get(user_id)
+            if feed is None or not feed.filled:
+                return None
+
+            ids = []
+            while feed.queue and len(ids) < limit:
+                animal_id = feed.queue.popleft()
+                if animal_id not in feed.swiped:
+                    ids.append(animal_id)
+            feed.served.update(ids)
+            return ids
+
+    def needs_refill(self, user_id: int) -> bool:
+        with self._lock:
+            feed = self._get(user_id)
+            return feed is None or (not feed.refilling and len(feed.queue) < self.low_watermark)
+
+    def mark_swiped(self, user_id: int, animal_id: int):
+        with self._lock:
+            feed = self._feeds.get(user_id)
+            if feed is not None:
+                feed.swiped.add(animal_id)
+
+    def forget_swipe(self, user_id: int, animal_id: int):
+        # Every refill rescans from the newest animal, so it comes back then
+        with self._lock:
+            feed = self._feeds.get(user_id)
+            if feed is not None:
+                feed.swiped.discard(animal_id)
+                feed.served.discard(animal_id)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._feeds.pop(user_id, None)
+
+    def _collect(self, db: Session, user_id: int, feed: _UserFeed, queued: Set[int], wanted: int) -> list:
+        pool = []
+        scan_before = None
+        while wanted > 0 and len(pool) < self.pool_size:
+            query = candidate_query(db, user_id)
+            if scan_before is not None:
+                query = query.filter(Animal.id < scan_before)
+            rows = query.limit(self.pool_size).all()
+            if not rows:
+                break
+            scan_before = rows[-1][0]
+            with self._lock:
+                skip = feed.swiped | feed.served
+            pool.extend(row for row in rows if row[0] not in skip and row[0] not in queued)
+        return pool[:self.pool_size]
+
+    def refill(self, user_id: int):
+        """Top the user's queue up with the best of a fresh candidate pool; meant for a background task"""
+        with self._lock:
+            feed = self._get(user_id)
+            if feed is None:
+                feed = _UserFeed()
+                self._feeds[user_id] = feed
+                while len(self._feeds) > self.max_users:
+                    self._feeds.popitem(last=False)
+            elif feed.refilling:
+                return
+            feed.refilling = True
+            cold = not feed.filled
+            queued = set(feed.queue)
+
+        db = SessionLocal()
+        try:
+            if cold:
+                swiped = {row[0] for row in db.query(Swipe.animal_id).filter(Swipe.user_id == user_id)}
+                with self._lock:
+                    feed.swiped |= swiped
+
+            wanted = self.batch_size - len(queued)
+            pool = self._collect(db, user_id, feed, queued, wanted)
+            if wanted > 0 and not pool and not queued and feed.served:
+                # Everything left was already shown: start over
+                with self._lock:
+                    feed.served.clear()
+                pool = self._collect(db, user_id, feed, queued, wanted)
+
+            ranked = []
+            if pool:
+                user = db.query(User).filter(User.id == user_id).first()
+                if user is not None:
+                    ranked = rank_candidates(pool, build_profile(db, user))[:wanted]
+
+            with self._lock:
+                feed.queue.extend(ranked)
+                feed.filled = True
+        finally:
+            with self._lock:
+                feed.refilling = False
+            db.close()
+
+def candidate_query(db: Session, user_id: int):
+    """Feed candidates for the user in CANDIDATE_COLUMNS, newest first"""
+    return db.query(*CANDIDATE_COLUMNS).filter(
+        Animal.status.in_(FEED_STATUSES),
+        Animal.owner_id != user_id
+    ).order_by(Animal.id.desc())
+
+feed_service = FeedService(
+    batch_size=settings.FEED_BATCH_SIZE,
+    pool_size=settings.FEED_CANDIDATE_POOL,
+    low_watermark=settings.FEED_LOW_WATERMARK,
+    max_users=settings.FEED_MAX_USERS
+)
\ No newline at end of file
@@ -0,0 +1,143 @@
+import math
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 7
+MAX_COVER_CELLS = 32
+EARTH_RADIUS_KM = 6371.0088
+
+BBox = Tuple[float, float, float, float]
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode a coordinate as a base32 geohash"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        rng, value = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+def geohash_for(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Return (lat_degrees, lng_degrees) covered by one cell at this precision"""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+def cover_bbox(bbox: BBox) -> List[str]:
+    """Return the geohash prefixes covering a bounding box.
+
+    Picks the finest precision that covers the box in at most MAX_COVER_CELLS
+    cells, so the lookup stays a handful of index range scans.
+    """
+    min_lng, min_lat, max_lng, max_lat = bbox
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = cell_size(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        cols = math.floor(max_lng / lng_step) - math.floor(min_lng / lng_step) + 1
+        if rows * cols > MAX_COVER_CELLS and precision > 1:
+            continue
+
+        cells = set()
+        lat = min_lat
+        while lat <= max_lat + lat_step:
+            lng = min_lng
+            while lng <= max_lng + lng_step:
+                cells.add(encode_geohash(min(lat, max_lat), min(lng, max_lng), precision))
+                lng += lng_step
+            lat += lat_step
+        return sorted(cells)
+
+    return []
+
+def bboxes_around(latitude: float, longitude: float, radius_km: float) -> List[BBox]:
+    """Boxes covering the circle: one, or two when it crosses the antimeridian.
+
+    A circle that reaches a pole covers every longitude. Otherwise the
+    longitude half-width is the circle's exact extent, asin(sin r / cos lat).
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    min_lat = latitude - math.degrees(angular)
+    max_lat = latitude + math.degrees(angular)
+    if min_lat <= -90 or max_lat >= 90 or math.sin(angular) >= math.cos(math.radians(latitude)):
+        return [(-180.0, max(min_lat, -90.0), 180.0, min(max_lat, 90.0))]
+
+    lng_delta = math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(latitude))))
+    west, east = longitude - lng_delta, longitude + lng_delta
+    if west < -180:
+        return [(west + 360, min_lat, 180.0, max_lat), (-180.0, min_lat, east, max_lat)]
+    if east > 180:
+        return [(west, min_lat, 180.0, max_lat), (-180.0, min_lat, east - 360, max_lat)]
+    return [(west, min_lat, east, max_lat)]
+
+def parse_bbox(value: str) -> BBox:
+    """Parse 'min_lng,min_lat,max_lng,max_lat'"""
+    parts = [float(p) for p in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must have four comma-separated numbers")
+    min_lng, min_lat, max_lng, max_lat = parts
+    if min_lng > max_lng or min_lat > max_lat:
+        raise ValueError("bbox minimums must not exceed maximums")
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180 and -90 <= min_lat <= 90 and -90 <= max_lat <= 90):
+        raise ValueError("bbox is out of range")
+    return min_lng, min_lat, max_lng, max_lat
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def bbox_filter(model, bbox: BBox):
+    """SQL filter: geohash prefix ranges (indexed) refined by the exact box"""
+    min_lng, min_lat, max_lng, max_lat = bbox
+    cells = cover_bbox(bbox)
+    return and_(
+        or_(*[model.geohash.like(f"{cell}%") for cell in cells]),
+        model.latitude.between(min_lat, max_lat),
+        model.longitude.between(min_lng, max_lng),
+    )
+
+def distance_km_expr(model, latitude: float, longitude: float):
+    """SQL haversine distance from (latitude, longitude) to the model's coordinates"""
+    half_d_lat = func.radians(model.latitude - latitude) / 2
+    half_d_lng = func.radians(model.longitude - longitude) / 2
+    a = func.power(func.sin(half_d_lat), 2) + math.cos(math.radians(latitude)) * func.cos(
+        func.radians(model.latitude)
+    ) * func.power(func.sin(half_d_lng), 2)
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(a))
+
+def radius_filter(model, latitude: float, longitude: float, radius_km: float):
+    """SQL filter: within radius_km, narrowed by the indexed cells of the covering boxes"""
+    boxes = bboxes_around(latitude, longitude, radius_km)
+    return and_(
+        or_(*[bbox_filter(model, box) for box in boxes]),
+        distance_km_expr(model, latitude, longitude) <= radius_km
+    )
\ No newline at end of file
@@ -0,0 +1,146 @@
+import logging
+import mimetypes
+import multiprocessing
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+from app.core.cache import animal_detail_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import AnimalPhoto
+from app.models.animal import PhotoProcessingStatus
+from app.services.storage import get_storage, key_for_url
+
+# Longest edge in pixels; rendered from largest to smallest
+VARIANT_SIZES = {"large": 1600, "medium": 800, "thumb": 300}
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+logger = logging.getLogger(__name__)
+
+def render_variants(key: str) -> Dict[str, Dict]:
+    """Store every size as JPEG/PNG and WebP next to the source; runs in a worker process.
+
+    For JPEGs, draft() lets libjpeg decode at 1/2, 1/4 or 1/8 scale straight
+    away, so a 24 MP photo is never fully decoded just to make a 1600px copy.
+    Smaller sizes are then downscaled from the previous, already small, one.
+    """
+    storage = get_storage()
+    directory = key.rsplit("/", 1)[0] + "/" if "/" in key else ""
+    with storage.local_copy(key) as source, tempfile.TemporaryDirectory(prefix="variants-") as workdir:
+        variants = _render(source, Path(workdir))
+        for files in variants.values():
+            for value in files.values():
+                if isinstance(value, str):
+                    storage.save_file(directory + value, Path(workdir) / value, mimetypes.guess_type(value)[0])
+    return variants
+
+def _render(source: Path, workdir: Path) -> Dict[str, Dict]:
+    variants = {}
+    with Image.open(source) as original:
+        largest = max(VARIANT_SIZES.values())
+        if original.format == "JPEG":
+            original.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(original)
+
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+        fallback_format, fallback_ext = ("PNG", ".png") if has_alpha else ("JPEG", ".jpg")
+
+        for name, size in sorted(VARIANT_SIZES.items(), key=lambda item: -item[1]):
+            img.thumbnail((size, size), Image.LANCZOS)
+            stem = f"{source.stem}_{name}"
+            img.save(workdir / (stem + fallback_ext), fallback_format, quality=JPEG_QUALITY, optimize=True)
+            img.save(workdir / (stem + ".webp"), "WEBP", quality=WEBP_QUALITY, method=4)
+            variants[name] = {
+                "width": img.width,
+                "height": img.height,
+                fallback_format.lower(): stem + fallback_ext,
+                "webp": stem + ".webp",
+            }
+    return variants
+
+class ImagePipeline:
+    """Renders photo variants in a process pool after the upload has returned.
+
+    The photo row starts as pending; when the worker finishes, its variant
+    URLs and thumbnail_url are recorded and the status becomes ready. On
+    failure it becomes failed and thumbnail_url stays empty.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def submit(self, url: str) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            self.submitted += 1
+            future = self._executor.submit(render_variants, key_for_url(url))
+        future.add_done_callback(lambda done: self._record(url, done))
+        return future
+
+    def _record(self, url: str, future: Future):
+        """Apply the result to every photo of this content (deduplicated uploads share it)"""
+        error = future.exception()
+        db = SessionLocal()
+        try:
+            if error is None:
+                url_prefix = url.rsplit("/", 1)[0]
+                variants = {
+                    name: {key: (f"{url_prefix}/{value}" if isinstance(value, str) else value) for key, value in files.items()}
+                    for name, files in future.result().items()
+                }
+                thumb = variants["thumb"]
+                values = {
+                    "variants": variants,
+                    "thumbnail_url": thumb.get("jpeg") or thumb.get("png"),
+                    "processing_status": PhotoProcessingStatus.READY.value,
+                }
+            else:
+                logger.error("Image processing failed for %s", url, exc_info=error)
+                values = {"processing_status": PhotoProcessingStatus.FAILED.value}
+
+            animal_ids = {row[0] for row in db.query(AnimalPhoto.animal_id).filter(AnimalPhoto.url == url)}
+            db.query(AnimalPhoto).filter(AnimalPhoto.url == url).update(values, synchronize_session=False)
+            db.commit()
+            for animal_id in animal_ids:
+                animal_detail_cache.invalidate(animal_id)
+        finally:
+            db.close()
+
+        with self._lock:
+            if error is None:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "submitted": self.submitted,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "in_progress": self.submitted - self.succeeded - self.failed,
+            }
+
+image_pipeline = ImagePipeline(workers=settings.IMAGE_PIPELINE_WORKERS)
\ No newline at end of file
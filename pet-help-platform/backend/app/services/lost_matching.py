@@ -0,0 +1,437 @@
+import logging
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Animal
+from app.models.animal import AnimalSize, AnimalStatus, AnimalType
+from app.services import geo
+
+# Same weights as calculate_match_score, plus distance between the reports
+MATCH_WEIGHTS = {"type": 0.3, "breed": 0.25, "color": 0.2, "size": 0.15, "age": 0.1, "location": 0.2}
+# Blocking cell: ~39 x 20 km; probes also look in the cells around them
+GEO_BLOCK_PRECISION = 4
+# Keys shared by more rows than this (e.g. "dog, medium") are too unselective
+# to generate candidates on their own; they still count in the score.
+COMMON_KEY_ROWS = 50000
+
+TYPE_CODES = {t.value: code for code, t in enumerate(AnimalType, start=1)}
+SIZE_CODES = {s.value: code for code, s in enumerate(AnimalSize, start=1)}
+
+logger = logging.getLogger(__name__)
+
+# Column -> (dtype, fill for empty slots); owner -1 and NaN mean unknown
+COLUMNS = {
+    "ids": (np.int64, 0),
+    "owner_ids": (np.int64, -1),
+    "type": (np.int8, 0),
+    "size": (np.int8, 0),
+    "color": (np.uint64, 0),
+    "breed": (np.uint64, 0),
+    "age": (np.float32, np.nan),
+    "lat": (np.float64, np.nan),
+    "lng": (np.float64, np.nan),
+    "alive": (bool, False),
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+TOKEN_SYNONYMS = {
+    "grey": "gray",
+    "ginger": "orange",
+    "blonde": "cream",
+    "lab": "labrador",
+    "shepard": "shepherd",
+    "gsd": "shepherd",
+    "yorkie": "yorkshire",
+}
+STOP_TOKENS = {
+    "and", "with", "a", "the", "of", "light", "dark", "mix", "mixed", "cross", "x",
+    "breed", "unknown", "dog", "cat", "domestic",
+}
+
+RECORD_COLUMNS = (
+    Animal.id, Animal.type, Animal.breed, Animal.color, Animal.size, Animal.age,
+    Animal.latitude, Animal.longitude, Animal.owner_id
+)
+
+def _value(value) -> Optional[str]:
+    if value is None:
+        return None
+    return str(getattr(value, "value", value)).strip().lower() or None
+
+def normalize_tokens(text: Optional[str]) -> Set[str]:
+    """Lower-cased word tokens with synonyms folded and filler words dropped"""
+    if not text:
+        return set()
+    tokens = {TOKEN_SYNONYMS.get(token, token) for token in TOKEN_PATTERN.findall(text.lower())}
+    return tokens - STOP_TOKENS
+
+def token_mask(tokens: Iterable[str]) -> int:
+    """64-bit set signature: equal sets give equal masks, shared tokens shared bits"""
+    mask = 0
+    for token in tokens:
+        mask |= 1 << (zlib.crc32(token.encode()) % 64)
+    return mask
+
+# Bits set per byte value; np.bitwise_count needs NumPy 2
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    return POPCOUNT[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+def _probe_cells(latitude: Optional[float], longitude: Optional[float], radius_km: float) -> Set[str]:
+    if latitude is None or longitude is None:
+        return set()
+    cells = [cell for box in geo.bboxes_around(latitude, longitude, radius_km) for cell in geo.cover_bbox(box)]
+    return {cell[:GEO_BLOCK_PRECISION] for cell in cells if len(cell) >= GEO_BLOCK_PRECISION}
+
+def _haversine_km(lat1: float, lng1: float, lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(lng2 - lng1)
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * geo.EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+class _Encoded:
+    """A report reduced to the codes, masks and keys the index works with"""
+
+    def __init__(self, record: Dict[str, Any], radius_km: Optional[float] = None):
+        type_value = _value(record.get("type"))
+        self.type = type_value
+        self.type_code = TYPE_CODES.get(type_value, 0)
+        self.size_code = SIZE_CODES.get(_value(record.get("size")), 0)
+        self.color_tokens = normalize_tokens(record.get("color"))
+        self.breed_tokens = normalize_tokens(record.get("breed"))
+        self.color_mask = token_mask(self.color_tokens)
+        self.breed_mask = token_mask(self.breed_tokens)
+        age = record.get("age")
+        self.age = float(age) if age is not None else np.nan
+        latitude, longitude = record.get("latitude"), record.get("longitude")
+        located = latitude is not None and longitude is not None
+        self.latitude = float(latitude) if located else np.nan
+        self.longitude = float(longitude) if located else np.nan
+        if radius_km is None:
+            self.cells = {geo.encode_geohash(latitude, longitude, GEO_BLOCK_PRECISION)} if located else set()
+        else:
+            self.cells = _probe_cells(latitude, longitude, radius_km) if located else set()
+
+    def keys(self) -> List[str]:
+        t = self.type
+        keys = [f"{t}|s|{self.size_code}"] if self.size_code else []
+        keys += [f"{t}|c|{token}" for token in self.color_tokens]
+        keys += [f"{t}|b|{token}" for token in self.breed_tokens]
+        keys += [f"{t}|g|{cell}" for cell in self.cells]
+        return keys
+
+class LostPetIndex:
+    """In-memory blocking index and scorer for lost animals.
+
+    Rows are stored column-wise in NumPy arrays. Each blocking key (type
+    combined with size, a colour token, a breed token or a geohash cell) has
+    a posting list of row slots. A query pulls the union of its keys'
+    postings, ranks candidates by how many keys they share, scores up to
+    max_candidates of them in one vectorized pass and returns the top K.
+
+    Updates append a new slot and tombstone the old one; the periodic
+    rebuild from the database compacts everything.
+    """
+
+    def __init__(self, radius_km: float, max_candidates: int):
+        self.radius_km = radius_km
+        self.max_candidates = max_candidates
+        self._lock = threading.RLock()
+        self._fit_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._rebuild_requested = threading.Event()
+        self.built_at: Optional[float] = None
+        self.queries = 0
+        self._state = self._empty_state(1024)
+        # Changes made while a rebuild reads the database, replayed onto its result
+        self._replay: Optional[List] = None
+
+    @staticmethod
+    def _empty_state(capacity: int) -> dict:
+        state = {name: np.full(capacity, fill, dtype) for name, (dtype, fill) in COLUMNS.items()}
+        state.update(used=0, slot_of={}, postings=defaultdict(lambda: array("q")))
+        return state
+
+    @staticmethod
+    def _append(state: dict, record: Dict[str, Any], encoded: _Encoded):
+        slot = state["used"]
+        if slot == len(state["ids"]):
+            for name, (dtype, fill) in COLUMNS.items():
+                grown = np.full(2 * slot, fill, dtype)
+                grown[:slot] = state[name]
+                state[name] = grown
+
+        state["ids"][slot] = record["id"]
+        state["owner_ids"][slot] = record.get("owner_id") if record.get("owner_id") is not None else -1
+        state["type"][slot] = encoded.type_code
+        state["size"][slot] = encoded.size_code
+        state["color"][slot] = encoded.color_mask
+        state["breed"][slot] = encoded.breed_mask
+        state["age"][slot] = encoded.age
+        state["lat"][slot] = encoded.latitude
+        state["lng"][slot] = encoded.longitude
+        state["alive"][slot] = True
+        state["used"] = slot + 1
+
+        previous = state["slot_of"].get(record["id"])
+        if previous is not None:
+            state["alive"][previous] = False
+        state["slot_of"][record["id"]] = slot
+
+        postings = state["postings"]
+        for key in encoded.keys():
+            postings[key].append(slot)
+        postings[f"{encoded.type}|*"].append(slot)
+
+    def fit(self, records: Iterable[Dict[str, Any]]):
+        """Replace the index with these lost-animal records (dicts with Animal's field names)"""
+        with self._fit_lock:
+            with self._lock:
+                self._replay = []
+            try:
+                state = self._empty_state(1024)
+                for record in records:
+                    encoded = _Encoded(record)
+                    if encoded.type_code:
+                        self._append(state, record, encoded)
+            except BaseException:
+                with self._lock:
+                    self._replay = None
+                raise
+
+            with self._lock:
+                for record, encoded in self._replay:
+                    self._apply(state, record, encoded)
+                self._replay = None
+                self._state = state
+                self.built_at = time.time()
+
+    @classmethod
+    def _apply(cls, state: dict, record: Dict[str, Any], encoded: Optional[_Encoded]):
+        if encoded is not None:
+            cls._append(state, record, encoded)
+            return
+        slot = state["slot_of"].pop(record["id"], None)
+        if slot is not None:
+            state["alive"][slot] = False
+
+    def _change(self, record: Dict[str, Any], encoded: Optional[_Encoded]):
+        with self._lock:
+            self._apply(self._state, record, encoded)
+            if self._replay is not None:
+                self._replay.append((record, encoded))
+
+    def upsert(self, record: Dict[str, Any]):
+        encoded = _Encoded(record)
+        self._change(record, encoded if encoded.type_code else None)
+
+    def remove(self, animal_id: int):
+        self._change({"id": animal_id}, None)
+
+    def sync(self, animal: Animal):
+        """Reflect a committed Animal: indexed while lost, dropped otherwise"""
+        if _value(animal.status) == AnimalStatus.LOST.value:
+            self.upsert(animal_record(animal))
+        else:
+            self.remove(animal.id)
+
+    def _candidates(self, state: dict, probe: _Encoded) -> np.ndarray:
+        postings = state["postings"]
+        lists = [postings[key] for key in probe.keys() if key in postings]
+        selective = [p for p in lists if len(p) <= COMMON_KEY_ROWS]
+        if selective:
+            lists = selective
+        elif lists:
+            lists = [min(lists, key=len)]
+        else:
+            fallback = postings.get(f"{probe.type}|*")
+            lists = [fallback] if fallback else []
+        if not lists:
+            return np.empty(0, np.int64)
+
+        slots = np.concatenate([np.frombuffer(p, dtype=np.int64) for p in lists])
+        shared = np.bincount(slots)
+        candidates = np.flatnonzero(shared)
+        candidates = candidates[state["alive"][candidates]]
+        if len(candidates) > self.max_candidates:
+            # Keep the candidates sharing the most blocking keys
+            top = np.argpartition(-shared[candidates], self.max_candidates - 1)[:self.max_candidates]
+            candidates = candidates[top]
+        return candidates
+
+    def _score(self, state: dict, slots: np.ndarray, probe: _Encoded) -> np.ndarray:
+        """Weighted field agreement over the fields the found report has.
+
+        Unlike calculate_match_score, a field the lost report leaves empty
+        counts as a coin flip (0.5) instead of being dropped, so sparse
+        reports no longer outrank the complete one that really matches.
+        """
+        w = MATCH_WEIGHTS
+        numerator = np.full(len(slots), w["type"])
+        denominator = w["type"]
+
+        def add(field: str, similarity: np.ndarray, present: np.ndarray):
+            nonlocal numerator, denominator
+            numerator = numerator + w[field] * np.where(present, similarity, 0.5)
+            denominator += w[field]
+
+        for field, mask in (("breed", probe.breed_mask), ("color", probe.color_mask)):
+            if mask:
+                values = state[field][slots]
+                # Share of the finder's tokens found in the lost report: "labrador" fully matches "labrador retriever"
+                add(field, _popcount(values & np.uint64(mask)) / bin(mask).count("1"), values != 0)
+
+        if probe.size_code:
+            sizes = state["size"][slots]
+            add("size", (sizes == probe.size_code).astype(float), sizes != 0)
+
+        if not np.isnan(probe.age):
+            difference = np.abs(state["age"][slots] - probe.age)
+            add("age", np.where(difference <= 1, 1.0, np.where(difference <= 3, 0.5, 0.0)), ~np.isnan(difference))
+
+        if not np.isnan(probe.latitude):
+            latitudes, longitudes = state["lat"][slots], state["lng"][slots]
+            distance = _haversine_km(probe.latitude, probe.longitude, latitudes, longitudes)
+            add("location", np.clip(1 - distance / self.radius_km, 0.0, 1.0), ~np.isnan(latitudes))
+
+        return numerator / denominator
+
+    def match(
+        self,
+        animal_data: Dict[str, Any],
+        limit: int = 10,
+        min_score: float = 0.0,
+        exhaustive: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Top `limit` lost animals for a found-animal report, best first.
+
+        exhaustive=True scores every lost animal of the type instead of the
+        blocked candidates; it is the reference the benchmark measures against.
+        """
+        probe = _Encoded(animal_data, radius_km=self.radius_km)
+        if not probe.type_code:
+            return []
+
+        with self._lock:
+            state = self._state
+            if exhaustive:
+                used = state["used"]
+                slots = np.flatnonzero(state["alive"][:used] & (state["type"][:used] == probe.type_code))
+            else:
+                slots = self._candidates(state, probe)
+            if animal_data.get("id") is not None:
+                slots = slots[state["ids"][slots] != animal_data["id"]]
+            scores = self._score(state, slots, probe)
+            keep = scores >= min_score
+            slots, scores = slots[keep], scores[keep]
+            if len(slots) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                slots, scores = slots[top], scores[top]
+            order = np.lexsort((state["ids"][slots], -scores))
+            ids = state["ids"][slots[order]]
+            owners = state["owner_ids"][slots[order]]
+            self.queries += 1
+
+        return [
+            {"animal_id": int(animal_id), "match_score": round(float(score), 4), "owner_id": int(owner) if owner >= 0 else None}
+            for animal_id, score, owner in zip(ids, scores[order], owners)
+        ]
+
+    def rebuild_from_db(self):
+        db = SessionLocal()
+        try:
+            rows = db.query(*RECORD_COLUMNS).filter(Animal.status == AnimalStatus.LOST).execution_options(stream_results=True).yield_per(10000)
+            self.fit(row._asdict() for row in rows)
+        finally:
+            db.close()
+
+    def request_rebuild(self):
+        """Rebuild soon, e.g. after a bulk import added rows the hooks did not see"""
+        self._rebuild_requested.set()
+
+    def start(self, rebuild_interval_seconds: int):
+        """Run the rebuild now and then every rebuild_interval_seconds"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(rebuild_interval_seconds,), name="lost-pet-index", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._rebuild_requested.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, interval_seconds: int):
+        while not self._stop.is_set():
+            self._rebuild_requested.clear()
+            try:
+                self.rebuild_from_db()
+            except Exception:
+                logger.exception("Lost pet index rebuild failed")
+            self._rebuild_requested.wait(interval_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._state
+            return {
+                "lost_animals": len(state["slot_of"]),
+                "slots": state["used"],
+                "blocking_keys": len(state["postings"]),
+                "queries": self.queries,
+                "built_at": self.built_at,
+            }
+
+def animal_record(animal: Animal) -> Dict[str, Any]:
+    return {
+        "id": animal.id,
+        "type": animal.type,
+        "breed": animal.breed,
+        "color": animal.color,
+        "size": animal.size,
+        "age": animal.age,
+        "latitude": animal.latitude,
+        "longitude": animal.longitude,
+        "owner_id": animal.owner_id,
+    }
+lost_pet_index = LostPetIndex(
+    radius_km=settings.LOST_MATCH_RADIUS_KM,
+    max_candidates=settings.LOST_MATCH_MAX_CANDIDATES
+)
+
+def match_recent_lost(
+    db: Session, animal_data: Dict[str, Any], limit: int = 10, min_score: float = 0.0
+) -> List[Dict[str, Any]]:
+    """LostPetIndex.match over the newest LOST_MATCH_COLD_CANDIDATES lost reports of the type.
+
+    Serves matches while lost_pet_index is still being built, at the cost
+    of missing older reports.
+    """
+    type_value = _value(animal_data.get("type"))
+    if type_value not in TYPE_CODES:
+        return []
+    rows = db.query(*RECORD_COLUMNS).filter(
+        Animal.status == AnimalStatus.LOST, Animal.type == AnimalType(type_value)
+    ).order_by(Animal.created_at.desc()).limit(settings.LOST_MATCH_COLD_CANDIDATES)
+
+    index = LostPetIndex(radius_km=settings.LOST_MATCH_RADIUS_KM, max_candidates=settings.LOST_MATCH_COLD_CANDIDATES)
+    index.fit(row._asdict() for row in rows)
+    return index.match(animal_data, limit=limit, min_score=min_score, exhaustive=True)
\ No newline at end of file
@@ -0,0 +1,36 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.orm import Session
+
+from app.models import PointsLedgerEntry, User
+
+SWIPE_MATCH_POINTS = 5
+DONATION_POINTS_PER_UNIT = 10
+
+def points_entry(user_id: int, delta: int, reason: str, reference_id: Optional[int] = None) -> Dict:
+    return {"user_id": user_id, "delta": delta, "reason": reason, "reference_id": reference_id}
+
+def award_points(db: Session, entries: List[Dict]):
+    """Append ledger entries and apply them to users.points in the caller's transaction.
+
+    Balances are changed with SQL-side increments (points = points + :delta),
+    never read-modify-write, so concurrent awards cannot overwrite each other.
+    Users are updated in id order to keep lock ordering consistent.
+    """
+    entries = [entry for entry in entries if entry["delta"]]
+    if not entries:
+        return
+
+    db.execute(insert(PointsLedgerEntry.__table__), entries)
+
+    totals = defaultdict(int)
+    for entry in entries:
+        totals[entry["user_id"]] += entry["delta"]
+
+    users = User.__table__
+    db.execute(
+        update(users).where(users.c.id == bindparam("uid")).values(points=users.c.points + bindparam("delta")),
+        [{"uid": user_id, "delta": totals[user_id]} for user_id in sorted(totals)]
+    )
\ No newline at end of file
@@ -0,0 +1,152 @@
+import json
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import Animal, Swipe, User
+from app.models.animal import AnimalType, AnimalSize
+from app.services.geo import EARTH_RADIUS_KM
+
+TYPES = list(AnimalType)
+SIZES = list(AnimalSize)
+TYPE_INDEX = {t: i for i, t in enumerate(TYPES)}
+SIZE_INDEX = {s: i for i, s in enumerate(SIZES)}
+
+WEIGHTS = {
+    "type": 3.0,
+    "size": 1.5,
+    "age": 1.0,
+    "good_with_kids": 1.0,
+    "distance": 2.0,
+    "recency": 0.5,
+}
+AGE_SCALE_YEARS = 3.0
+DISTANCE_SCALE_KM = 25.0
+RECENCY_SCALE_DAYS = 30.0
+HISTORY_LIMIT = 200
+
+# Columns the ranker reads; feed refills select exactly these
+CANDIDATE_COLUMNS = (
+    Animal.id, Animal.type, Animal.size, Animal.age, Animal.good_with_kids,
+    Animal.latitude, Animal.longitude, Animal.created_at,
+)
+
+@dataclass
+class UserProfile:
+    type_affinity: np.ndarray = field(default_factory=lambda: np.full(len(TYPES), 0.5))
+    size_affinity: np.ndarray = field(default_factory=lambda: np.full(len(SIZES), 0.5))
+    preferred_age: Optional[float] = None
+    wants_good_with_kids: bool = False
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+def _parse_preferences(raw: Optional[str]) -> dict:
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _number(value) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def _affinity(counts: np.ndarray, preferred: Sequence[int]) -> np.ndarray:
+    """Blend swipe history with explicit preferences into a 0..1 score per category"""
+    affinity = np.full(len(counts), 0.5)
+    if counts.sum():
+        affinity = 0.25 + 0.75 * counts / counts.max()
+    if preferred:
+        affinity = affinity * 0.5
+        affinity[list(preferred)] += 0.5
+    return affinity
+
+def build_profile(db: Session, user: User) -> UserProfile:
+    """Profile from User.preferences (JSON) and the user's recent right swipes"""
+    preferences = _parse_preferences(user.preferences)
+
+    liked = db.query(Animal.type, Animal.size, Animal.age).join(
+        Swipe, Swipe.animal_id == Animal.id
+    ).filter(
+        Swipe.user_id == user.id,
+        Swipe.is_match == True
+    ).order_by(Swipe.created_at.desc()).limit(HISTORY_LIMIT).all()
+
+    type_counts = np.zeros(len(TYPES))
+    size_counts = np.zeros(len(SIZES))
+    ages = []
+    for animal_type, size, age in liked:
+        if animal_type in TYPE_INDEX:
+            type_counts[TYPE_INDEX[animal_type]] += 1
+        if size in SIZE_INDEX:
+            size_counts[SIZE_INDEX[size]] += 1
+        if age is not None:
+            ages.append(age)
+
+    preferred_types = [TYPE_INDEX[v] for v in preferences.get("types", []) if v in TYPE_INDEX]
+    preferred_sizes = [SIZE_INDEX[v] for v in preferences.get("sizes", []) if v in SIZE_INDEX]
+
+    preferred_age = preferences.get("age")
+    if preferred_age is None and ages:
+        preferred_age = float(np.median(ages))
+
+    return UserProfile(
+        type_affinity=_affinity(type_counts, preferred_types),
+        size_affinity=_affinity(size_counts, preferred_sizes),
+        preferred_age=_number(preferred_age),
+        wants_good_with_kids=bool(preferences.get("good_with_kids")),
+        latitude=_number(preferences.get("latitude")),
+        longitude=_number(preferences.get("longitude")),
+    )
+
+def score_candidates(candidates: Sequence, profile: UserProfile, now: Optional[datetime] = None) -> np.ndarray:
+    """Score rows shaped like CANDIDATE_COLUMNS in one vectorized pass"""
+    if not candidates:
+        return np.zeros(0)
+    now = now or datetime.utcnow()
+
+    # Column-wise conversion; NumPy turns None into NaN / NaT for us.
+    _, types, sizes, ages, kids, lats, lngs, created = zip(*candidates)
+    type_idx = np.array([TYPE_INDEX.get(t, -1) for t in types])
+    size_idx = np.array([SIZE_INDEX.get(s, -1) for s in sizes])
+    age = np.array(ages, dtype=float)
+    kid = np.array(kids, dtype=float)
+    lat = np.array(lats, dtype=float)
+    lng = np.array(lngs, dtype=float)
+    age_seconds = np.array([(now - c).total_seconds() if c else None for c in created], dtype=float)
+
+    score = WEIGHTS["type"] * np.where(type_idx >= 0, profile.type_affinity[type_idx], 0.5)
+    score += WEIGHTS["size"] * np.where(size_idx >= 0, profile.size_affinity[size_idx], 0.5)
+
+    if profile.preferred_age is not None:
+        age_score = np.exp(-np.abs(age - profile.preferred_age) / AGE_SCALE_YEARS)
+        score += WEIGHTS["age"] * np.nan_to_num(age_score, nan=0.5)
+
+    if profile.wants_good_with_kids:
+        score += WEIGHTS["good_with_kids"] * np.nan_to_num(kid, nan=0.5)
+
+    if profile.latitude is not None and profile.longitude is not None:
+        phi1 = np.radians(profile.latitude)
+        phi2 = np.radians(lat)
+        d_phi = phi2 - phi1
+        d_lambda = np.radians(lng - profile.longitude)
+        a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+        score += WEIGHTS["distance"] * np.nan_to_num(np.exp(-distance / DISTANCE_SCALE_KM), nan=0.0)
+
+    age_days = np.maximum(age_seconds, 0) / 86400.0
+    score += WEIGHTS["recency"] * np.nan_to_num(np.exp(-age_days / RECENCY_SCALE_DAYS), nan=0.0)
+
+    return score
+
+def rank_candidates(candidates: Sequence, profile: UserProfile) -> List[int]:
+    """Return candidate ids ordered best first"""
+    if not candidates:
+        return []
+    scores = score_candidates(candidates, profile)
+    order = np.argsort(-scores, kind="stable")
+    return [candidates[i][0] for i in order]
\ No newline at end of file
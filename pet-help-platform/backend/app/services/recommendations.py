@@ -0,0 +1,209 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.database import SessionLocal
+from app.models import Swipe
+
+NEIGHBORS_PER_ITEM = 50
+MAX_ITEMS_PER_USER = 100
+PROFILE_ITEMS = 50
+
+logger = logging.getLogger(__name__)
+
+class ItemSimilarityModel:
+    """Item-item collaborative filtering over positive swipes.
+
+    The user x animal matrix is kept sparse: each user's liked animal ids, and
+    per animal a Counter of co-liked animals (the non-zero entries of X^T X).
+    Cosine similarity is co(i, j) / sqrt(n_i * n_j). Neighbor lists are
+    precomputed per animal and recomputed lazily only for animals touched by
+    new swipes, so folding a swipe in is O(items the user liked).
+    """
+
+    def __init__(self, neighbors_per_item: int = NEIGHBORS_PER_ITEM, max_items_per_user: int = MAX_ITEMS_PER_USER):
+        self.neighbors_per_item = neighbors_per_item
+        self.max_items_per_user = max_items_per_user
+        self._user_items: Dict[int, List[int]] = {}
+        self._item_counts: Counter = Counter()
+        self._co_counts: Dict[int, Counter] = defaultdict(Counter)
+        self._neighbors: Dict[int, List[Tuple[int, float]]] = {}
+        self._dirty: Set[int] = set()
+        self._lock = threading.RLock()
+        self._fit_lock = threading.Lock()
+        # Swipes folded in while a rebuild reads the database, replayed onto its result
+        self._replay: Optional[List[Tuple[bool, int, int]]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.built_at: Optional[float] = None
+
+    def fit(self, interactions: Iterable[Tuple[int, int]]):
+        """Build from (user_id, animal_id) positives, oldest first"""
+        with self._fit_lock:
+            with self._lock:
+                self._replay = []
+            try:
+                user_items: Dict[int, List[int]] = defaultdict(list)
+                for user_id, animal_id in interactions:
+                    items = user_items[user_id]
+                    if animal_id not in items:
+                        items.append(animal_id)
+                for user_id, items in user_items.items():
+                    user_items[user_id] = items[-self.max_items_per_user:]
+
+                item_counts: Counter = Counter()
+                co_counts: Dict[int, Counter] = defaultdict(Counter)
+                for items in user_items.values():
+                    item_counts.update(items)
+                    for i in items:
+                        row = co_counts[i]
+                        row.update(items)
+                        row[i] -= 1
+
+                neighbors = {item: self._top_neighbors(item, co_counts[item], item_counts) for item in co_counts}
+            except BaseException:
+                with self._lock:
+                    self._replay = None
+                raise
+
+            with self._lock:
+                replay, self._replay = self._replay, None
+                self._user_items = dict(user_items)
+                self._item_counts = item_counts
+                self._co_counts = co_counts
+                self._neighbors = neighbors
+                self._dirty = set()
+                self.built_at = time.time()
+                # Adds and removes are idempotent, so ones the read already saw are harmless
+                for added, user_id, animal_id in replay:
+                    if added:
+                        self.add_positive(user_id, animal_id)
+                    else:
+                        self.remove_positive(user_id, animal_id)
+
+    def _top_neighbors(self, item: int, row: Counter, item_counts: Counter) -> List[Tuple[int, float]]:
+        others = [j for j, count in row.items() if count > 0 and j != item]
+        if not others:
+            return []
+        co = np.fromiter((row[j] for j in others), dtype=float, count=len(others))
+        counts = np.fromiter((item_counts[j] for j in others), dtype=float, count=len(others))
+        similarity = co / np.sqrt(item_counts[item] * counts)
+        k = min(self.neighbors_per_item, len(others))
+        top = np.argpartition(-similarity, k - 1)[:k]
+        top = top[np.argsort(-similarity[top], kind="stable")]
+        return [(others[i], float(similarity[i])) for i in top]
+
+    def add_positive(self, user_id: int, animal_id: int):
+        """Fold a new right swipe / super like into the model"""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((True, user_id, animal_id))
+            items = self._user_items.setdefault(user_id, [])
+            if animal_id in items:
+                return
+            if len(items) >= self.max_items_per_user:
+                self._remove_item(user_id, items[0])
+            for other in items:
+                self._co_counts[animal_id][other] += 1
+                self._co_counts[other][animal_id] += 1
+                self._dirty.add(other)
+            items.append(animal_id)
+            self._item_counts[animal_id] += 1
+            self._dirty.add(animal_id)
+
+    def remove_positive(self, user_id: int, animal_id: int):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((False, user_id, animal_id))
+            if animal_id in self._user_items.get(user_id, ()):
+                self._remove_item(user_id, animal_id)
+
+    def _remove_item(self, user_id: int, animal_id: int):
+        items = self._user_items[user_id]
+        items.remove(animal_id)
+        for other in items:
+            self._co_counts[animal_id][other] -= 1
+            self._co_counts[other][animal_id] -= 1
+            self._dirty.add(other)
+        self._item_counts[animal_id] -= 1
+        self._dirty.add(animal_id)
+
+    def neighbors(self, animal_id: int) -> List[Tuple[int, float]]:
+        with self._lock:
+            if animal_id in self._dirty:
+                self._neighbors[animal_id] = self._top_neighbors(
+                    animal_id, self._co_counts.get(animal_id, Counter()), self._item_counts
+                )
+                self._dirty.discard(animal_id)
+            return self._neighbors.get(animal_id, [])
+
+    def liked_items(self, user_id: int) -> List[int]:
+        with self._lock:
+            return list(self._user_items.get(user_id, ()))
+
+    def recommend(self, user_id: int, limit: int, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top animals by summed similarity to the user's recent likes"""
+        liked = self.liked_items(user_id)[-PROFILE_ITEMS:]
+        skip = set(exclude) | set(liked)
+        scores: Counter = Counter()
+        for item in liked:
+            for other, similarity in self.neighbors(item):
+                if other not in skip:
+                    scores[other] += similarity
+        return scores.most_common(limit)
+
+    def popular(self, limit: int, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        skip = set(exclude)
+        with self._lock:
+            ranked = self._item_counts.most_common(limit + len(skip))
+        return [(item, float(count)) for item, count in ranked if item not in skip and count > 0][:limit]
+
+    def rebuild_from_db(self):
+        db = SessionLocal()
+        try:
+            rows = db.query(Swipe.user_id, Swipe.animal_id).filter(
+                Swipe.is_match == True
+            ).order_by(Swipe.created_at).execution_options(stream_results=True).yield_per(10000)
+            self.fit((user_id, animal_id) for user_id, animal_id in rows)
+        finally:
+            db.close()
+
+    def start(self, rebuild_interval_seconds: int):
+        """Run the batch rebuild now and then every rebuild_interval_seconds"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(rebuild_interval_seconds,), name="recommender-rebuild", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, interval_seconds: int):
+        while not self._stop.is_set():
+            try:
+                self.rebuild_from_db()
+            except Exception:
+                logger.exception("Recommender rebuild failed")
+            self._stop.wait(interval_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._user_items),
+                "items": len(self._item_counts),
+                "dirty_items": len(self._dirty),
+                "built_at": self.built_at,
+            }
+
+recommender = ItemSimilarityModel()
\ No newline at end of file
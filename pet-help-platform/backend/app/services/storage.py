@@ -0,0 +1,219 @@
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import ContextManager, Iterable, Iterator, Optional
+
+from app.core.config import settings
+
+URL_PREFIX = "/uploads/"
+
+def key_for_url(url: str) -> str:
+    """Storage key of a stored media url: /uploads/animals/x.jpg -> animals/x.jpg"""
+    if not url.startswith(URL_PREFIX):
+        raise ValueError(f"Not a stored media url: {url}")
+    return url[len(URL_PREFIX):]
+
+def url_for_key(key: str) -> str:
+    return URL_PREFIX + key
+
+MISSING_CODES = ("404", "NoSuchKey", "NotFound")
+
+def s3_error_code(error) -> Optional[str]:
+    return error.response.get("Error", {}).get("Code")
+
+class StorageBackend(ABC):
+    """Where uploaded media lives. Keys are relative paths like animals/<sha256>.jpg.
+
+    Every method blocks on disk or network I/O; async code calls them in a thread.
+    """
+
+    @abstractmethod
+    def save_file(self, key: str, source_path: Path, content_type: Optional[str] = None):
+        """Store a local file under key, consuming source_path"""
+
+    @abstractmethod
+    def read_bytes(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def local_copy(self, key: str) -> ContextManager[Path]:
+        """A local path with the object's content, valid inside the with block"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]):
+        ...
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def save_file(self, key: str, source_path: Path, content_type: Optional[str] = None):
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source_path, path)
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.path(key).read_bytes()
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[Path]:
+        yield self.path(key)
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def delete_many(self, keys: Iterable[str]):
+        for key in keys:
+            try:
+                self.path(key).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+class S3Storage(StorageBackend):
+    """S3 or any S3-compatible service (MinIO, moto server) via S3_ENDPOINT_URL.
+
+    One client per process: boto3 clients are thread-safe and keep a pool of
+    up to max_pool_connections keep-alive connections. Files above the
+    multipart threshold are uploaded as parallel multipart chunks.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        max_pool_connections: int = 50,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024,
+        max_concurrency: int = 10,
+        key_prefix: str = ""
+    ):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.key_prefix = key_prefix
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            config=Config(max_pool_connections=max_pool_connections, retries={"mode": "standard"})
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+            use_threads=True
+        )
+
+    def _key(self, key: str) -> str:
+        return self.key_prefix + key
+
+    def save_file(self, key: str, source_path: Path, content_type: Optional[str] = None):
+        extra = {"ContentType": content_type} if content_type else None
+        self.client.upload_file(
+            str(source_path), self.bucket, self._key(key), ExtraArgs=extra, Config=self.transfer_config
+        )
+        os.remove(source_path)
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"].read()
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[Path]:
+        directory = tempfile.mkdtemp(prefix="storage-")
+        try:
+            path = Path(directory) / Path(key).name
+            self.client.download_file(self.bucket, self._key(key), str(path), Config=self.transfer_config)
+            yield path
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def head(self, key: str) -> Optional[dict]:
+        """HeadObject response, or None when the object does not exist"""
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if s3_error_code(e) in MISSING_CODES:
+                return None
+            raise
+
+    def get_object(self, key: str, byte_range: Optional[str] = None) -> Optional[dict]:
+        """GetObject response with a streaming Body, or None when the object does not exist.
+
+        An unsatisfiable byte_range raises ClientError with code InvalidRange.
+        """
+        from botocore.exceptions import ClientError
+
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if byte_range:
+            params["Range"] = byte_range
+        try:
+            return self.client.get_object(**params)
+        except ClientError as e:
+            if s3_error_code(e) in MISSING_CODES:
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self.head(key) is not None
+
+    def delete_many(self, keys: Iterable[str]):
+        objects = [{"Key": self._key(key)} for key in keys]
+        # DeleteObjects accepts at most 1000 keys per call
+        for start in range(0, len(objects), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": objects[start:start + 1000], "Quiet": True}
+            )
+
+def create_storage() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        if not settings.S3_BUCKET_NAME:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET_NAME")
+        return S3Storage(
+            bucket=settings.S3_BUCKET_NAME,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.AWS_REGION,
+            access_key=settings.AWS_ACCESS_KEY_ID,
+            secret_key=settings.AWS_SECRET_ACCESS_KEY,
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+            key_prefix=settings.S3_KEY_PREFIX
+        )
+    return LocalStorage(settings.UPLOAD_DIR)
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+def get_storage() -> StorageBackend:
+    """Process-wide backend, created on first use (worker processes build their own)"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+    return _storage
\ No newline at end of file
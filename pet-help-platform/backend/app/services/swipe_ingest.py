@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.core.cache import animal_detail_cache
+from app.core.config import settings
+from app.core.database import SessionLocal, insert_ignore_conflicts
+from app.models import Animal, Swipe
+from app.models.swipe import SwipeDirection
+from app.services.engagement import record_swipes
+from app.services.feed_service import feed_service
+from app.services.recommendations import recommender
+from app.services.points import award_points, points_entry, SWIPE_MATCH_POINTS
+
+MATCH_DIRECTIONS = (SwipeDirection.RIGHT, SwipeDirection.SUPER_LIKE)
+SWIPE_COLUMNS = ("user_id", "animal_id", "direction", "is_match")
+METRICS_WINDOW = 1000
+
+logger = logging.getLogger(__name__)
+
+def _percentile(values, fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class SwipeBuffer:
+    """Write-behind buffer for swipes.
+
+    Requests only append to an in-memory list. A flusher thread writes the
+    list every flush_interval_ms, or as soon as max_rows are waiting, as one
+    INSERT ... ON CONFLICT DO NOTHING. The unique (user_id, animal_id)
+    constraint drops duplicates, and only the rows that were actually
+    inserted earn points and engagement counts, in the same transaction.
+
+    A failed flush puts its rows back at the head of the queue (within
+    max_pending) and the next attempt waits with exponential backoff. Rows
+    still failing after max_attempts flushes are given up and counted.
+    """
+
+    def __init__(
+        self,
+        max_rows: int,
+        flush_interval_ms: int,
+        max_pending: int,
+        max_attempts: int,
+        max_backoff_ms: int
+    ):
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff_ms / 1000
+        self._pending: List[Dict] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.flushes = 0
+        self.rows_received = 0
+        self.rows_inserted = 0
+        self.rows_dropped = 0
+        self.rows_requeued = 0
+        self.rows_failed = 0
+        self.flush_errors = 0
+        self.consecutive_failures = 0
+        self._latencies_ms = deque(maxlen=METRICS_WINDOW)
+        self._batch_sizes = deque(maxlen=METRICS_WINDOW)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="swipe-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, user_id: int, animal_id: int, direction: SwipeDirection) -> bool:
+        """Queue a swipe; False when the buffer is full and the caller should back off"""
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                return False
+            self._pending.append({
+                "user_id": user_id,
+                "animal_id": animal_id,
+                "direction": direction,
+                "is_match": direction in MATCH_DIRECTIONS,
+                "attempts": 0,
+            })
+            self.rows_received += 1
+            if len(self._pending) >= self.max_rows:
+                self._cond.notify()
+        return True
+
+    def _backoff(self) -> float:
+        return min(self.flush_interval * 2 ** self.consecutive_failures, self.max_backoff)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                backing_off = self.consecutive_failures > 0
+                deadline = time.monotonic() + (self._backoff() if backing_off else self.flush_interval)
+                # A full buffer wakes the flusher early, unless the database is failing
+                while not self._stopping and (backing_off or len(self._pending) < self.max_rows):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                rows = self._pending[:self.max_rows]
+                del self._pending[:self.max_rows]
+
+            if rows:
+                self.flush(rows)
+            with self._cond:
+                if self._stopping and not self._pending:
+                    return
+
+    def flush(self, rows: List[Dict]) -> bool:
+        """Write one batch; on failure the rows are requeued and False is returned"""
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            # Unknown animals would fail the whole statement on the foreign key
+            existing = {row[0] for row in db.query(Animal.id).filter(
+                Animal.id.in_({row["animal_id"] for row in rows})
+            )}
+            valid = [row for row in rows if row["animal_id"] in existing]
+
+            inserted = []
+            if valid:
+                stmt = insert_ignore_conflicts(Swipe, ["user_id", "animal_id"]).returning(
+                    Swipe.id, Swipe.user_id, Swipe.animal_id, Swipe.is_match, Swipe.direction
+                )
+                inserted = db.execute(stmt, [{key: row[key] for key in SWIPE_COLUMNS} for row in valid]).all()
+
+            record_swipes(db, [(animal_id, direction) for _, _, animal_id, _, direction in inserted])
+            award_points(db, [
+                points_entry(user_id, SWIPE_MATCH_POINTS, "swipe_match", swipe_id)
+                for swipe_id, user_id, _, is_match, _ in inserted if is_match
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Swipe buffer flush of %d rows failed", len(rows))
+            self._requeue(rows)
+            return False
+        finally:
+            db.close()
+
+        for _, user_id, animal_id, is_match, _ in inserted:
+            animal_detail_cache.invalidate(animal_id)
+            feed_service.mark_swiped(user_id, animal_id)
+            if is_match:
+                recommender.add_positive(user_id, animal_id)
+
+        self.consecutive_failures = 0
+        self.flushes += 1
+        self.rows_inserted += len(inserted)
+        self.rows_dropped += len(rows) - len(inserted)
+        self._batch_sizes.append(len(rows))
+        self._latencies_ms.append((time.perf_counter() - started) * 1000)
+        return True
+
+    def _requeue(self, rows: List[Dict]):
+        retry = []
+        for row in rows:
+            row["attempts"] += 1
+            if row["attempts"] < self.max_attempts:
+                retry.append(row)
+
+        with self._cond:
+            self.flush_errors += 1
+            self.consecutive_failures += 1
+            # Rows already waiting keep their place; the failed batch goes first within the limit
+            retry = retry[:max(self.max_pending - len(self._pending), 0)]
+            self._pending[:0] = retry
+            self.rows_requeued += len(retry)
+            self.rows_failed += len(rows) - len(retry)
+
+        if len(retry) < len(rows):
+            logger.error("Swipe buffer gave up on %d rows after failed flushes", len(rows) - len(retry))
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        latencies = list(self._latencies_ms)
+        batch_sizes = list(self._batch_sizes)
+        return {
+            "running": self._thread is not None,
+            "pending": pending,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "consecutive_failures": self.consecutive_failures,
+            "rows_received": self.rows_received,
+            "rows_inserted": self.rows_inserted,
+            "rows_dropped": self.rows_dropped,
+            "rows_requeued": self.rows_requeued,
+            "rows_failed": self.rows_failed,
+            "flush_latency_ms": {
+                "p50": _percentile(latencies, 0.5),
+                "p99": _percentile(latencies, 0.99),
+                "max": max(latencies) if latencies else None,
+            },
+            "batch_size": {
+                "mean": sum(batch_sizes) / len(batch_sizes) if batch_sizes else None,
+                "max": max(batch_sizes) if batch_sizes else None,
+            },
+        }
+
+swipe_buffer = SwipeBuffer(
+    max_rows=settings.SWIPE_BUFFER_MAX_ROWS,
+    flush_interval_ms=settings.SWIPE_BUFFER_FLUSH_MS,
+    max_pending=settings.SWIPE_BUFFER_MAX_PENDING,
+    max_attempts=settings.SWIPE_BUFFER_MAX_ATTEMPTS,
+    max_backoff_ms=settings.SWIPE_BUFFER_MAX_BACKOFF_MS
+)
\ No newline at end of file
@@ -7,11 +7,31 @@ from app.core.config import settings
 from app.core.database import engine
 from app.models import Base
 from app.api.v1.api import api_router
+from app.api.v1.endpoints import media
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.security import password_hasher
+from app.services.analysis_queue import analysis_queue
+from app.services.image_pipeline import image_pipeline
+from app.services.lost_matching import lost_pet_index
+from app.services.recommendations import recommender
+from app.services.storage import URL_PREFIX
+from app.services.swipe_ingest import swipe_buffer
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    if settings.SWIPE_INGESTION_MODE == "buffered":
+        swipe_buffer.start()
+    recommender.start(settings.RECOMMENDER_REBUILD_SECONDS)
+    lost_pet_index.start(settings.LOST_PET_INDEX_REBUILD_SECONDS)
+    analysis_queue.start()
     yield
+    analysis_queue.stop()
+    swipe_buffer.stop()
+    recommender.stop()
+    lost_pet_index.stop()
+    password_hasher.shutdown()
+    image_pipeline.shutdown()
 
 app = FastAPI(
     title="Pet Help Platform API",
@@ -26,9 +46,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+# Stored media urls (/uploads/...) resolve through the storage backend
+app.include_router(media.router, prefix=URL_PREFIX.rstrip("/"), tags=["media"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,164 @@
+"""Recall and latency benchmark for lost/found matching on synthetic reports.
+
+Run from the backend directory:
+
+    python -m scripts.benchmark_lost_matching --lost-animals 1000000
+"""
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.animal import AnimalSize
+from app.services.ai_service import calculate_match_score
+from app.services.lost_matching import LostPetIndex
+
+SYNTHETIC_TYPES = {
+    "dog": (0.5, ["labrador retriever", "golden retriever", "german shepherd", "border collie", "jack russell terrier",
+                  "french bulldog", "beagle", "boxer", "siberian husky", "yorkshire terrier", "dachshund", "poodle",
+                  "rottweiler", "cocker spaniel", "staffordshire bull terrier", "shih tzu", "chihuahua", "pug",
+                  "great dane", "dobermann", "mixed"]),
+    "cat": (0.35, ["domestic shorthair", "domestic longhair", "maine coon", "siamese", "persian", "british shorthair",
+                   "ragdoll", "bengal", "sphynx", "norwegian forest"]),
+    "bird": (0.05, ["budgerigar", "cockatiel", "african grey parrot", "canary"]),
+    "rabbit": (0.05, ["holland lop", "dutch", "lionhead", "rex"]),
+    "other": (0.05, ["ferret", "guinea pig", "tortoise"]),
+}
+SYNTHETIC_COLORS = ["black", "white", "brown", "black and white", "grey", "golden", "cream", "ginger", "grey tabby",
+                    "brown and white", "tricolor", "brindle", "black and tan"]
+SYNTHETIC_SIZES = [s.value for s in AnimalSize]
+
+def synthetic_lost_animals(count: int, cities: int = 200, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Column-wise lost-animal reports spread around `cities` centres"""
+    rng = np.random.default_rng(seed)
+    types = list(SYNTHETIC_TYPES)
+    type_idx = rng.choice(len(types), size=count, p=[SYNTHETIC_TYPES[t][0] for t in types])
+    breed_idx = (rng.random(count) * np.array([len(SYNTHETIC_TYPES[t][1]) for t in types])[type_idx]).astype(np.int16)
+    centres = np.column_stack([rng.uniform(36, 60, cities), rng.uniform(-9, 30, cities)])
+    city = rng.integers(0, cities, size=count)
+    located = rng.random(count) > 0.05
+    return {
+        "id": np.arange(1, count + 1),
+        "type": type_idx.astype(np.int8),
+        "breed": np.where(rng.random(count) > 0.1, breed_idx, -1).astype(np.int16),
+        "color": np.where(rng.random(count) > 0.05, rng.integers(0, len(SYNTHETIC_COLORS), count), -1).astype(np.int16),
+        "size": np.where(rng.random(count) > 0.1, rng.integers(0, len(SYNTHETIC_SIZES), count), -1).astype(np.int8),
+        "age": np.where(rng.random(count) > 0.1, rng.integers(0, 16, count), -1).astype(np.int8),
+        "lat": np.where(located, centres[city, 0] + rng.normal(0, 0.15, count), np.nan),
+        "lng": np.where(located, centres[city, 1] + rng.normal(0, 0.2, count), np.nan),
+    }
+
+def synthetic_record(columns: Dict[str, np.ndarray], row: int) -> Dict[str, Any]:
+    type_value = list(SYNTHETIC_TYPES)[columns["type"][row]]
+    breed, color, size, age = (int(columns[name][row]) for name in ("breed", "color", "size", "age"))
+    lat, lng = float(columns["lat"][row]), float(columns["lng"][row])
+    return {
+        "id": int(columns["id"][row]),
+        "type": type_value,
+        "breed": SYNTHETIC_TYPES[type_value][1][breed] if breed >= 0 else None,
+        "color": SYNTHETIC_COLORS[color] if color >= 0 else None,
+        "size": SYNTHETIC_SIZES[size] if size >= 0 else None,
+        "age": age if age >= 0 else None,
+        "latitude": None if np.isnan(lat) else lat,
+        "longitude": None if np.isnan(lng) else lng,
+        "owner_id": int(columns["id"][row]) % 5000,
+    }
+
+def _found_report(lost: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    """How a finder might describe the same animal: partial breed, other spelling, rough place"""
+    report = {"type": lost["type"]}
+    if lost["breed"] and rng.random() < 0.8:
+        tokens = lost["breed"].split()
+        report["breed"] = lost["breed"] if rng.random() < 0.6 else tokens[int(rng.integers(len(tokens)))]
+    if lost["color"] and rng.random() < 0.8:
+        report["color"] = lost["color"].replace("grey", "gray") if rng.random() < 0.5 else lost["color"].split()[0]
+    if lost["size"] and rng.random() < 0.8:
+        report["size"] = lost["size"]
+    if lost["age"] is not None and rng.random() < 0.6:
+        report["age"] = max(0, lost["age"] + int(rng.integers(-1, 2)))
+    if lost["latitude"] is not None and rng.random() < 0.9:
+        report["latitude"] = lost["latitude"] + rng.normal(0, 0.03)
+        report["longitude"] = lost["longitude"] + rng.normal(0, 0.04)
+    return report
+
+def _legacy_match(columns: Dict[str, np.ndarray], report: Dict[str, Any]) -> List[int]:
+    """The previous query: type + ILIKE breed/colour + size filters, first 10 rows, score > 0.7"""
+    types = list(SYNTHETIC_TYPES)
+    type_code = types.index(report["type"])
+    mask = columns["type"] == type_code
+    if report.get("breed"):
+        # Padded to the longest breed list; other types are already filtered out
+        breeds = SYNTHETIC_TYPES[report["type"]][1]
+        vocab = np.zeros(max(len(b) for _, b in SYNTHETIC_TYPES.values()) + 1, dtype=bool)
+        vocab[:len(breeds)] = [report["breed"].lower() in b for b in breeds]
+        mask &= vocab[columns["breed"]]
+    if report.get("color"):
+        vocab = np.array([report["color"].lower() in c for c in SYNTHETIC_COLORS] + [False])
+        mask &= vocab[columns["color"]]
+    if report.get("size"):
+        mask &= columns["size"] == SYNTHETIC_SIZES.index(report["size"])
+
+    matches = []
+    for row in np.flatnonzero(mask)[:10]:
+        record = synthetic_record(columns, row)
+        if calculate_match_score(report, record) > 0.7:
+            matches.append(record["id"])
+    return matches
+
+def evaluate_matching(count: int, queries: int = 200, k: int = 10, seed: int = 0) -> dict:
+    """Plant a noisy found report for random lost animals; report recall@k and latency"""
+    columns = synthetic_lost_animals(count, seed=seed)
+    index = LostPetIndex(radius_km=settings.LOST_MATCH_RADIUS_KM, max_candidates=settings.LOST_MATCH_MAX_CANDIDATES)
+    started = time.perf_counter()
+    index.fit(synthetic_record(columns, row) for row in range(count))
+    build_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed + 1)
+    hits = {"blocked": 0, "exhaustive": 0, "legacy": 0}
+    same_top_k = 0
+    latencies = {"blocked": [], "exhaustive": [], "legacy": []}
+    for row in rng.choice(count, size=queries, replace=False):
+        lost = synthetic_record(columns, row)
+        report = _found_report(lost, rng)
+
+        results = {}
+        for mode in ("blocked", "exhaustive"):
+            started = time.perf_counter()
+            results[mode] = index.match(report, limit=k, exhaustive=mode == "exhaustive")
+            latencies[mode].append((time.perf_counter() - started) * 1000)
+            hits[mode] += lost["id"] in {m["animal_id"] for m in results[mode]}
+        same_top_k += [m["match_score"] for m in results["blocked"]] == [m["match_score"] for m in results["exhaustive"]]
+
+        started = time.perf_counter()
+        legacy = _legacy_match(columns, report)
+        latencies["legacy"].append((time.perf_counter() - started) * 1000)
+        hits["legacy"] += lost["id"] in legacy
+
+    def percentile(values: List[float], fraction: float) -> float:
+        return round(float(np.percentile(values, fraction * 100)), 2)
+
+    return {
+        "lost_animals": count,
+        "queries": queries,
+        "build_seconds": round(build_seconds, 2),
+        **{f"{mode}_recall@{k}": round(hits[mode] / queries, 3) for mode in hits},
+        "blocked_same_top_k_as_exhaustive": round(same_top_k / queries, 3),
+        **{f"{mode}_p50_ms": percentile(latencies[mode], 0.5) for mode in latencies},
+        **{f"{mode}_p95_ms": percentile(latencies[mode], 0.95) for mode in latencies},
+    }
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Recall and latency benchmark for lost/found matching")
+    parser.add_argument("--lost-animals", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps(evaluate_matching(args.lost_animals, args.queries, args.k), indent=2))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
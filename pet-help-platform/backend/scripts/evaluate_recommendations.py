@@ -0,0 +1,98 @@
+"""Offline evaluation and benchmark for swipe recommendations.
+
+Run from the backend directory:
+
+    python -m scripts.evaluate_recommendations --source synthetic --users 20000
+"""
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.database import SessionLocal
+from app.models import Swipe
+from app.services.recommendations import ItemSimilarityModel
+
+def evaluate_hit_rate(interactions: List[Tuple[int, int]], k: int = 10, seed: int = 0) -> dict:
+    """Leave-one-out evaluation: hold out each user's last like, report HitRate@k"""
+    by_user: Dict[int, List[int]] = defaultdict(list)
+    for user_id, animal_id in interactions:
+        by_user[user_id].append(animal_id)
+
+    train = []
+    held_out = {}
+    for user_id, items in by_user.items():
+        if len(items) < 2:
+            train.extend((user_id, item) for item in items)
+            continue
+        held_out[user_id] = items[-1]
+        train.extend((user_id, item) for item in items[:-1])
+
+    model = ItemSimilarityModel()
+    started = time.perf_counter()
+    model.fit(train)
+    fit_seconds = time.perf_counter() - started
+
+    rng = random.Random(seed)
+    users = list(held_out)
+    rng.shuffle(users)
+    hits = 0
+    popular_hits = 0
+    recommend_seconds = 0.0
+    for user_id in users:
+        started = time.perf_counter()
+        recommended = {item for item, _ in model.recommend(user_id, k)}
+        recommend_seconds += time.perf_counter() - started
+        hits += held_out[user_id] in recommended
+        popular = {item for item, _ in model.popular(k, exclude=model.liked_items(user_id))}
+        popular_hits += held_out[user_id] in popular
+
+    evaluated = max(len(users), 1)
+    return {
+        "users_evaluated": len(users),
+        f"hit_rate@{k}": hits / evaluated,
+        f"popularity_hit_rate@{k}": popular_hits / evaluated,
+        "fit_seconds": round(fit_seconds, 3),
+        "recommend_ms_per_user": round(recommend_seconds * 1000 / evaluated, 3),
+    }
+
+def synthetic_interactions(users: int, animals: int, likes_per_user: int, clusters: int = 20, seed: int = 0) -> List[Tuple[int, int]]:
+    """Users mostly like animals from one taste cluster, with some noise"""
+    rng = np.random.default_rng(seed)
+    cluster_of_animal = rng.integers(0, clusters, size=animals)
+    members = [np.flatnonzero(cluster_of_animal == c) for c in range(clusters)]
+    interactions = []
+    for user_id in range(users):
+        taste = members[rng.integers(0, clusters)]
+        in_cluster = rng.choice(taste, size=min(len(taste), int(likes_per_user * 0.8)), replace=False)
+        noise = rng.integers(0, animals, size=likes_per_user - len(in_cluster))
+        items = np.concatenate([in_cluster, noise])
+        rng.shuffle(items)
+        interactions.extend((user_id, int(item)) for item in items)
+    return interactions
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Offline evaluation and benchmark for swipe recommendations")
+    parser.add_argument("--source", choices=["synthetic", "db"], default="synthetic")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--animals", type=int, default=5000)
+    parser.add_argument("--likes-per-user", type=int, default=20)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.source == "db":
+        db = SessionLocal()
+        data = [tuple(row) for row in db.query(Swipe.user_id, Swipe.animal_id).filter(Swipe.is_match == True).order_by(Swipe.created_at)]
+        db.close()
+    else:
+        data = synthetic_interactions(args.users, args.animals, args.likes_per_user)
+
+    print(json.dumps({"interactions": len(data), **evaluate_hit_rate(data, k=args.k)}, indent=2))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
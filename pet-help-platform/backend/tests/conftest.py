@@ -0,0 +1,116 @@
+import os
+import tempfile
+from pathlib import Path
+
+# Settings and the engine are created at import time, so point them at a
+# throwaway SQLite database before anything from app/ is imported.
+TEST_DIR = tempfile.mkdtemp(prefix="pet-help-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(TEST_DIR, "uploads")
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+
+import pytest
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.cache import animal_detail_cache, current_user_cache, token_claims_cache
+from app.core.database import SessionLocal, engine
+from app.core.security import create_access_token
+from app.models import Animal, Base, User
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+CACHES = (animal_detail_cache, current_user_cache, token_claims_cache)
+
+@pytest.fixture(autouse=True)
+def tables():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    # The next test reuses the same ids for different rows
+    for cache in CACHES:
+        cache.clear()
+    # Pooled connections cache prepared PRAGMAs, which sqlite3 can replay
+    # without a result description once the schema changed, so that
+    # reflection in a later test sees no indexes
+    engine.dispose()
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def client():
+    from main import app
+
+    # Not used as a context manager: the lifespan's background workers stay off
+    return TestClient(app)
+
+@pytest.fixture
+def no_background_work(monkeypatch):
+    """Uploads skip variant rendering and the analysis queue wake-up"""
+    from app.services.analysis_queue import analysis_queue
+    from app.services.image_pipeline import image_pipeline
+
+    monkeypatch.setattr(image_pipeline, "submit", lambda url: None)
+    monkeypatch.setattr(analysis_queue, "notify", lambda: None)
+
+@pytest.fixture
+def fresh_feeds(monkeypatch):
+    """The feed service forgets queues left by earlier tests, whose users had the same ids"""
+    from collections import OrderedDict
+
+    from app.services.feed_service import feed_service
+
+    monkeypatch.setattr(feed_service, "_feeds", OrderedDict())
+
+@pytest.fixture
+def alembic_config():
+    # No ini file: env.py would otherwise reconfigure logging for the whole run
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    yield config
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+
+@pytest.fixture
+def query_counter():
+    """List that collects every SQL statement sent to the engine"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine, "before_cursor_execute", count)
+
+def make_user(db, username: str = "user", **fields) -> User:
+    user = User(email=f"{username}@example.com", username=username, hashed_password="x", **fields)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def make_animal(db, owner: User, **fields) -> Animal:
+    animal = Animal(**{"name": "Rex", "type": "dog", "status": "available", "owner_id": owner.id, **fields})
+    db.add(animal)
+    db.commit()
+    db.refresh(animal)
+    return animal
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+def upload_photo(client: TestClient, user: User, animal: Animal, content: bytes = b"not really a jpeg") -> dict:
+    response = client.post(
+        f"/api/v1/upload/animal/{animal.id}/photo",
+        files={"file": ("photo.jpg", content, "image/jpeg")},
+        headers=auth_headers(user)
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
\ No newline at end of file
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from app.models import AnalysisCacheEntry
+from app.services.analysis_cache import MAX_CANDIDATES, PerceptualAnalysisCache
+
+PHOTO = 0x0123456789ABCDEF
+
+def _cache() -> PerceptualAnalysisCache:
+    return PerceptualAnalysisCache(max_distance=3, ttl_seconds=3600, max_entries=10000)
+
+def _store_colliders(db, cache: PerceptualAnalysisCache, count: int):
+    # Same low band as PHOTO, but more than 40 bits away from it
+    for i in range(count):
+        cache.store(db, PHOTO ^ ((0xFFFFFFFFFFFF ^ i) << 16), {"breed": f"collider {i}"})
+
+def _age(db, value: int, minutes: int):
+    db.query(AnalysisCacheEntry).filter(AnalysisCacheEntry.analysis_data == {"breed": value}).update(
+        {"last_used_at": datetime.utcnow() - timedelta(minutes=minutes)}, synchronize_session=False
+    )
+
+def test_near_match_is_found_among_band_colliders(db):
+    cache = _cache()
+    cache.store(db, PHOTO ^ 0b101, {"breed": "beagle"})
+    _store_colliders(db, cache, 70)
+    db.commit()
+
+    assert cache.lookup(db, PHOTO) == {"breed": "beagle"}
+    assert cache.stats()["near_hits"] == 1
+
+def test_exact_match_is_found_beyond_the_candidate_cap(db):
+    cache = _cache()
+    _store_colliders(db, cache, MAX_CANDIDATES + 10)
+    cache.store(db, PHOTO, {"breed": "beagle"})
+    db.commit()
+    # Last by id and by recency: only the exact lookup reaches it
+    _age(db, "beagle", minutes=30)
+
+    assert cache.lookup(db, PHOTO) == {"breed": "beagle"}
+    assert cache.stats()["near_hits"] == 0
+
+def test_far_photos_miss(db):
+    cache = _cache()
+    _store_colliders(db, cache, 5)
+    db.commit()
+
+    assert cache.lookup(db, PHOTO) is None
+    assert cache.stats()["misses"] == 1
\ No newline at end of file
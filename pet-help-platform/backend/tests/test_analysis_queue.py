@@ -0,0 +1,174 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.models import AnalysisJob, Animal, AnimalPhoto
+from app.models.analysis_job import AnalysisJobStatus
+from app.services import analysis_queue as analysis_queue_module
+from app.services.ai_service import create_ai_client
+from app.services.analysis_queue import AnalysisQueue, enqueue_analysis
+from tests.conftest import make_animal, make_user
+
+ANALYSIS = {"species": "dog", "breed": "beagle", "age_range": "adult", "confidence_score": 0.9}
+
+class FakeModelServer:
+    """OpenAI-compatible /chat/completions answering with scripted (status, headers, body, delay) replies"""
+
+    def __init__(self):
+        self.replies = []
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                server.requests += 1
+                status, headers, body, delay = server.replies.pop(0)
+                time.sleep(delay)
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    payload = json.dumps(body).encode()
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    # The client already gave up (timeout case)
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def reply(self, status: int = 200, body=None, headers=None, delay: float = 0.0):
+        if body is None:
+            body = {"choices": [{"message": {"content": json.dumps(ANALYSIS)}}]}
+        self.replies.append((status, headers or {}, body, delay))
+
+@pytest.fixture
+def model_server(monkeypatch):
+    server = FakeModelServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", server.url)
+    monkeypatch.setattr(settings, "AI_ANALYSIS_TIMEOUT_SECONDS", 0.2)
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+@pytest.fixture
+def queue():
+    return AnalysisQueue(concurrency=1, poll_interval=0.1)
+
+@pytest.fixture
+def job(db):
+    owner = make_user(db)
+    animal = make_animal(db, owner)
+    # A remote url is passed to the model as is, so no stored file is needed
+    photo = AnimalPhoto(animal_id=animal.id, url="https://example.com/rex.jpg")
+    db.add(photo)
+    db.commit()
+    job = enqueue_analysis(db, photo)
+    db.commit()
+    return job
+
+def _run_once(queue: AnalysisQueue):
+    claimed = queue._claim()
+    assert claimed is not None
+
+    async def process():
+        async with create_ai_client(1) as client:
+            await queue._process(client, *claimed)
+
+    asyncio.run(process())
+
+def _reload(db, job) -> AnalysisJob:
+    db.expire_all()
+    return db.get(AnalysisJob, job.id)
+
+def test_success_records_the_analysis(db, queue, job, model_server):
+    model_server.reply()
+    _run_once(queue)
+
+    job = _reload(db, job)
+    assert job.status == AnalysisJobStatus.SUCCEEDED.value
+    assert job.analysis_id is not None
+    assert db.get(Animal, job.animal_id).breed == "beagle"
+
+def test_timeout_is_retried_with_backoff(db, queue, job, model_server):
+    model_server.reply(delay=1.0)
+    _run_once(queue)
+
+    job = _reload(db, job)
+    assert job.status == AnalysisJobStatus.QUEUED.value
+    assert job.attempts == 1
+    assert "Timeout" in job.last_error
+    assert job.run_after > datetime.utcnow()
+    assert queue._claim() is None
+    assert queue.retried == 1
+
+def test_rate_limit_waits_for_retry_after(db, queue, job, model_server):
+    model_server.reply(429, body={"error": "slow down"}, headers={"Retry-After": "600"})
+    _run_once(queue)
+
+    job = _reload(db, job)
+    assert job.status == AnalysisJobStatus.QUEUED.value
+    assert job.run_after >= datetime.utcnow() + timedelta(seconds=590)
+    assert "429" in job.last_error
+
+def test_permanent_error_is_dead_lettered(db, queue, job, model_server):
+    model_server.reply(400, body={"error": "bad image"})
+    _run_once(queue)
+
+    job = _reload(db, job)
+    assert job.status == AnalysisJobStatus.DEAD.value
+    assert job.attempts == 1
+    assert job.finished_at is not None
+    assert model_server.requests == 1
+    assert queue.dead == 1
+
+def test_failure_recording_the_result_is_retried(db, queue, job, model_server, monkeypatch):
+    def broken_record_analysis(db, animal_id, analysis_data):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(analysis_queue_module, "record_analysis", broken_record_analysis)
+    model_server.reply()
+    _run_once(queue)
+
+    job = _reload(db, job)
+    assert job.status == AnalysisJobStatus.QUEUED.value
+    assert job.analysis_id is None
+    assert "database went away" in job.last_error
+
+def test_lost_worker_is_reclaimed_until_attempts_run_out(db, queue, job):
+    lost_at = datetime.utcnow() - timedelta(seconds=settings.AI_ANALYSIS_VISIBILITY_SECONDS + 1)
+    job.status = AnalysisJobStatus.RUNNING.value
+    job.attempts = job.max_attempts - 1
+    job.locked_at = lost_at
+    db.commit()
+
+    claimed = queue._claim()
+    assert claimed is not None and claimed[3] == job.max_attempts
+
+    job = _reload(db, job)
+    job.locked_at = lost_at
+    db.commit()
+    assert queue._claim() is None
+
+    job = _reload(db, job)
+    assert job.status == AnalysisJobStatus.DEAD.value
+    assert job.attempts == job.max_attempts
+    assert job.finished_at is not None
+    assert queue.dead == 1
\ No newline at end of file
@@ -0,0 +1,29 @@
+from app.models import AnimalAnalysis, AnimalPhoto
+from tests.conftest import make_animal, make_user
+
+def _add_animals(db, owner, count: int):
+    for i in range(count):
+        animal = make_animal(db, owner, name=f"animal-{i}")
+        db.add_all([
+            AnimalPhoto(animal_id=animal.id, url=f"/uploads/{i}-a.jpg"),
+            AnimalPhoto(animal_id=animal.id, url=f"/uploads/{i}-b.jpg"),
+            AnimalAnalysis(animal_id=animal.id, ai_breed_detection="labrador"),
+        ])
+    db.commit()
+
+def _list_queries(client, query_counter, limit: int) -> int:
+    query_counter.clear()
+    response = client.get(f"/api/v1/animals/?limit={limit}")
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == limit
+    assert all(len(animal["photos"]) == 2 for animal in response.json())
+    return len(query_counter)
+
+def test_list_query_count_does_not_grow_with_page_size(client, db, query_counter):
+    _add_animals(db, make_user(db), 30)
+
+    small_page = _list_queries(client, query_counter, 3)
+    large_page = _list_queries(client, query_counter, 30)
+
+    # One query for the animals, one IN query each for photos and analyses
+    assert small_page == large_page == 3
\ No newline at end of file
@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.security import INLINE_MAX_PENDING, PasswordHasher
+from app.models import User
+
+@pytest.fixture
+def pooled_hasher():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    yield hasher
+    hasher.shutdown()
+
+def test_register_and_login_rehashes_outdated_cost(client, db):
+    response = client.post("/api/v1/auth/register", json={
+        "email": "pat@example.com", "username": "pat", "password": "correct horse"
+    })
+    assert response.status_code == 200, response.text
+    user = db.query(User).filter_by(username="pat").one()
+    assert user.hashed_password.startswith("$2b$04$")
+
+    user.hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("correct horse")
+    db.commit()
+
+    form = {"username": "pat@example.com", "password": "wrong password"}
+    assert client.post("/api/v1/auth/login", data=form).status_code == 401
+    form["password"] = "correct horse"
+    assert client.post("/api/v1/auth/login", data=form).status_code == 200
+    db.expire_all()
+    assert db.get(User, user.id).hashed_password.startswith("$2b$04$")
+
+def test_pool_work_does_not_block_the_event_loop(pooled_hasher):
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await pooled_hasher._run(time.sleep, 0.5)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 20
+
+def test_rejects_beyond_max_pending(pooled_hasher):
+    async def scenario():
+        running = [asyncio.create_task(pooled_hasher._run(time.sleep, 0.5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as rejected:
+            await pooled_hasher._run(time.sleep, 0)
+        await asyncio.gather(*running)
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 503 and rejected.headers["Retry-After"] == "1"
+    assert pooled_hasher.stats()["rejected"] == 1 and pooled_hasher.stats()["pending"] == 0
+
+def test_inline_hashing_stays_below_the_request_threadpool():
+    assert PasswordHasher(workers=0, max_pending=1000).max_pending == INLINE_MAX_PENDING
\ No newline at end of file
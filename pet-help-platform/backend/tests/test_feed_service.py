@@ -0,0 +1,120 @@
+import pytest
+
+from app.models import Animal, Swipe
+from app.services.feed_service import FeedService, feed_service
+from tests.conftest import auth_headers, make_animal, make_user
+
+@pytest.fixture
+def feed():
+    return FeedService(batch_size=3, pool_size=10, low_watermark=2, max_users=2)
+
+@pytest.fixture
+def people(db):
+    return make_user(db), make_user(db, "owner")
+
+def test_queue_is_cold_until_the_first_refill(db, feed, people):
+    user, owner = people
+    animals = [make_animal(db, owner, name=f"Dog {i}") for i in range(5)]
+    make_animal(db, user, name="Own dog")
+
+    assert feed.pop(user.id, 10) is None
+    assert feed.needs_refill(user.id)
+
+    feed.refill(user.id)
+
+    assert not feed.needs_refill(user.id)
+    assert feed.pop(user.id, 2) == [animals[4].id, animals[3].id]
+    assert feed.needs_refill(user.id)
+    assert feed.pop(user.id, 10) == [animals[2].id]
+    assert feed.pop(user.id, 10) == []
+
+def test_swiped_animals_are_never_served(db, feed, people):
+    user, owner = people
+    animals = [make_animal(db, owner, name=f"Dog {i}") for i in range(5)]
+    db.add(Swipe(user_id=user.id, animal_id=animals[4].id, direction="left"))
+    db.commit()
+
+    feed.refill(user.id)
+    feed.mark_swiped(user.id, animals[3].id)
+    served = feed.pop(user.id, 10)
+
+    assert served == [animals[2].id, animals[1].id]
+    feed.refill(user.id)
+    assert feed.pop(user.id, 10) == [animals[0].id]
+
+def test_refill_skips_queued_and_served_animals(db, feed, people):
+    user, owner = people
+    animals = [make_animal(db, owner, name=f"Dog {i}") for i in range(5)]
+
+    feed.refill(user.id)
+    feed.pop(user.id, 2)
+    feed.refill(user.id)
+
+    assert feed.pop(user.id, 10) == [animals[2].id, animals[1].id, animals[0].id]
+
+def test_unswiped_animals_return_once_everything_was_shown(db, feed, people):
+    user, owner = people
+    animals = [make_animal(db, owner, name=f"Dog {i}") for i in range(2)]
+
+    feed.refill(user.id)
+    assert feed.pop(user.id, 10) == [animals[1].id, animals[0].id]
+    feed.mark_swiped(user.id, animals[1].id)
+
+    feed.refill(user.id)
+    assert feed.pop(user.id, 10) == [animals[0].id]
+
+def test_exhausted_feed_picks_up_new_and_returning_animals(db, feed, people):
+    user, owner = people
+    adopted = make_animal(db, owner, name="Back", status="adopted")
+    first = make_animal(db, owner)
+
+    feed.refill(user.id)
+    assert feed.pop(user.id, 10) == [first.id]
+    feed.mark_swiped(user.id, first.id)
+    feed.refill(user.id)
+    assert feed.pop(user.id, 10) == []
+
+    db.get(Animal, adopted.id).status = "available"
+    newcomer = make_animal(db, owner, name="New")
+    feed.refill(user.id)
+
+    assert feed.pop(user.id, 10) == [newcomer.id, adopted.id]
+
+def test_forgotten_swipe_is_served_again(db, feed, people):
+    user, owner = people
+    animal = make_animal(db, owner)
+
+    feed.refill(user.id)
+    feed.mark_swiped(user.id, animal.id)
+    assert feed.pop(user.id, 10) == []
+
+    feed.forget_swipe(user.id, animal.id)
+    feed.refill(user.id)
+    assert feed.pop(user.id, 10) == [animal.id]
+
+def test_least_recent_users_are_evicted(db, feed, people):
+    user, owner = people
+    make_animal(db, owner)
+    others = [make_user(db, f"other{i}") for i in range(2)]
+
+    feed.refill(user.id)
+    for other in others:
+        feed.refill(other.id)
+
+    assert feed.pop(user.id, 10) is None
+    assert feed.pop(others[1].id, 10) is not None
+
+def test_endpoint_rechecks_queued_animals(client, db, people, fresh_feeds):
+    user, owner = people
+    animals = [make_animal(db, owner, name=f"Dog {i}") for i in range(4)]
+    feed_service.refill(user.id)
+
+    # Changes the queue does not know about: a swipe from another worker and an adoption
+    db.add(Swipe(user_id=user.id, animal_id=animals[3].id, direction="left"))
+    db.get(Animal, animals[2].id).status = "adopted"
+    db.commit()
+
+    response = client.get("/api/v1/animals/feed", params={"limit": 3}, headers=auth_headers(user))
+
+    assert response.status_code == 200, response.text
+    assert [a["id"] for a in response.json()] == [animals[1].id]
\ No newline at end of file
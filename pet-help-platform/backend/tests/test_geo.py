@@ -0,0 +1,112 @@
+import math
+
+import pytest
+
+from app.services import geo
+from tests.conftest import make_animal, make_user
+
+PARIS = (48.8566, 2.3522)
+LONDON = (51.5074, -0.1278)
+
+def _km_east(latitude: float, longitude: float, km: float) -> float:
+    longitude += math.degrees(km / (geo.EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+    return (longitude + 180) % 360 - 180
+
+def test_geohash_matches_the_reference_encoding():
+    assert geo.encode_geohash(57.64911, 10.40744) == "u4pruyd"
+    assert geo.geohash_for(None, 10.0) is None
+
+def test_haversine_distance():
+    assert geo.haversine_km(*PARIS, *LONDON) == pytest.approx(343.5, abs=1)
+    assert geo.haversine_km(0, 179.9, 0, -179.9) == pytest.approx(22.24, abs=0.05)
+
+@pytest.mark.parametrize("bbox", [
+    (2.2, 48.8, 2.5, 48.95),
+    (-0.5, 51.3, 0.3, 51.7),
+    (-10.0, 35.0, 30.0, 60.0),
+])
+def test_cover_cells_contain_every_point_of_the_box(bbox):
+    cells = geo.cover_bbox(bbox)
+    assert 0 < len(cells) <= geo.MAX_COVER_CELLS
+
+    min_lng, min_lat, max_lng, max_lat = bbox
+    for i in range(11):
+        for j in range(11):
+            lat = min_lat + (max_lat - min_lat) * i / 10
+            lng = min_lng + (max_lng - min_lng) * j / 10
+            point = geo.encode_geohash(lat, lng)
+            assert any(point.startswith(cell) for cell in cells), (lat, lng)
+
+def test_parse_bbox():
+    assert geo.parse_bbox("2.2,48.8,2.5,48.95") == (2.2, 48.8, 2.5, 48.95)
+    for value in ("1,2,3", "3,0,1,1", "0,0,200,1", "a,b,c,d"):
+        with pytest.raises(ValueError):
+            geo.parse_bbox(value)
+
+def test_boxes_split_at_the_antimeridian():
+    boxes = geo.bboxes_around(0.0, 179.95, 20)
+    assert len(boxes) == 2
+    assert all(-180 <= min_lng <= max_lng <= 180 for min_lng, _, max_lng, _ in boxes)
+
+    def covered(lat, lng):
+        return any(b[0] <= lng <= b[2] and b[1] <= lat <= b[3] for b in boxes)
+
+    assert covered(0.0, -179.9) and covered(0.0, 179.9)
+    assert not covered(0.0, -179.5)
+
+    assert geo.bboxes_around(89.95, 10.0, 20) == [(-180.0, pytest.approx(89.77, abs=0.01), 180.0, 90.0)]
+
+def test_box_contains_the_circle_at_high_latitude():
+    latitude, longitude, radius = 70.0, 20.0, 150.0
+    (min_lng, _, max_lng, _), = geo.bboxes_around(latitude, longitude, radius)
+    for bearing in range(0, 360, 5):
+        # Points on the circle, from the destination-point formula
+        d, theta = radius / geo.EARTH_RADIUS_KM, math.radians(bearing)
+        phi1, lambda1 = math.radians(latitude), math.radians(longitude)
+        phi2 = math.asin(math.sin(phi1) * math.cos(d) + math.cos(phi1) * math.sin(d) * math.cos(theta))
+        lambda2 = lambda1 + math.atan2(
+            math.sin(theta) * math.sin(d) * math.cos(phi1), math.cos(d) - math.sin(phi1) * math.sin(phi2)
+        )
+        assert min_lng - 1e-9 <= math.degrees(lambda2) <= max_lng + 1e-9
+
+def _near(db, owner, name: str, latitude: float, longitude: float):
+    return make_animal(
+        db, owner, name=name, latitude=latitude, longitude=longitude,
+        geohash=geo.encode_geohash(latitude, longitude)
+    )
+
+def test_radius_search_filters_and_orders_by_distance(client, db):
+    owner = make_user(db)
+    lat, lng = PARIS
+    near = _near(db, owner, "Near", lat, _km_east(lat, lng, 2))
+    nearest = _near(db, owner, "Nearest", lat, _km_east(lat, lng, 0.5))
+    far = _near(db, owner, "Far", lat, _km_east(lat, lng, 15))
+    _near(db, owner, "London", *LONDON)
+
+    response = client.get("/api/v1/animals/", params={"lat": lat, "lng": lng, "radius_km": 10, "sort": "distance"})
+    assert response.status_code == 200, response.text
+    assert [a["id"] for a in response.json()] == [nearest.id, near.id]
+    assert [a["distance_km"] for a in response.json()] == [pytest.approx(0.5, abs=0.01), pytest.approx(2, abs=0.01)]
+
+    response = client.get("/api/v1/animals/", params={"lat": lat, "lng": lng, "radius_km": 20})
+    assert {a["id"] for a in response.json()} == {nearest.id, near.id, far.id}
+
+    response = client.get("/api/v1/animals/", params={"lat": lat, "lng": lng, "sort": "distance", "cursor": "x"})
+    assert response.status_code == 400
+
+def test_radius_search_across_the_antimeridian(client, db):
+    owner = make_user(db)
+    west = _near(db, owner, "West", -17.0, -179.95)
+    east = _near(db, owner, "East", -17.0, 179.95)
+
+    response = client.get("/api/v1/animals/", params={"lat": -17.0, "lng": 179.98, "radius_km": 20, "sort": "distance"})
+    assert [a["id"] for a in response.json()] == [east.id, west.id]
+
+def test_bbox_search(client, db):
+    owner = make_user(db)
+    inside = _near(db, owner, "Inside", *PARIS)
+    _near(db, owner, "London", *LONDON)
+
+    response = client.get("/api/v1/animals/", params={"bbox": "2.2,48.8,2.5,48.95"})
+    assert [a["id"] for a in response.json()] == [inside.id]
+    assert client.get("/api/v1/animals/", params={"bbox": "2.5,48.8,2.2,48.95"}).status_code == 400
\ No newline at end of file
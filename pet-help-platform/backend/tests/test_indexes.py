@@ -0,0 +1,92 @@
+import importlib.util
+
+import sqlalchemy as sa
+from alembic import command
+from alembic.script import ScriptDirectory
+
+from app.core.database import engine
+from app.models import Base
+from tests.conftest import BACKEND_DIR, make_animal, make_user
+
+def _hot_filter_indexes():
+    path = BACKEND_DIR / "alembic" / "versions" / "0001_hot_filter_indexes.py"
+    spec = importlib.util.spec_from_file_location("hot_filter_indexes", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.INDEXES
+
+def _index_names(table: str) -> set:
+    return {index["name"] for index in sa.inspect(engine).get_indexes(table)}
+
+def test_models_declare_the_hot_filter_indexes():
+    for name, table, _ in _hot_filter_indexes():
+        assert name in _index_names(table), name
+
+def test_migration_adds_missing_indexes(alembic_config):
+    indexes = _hot_filter_indexes()
+    # A database created by create_all before the indexes were declared
+    with engine.begin() as conn:
+        for name, _, _ in indexes:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+        conn.exec_driver_sql("DROP INDEX ix_animals_geohash")
+
+    command.upgrade(alembic_config, "0001")
+
+    for name, table, columns in indexes:
+        assert name in _index_names(table), name
+        declared = {index["name"]: index["column_names"] for index in sa.inspect(engine).get_indexes(table)}
+        assert declared[name] == columns
+    assert "ix_animals_geohash" in _index_names("animals")
+
+def test_upgrade_builds_a_fresh_database(alembic_config):
+    Base.metadata.drop_all(bind=engine)
+
+    command.upgrade(alembic_config, "head")
+    # Pooled connections still cache the schema from before the upgrade
+    engine.dispose()
+
+    for name, table, _ in _hot_filter_indexes():
+        assert name in _index_names(table), name
+    with engine.connect() as conn:
+        version = conn.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+    assert version == ScriptDirectory.from_config(alembic_config).get_current_head()
+
+    # Already up to date: running it again changes nothing
+    command.upgrade(alembic_config, "head")
+
+def _plan_for(client, url: str, table: str) -> str:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sa.event.listen(engine, "before_cursor_execute", capture)
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = next((s, p) for s, p in statements if s.lstrip().startswith("SELECT") and f"FROM {table}" in s)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+def test_filtered_list_uses_status_type_index(client, db):
+    owner = make_user(db)
+    for i in range(20):
+        make_animal(db, owner, name=f"a{i}", type="cat" if i % 2 else "dog")
+
+    plan = _plan_for(client, "/api/v1/animals/?status=available&animal_type=dog&limit=5", "animals")
+
+    assert "USING INDEX ix_animals_status_type_created_at" in plan, plan
+    assert "USE TEMP B-TREE" not in plan, plan
+
+def test_unfiltered_list_uses_keyset_index(client, db):
+    owner = make_user(db)
+    for i in range(20):
+        make_animal(db, owner, name=f"a{i}")
+
+    plan = _plan_for(client, "/api/v1/animals/?limit=5", "animals")
+
+    assert "ix_animals_created_at_id" in plan, plan
+    assert "USE TEMP B-TREE" not in plan, plan
\ No newline at end of file
@@ -0,0 +1,48 @@
+import pytest
+
+from app.services.lost_matching import LostPetIndex, lost_pet_index, match_recent_lost
+from scripts.benchmark_lost_matching import evaluate_matching
+from tests.conftest import auth_headers, make_animal, make_user
+
+@pytest.fixture
+def cold_index(monkeypatch):
+    def no_rebuild():
+        raise AssertionError("requests must not build the index")
+
+    monkeypatch.setattr(lost_pet_index, "built_at", None)
+    monkeypatch.setattr(lost_pet_index, "rebuild_from_db", no_rebuild)
+
+@pytest.fixture
+def reports(db):
+    owner = make_user(db)
+    place = {"latitude": 48.85, "longitude": 2.35}
+    lost = make_animal(
+        db, owner, status="lost", breed="Labrador Retriever", color="Black", size="large", age=4, **place
+    )
+    make_animal(db, owner, name="Tom", type="cat", status="lost", color="Black", **place)
+    make_animal(db, owner, name="Max", status="lost", breed="Poodle", color="White", size="small", age=12)
+    found = make_animal(db, owner, name="Found", status="found", breed="labrador", color="black", size="large", **place)
+    return owner, lost, found
+
+def test_cold_index_matches_from_the_database(client, reports, cold_index):
+    owner, lost, found = reports
+
+    response = client.get(f"/api/v1/animals/{found.id}/lost-matches", headers=auth_headers(owner))
+
+    assert response.status_code == 200, response.text
+    assert [match["animal_id"] for match in response.json()] == [lost.id]
+
+def test_cold_fallback_scores_like_the_index(db, reports):
+    owner, lost, found = reports
+    index = LostPetIndex(radius_km=25, max_candidates=100)
+    index.rebuild_from_db()
+    report = {"type": "dog", "breed": "labrador", "color": "black", "latitude": 48.86, "longitude": 2.36}
+
+    assert match_recent_lost(db, report, limit=5) == index.match(report, limit=5, exhaustive=True)
+    assert match_recent_lost(db, {"type": "hamster"}) == []
+
+def test_blocked_matching_keeps_exhaustive_recall():
+    report = evaluate_matching(5000, queries=50, k=10)
+
+    assert report["blocked_recall@10"] >= report["exhaustive_recall@10"] - 0.05
+    assert report["blocked_recall@10"] > report["legacy_recall@10"]
\ No newline at end of file
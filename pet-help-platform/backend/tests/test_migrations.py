@@ -0,0 +1,75 @@
+import sqlalchemy as sa
+from alembic import command
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.core.database import engine
+from app.models import AnimalEngagement, PointsLedgerEntry, Swipe, User
+from app.models.swipe import SwipeDirection
+from tests.conftest import make_animal, make_user
+
+def _alter(callback):
+    with engine.begin() as conn:
+        callback(Operations(MigrationContext.configure(conn)))
+
+def _rerun(alembic_config, revision: str):
+    """Upgrade to revision as if the database had only reached the one before it"""
+    previous = f"{int(revision) - 1:04d}"
+    command.stamp(alembic_config, previous, purge=True)
+    command.upgrade(alembic_config, revision)
+
+def test_points_migration_backfills_balances(alembic_config, db):
+    # Tables created by create_all at startup before 0002 ran, with the old nullable column
+    def nullable_points(ops):
+        with ops.batch_alter_table("users") as batch:
+            batch.alter_column("points", existing_type=sa.Integer(), nullable=True, server_default=None)
+
+    _alter(nullable_points)
+    veteran = make_user(db, "veteran")
+    newcomer = make_user(db, "newcomer")
+    active = make_user(db, "active")
+    db.execute(sa.update(User).where(User.id == veteran.id).values(points=30))
+    db.execute(sa.update(User).where(User.id == newcomer.id).values(points=None))
+    # 20 points before the ledger existed, 5 awarded through the ledger since
+    db.execute(sa.update(User).where(User.id == active.id).values(points=25))
+    db.add(PointsLedgerEntry(user_id=active.id, delta=5, reason="swipe_match"))
+    db.commit()
+
+    _rerun(alembic_config, "0002")
+    _rerun(alembic_config, "0002")
+
+    db.expire_all()
+    assert db.get(User, newcomer.id).points == 0
+    assert not next(c for c in sa.inspect(engine).get_columns("users") if c["name"] == "points")["nullable"]
+    openings = dict(db.query(PointsLedgerEntry.user_id, PointsLedgerEntry.delta).filter(
+        PointsLedgerEntry.reason == "opening_balance"
+    ).all())
+    assert openings == {veteran.id: 30, active.id: 20}
+    for user in (veteran, newcomer, active):
+        total = db.query(sa.func.coalesce(sa.func.sum(PointsLedgerEntry.delta), 0)).filter(
+            PointsLedgerEntry.user_id == user.id
+        ).scalar()
+        assert total == db.get(User, user.id).points
+
+def test_engagement_migration_recounts_existing_table(alembic_config, db):
+    owner = make_user(db, "owner")
+    swipers = [make_user(db, f"swiper{i}") for i in range(3)]
+    liked, ignored, unswiped = (make_animal(db, owner, name=name) for name in ("liked", "ignored", "unswiped"))
+    directions = [SwipeDirection.RIGHT, SwipeDirection.SUPER_LIKE, SwipeDirection.LEFT]
+    for swiper, direction in zip(swipers, directions):
+        db.add(Swipe(user_id=swiper.id, animal_id=liked.id, direction=direction, is_match=direction != SwipeDirection.LEFT))
+    db.add(Swipe(user_id=swipers[0].id, animal_id=ignored.id, direction=SwipeDirection.LEFT, is_match=False))
+    # Counters the endpoints kept since create_all made the table: partial or stale
+    db.add(AnimalEngagement(animal_id=liked.id, likes=1, super_likes=0, passes=0, matches=1))
+    db.add(AnimalEngagement(animal_id=unswiped.id, likes=4, super_likes=0, passes=0, matches=4))
+    db.commit()
+
+    _rerun(alembic_config, "0003")
+    _rerun(alembic_config, "0003")
+
+    db.expire_all()
+    counters = {
+        row.animal_id: (row.likes, row.super_likes, row.passes, row.matches)
+        for row in db.query(AnimalEngagement)
+    }
+    assert counters == {liked.id: (1, 1, 1, 2), ignored.id: (0, 0, 1, 0), unswiped.id: (0, 0, 0, 0)}
\ No newline at end of file
@@ -0,0 +1,90 @@
+import json
+from datetime import datetime, timedelta
+
+from app.models import Swipe
+from app.models.animal import AnimalSize, AnimalType
+from app.services.feed_service import FeedService
+from app.services.ranking import UserProfile, build_profile, rank_candidates, score_candidates
+from tests.conftest import auth_headers, make_animal, make_user
+
+NOW = datetime(2024, 6, 1)
+
+def _row(animal_id, animal_type=AnimalType.DOG, size=AnimalSize.MEDIUM, age=None, good_with_kids=None,
+         latitude=None, longitude=None, created_at=NOW):
+    return (animal_id, animal_type, size, age, good_with_kids, latitude, longitude, created_at)
+
+def _profile(db, **preferences) -> UserProfile:
+    return build_profile(db, make_user(db, preferences=json.dumps(preferences)))
+
+def test_preferred_type_and_size_rank_first(db):
+    profile = _profile(db, types=["cat"], sizes=["small"])
+    rows = [
+        _row(1, AnimalType.DOG, AnimalSize.LARGE),
+        _row(2, AnimalType.CAT, AnimalSize.LARGE),
+        _row(3, AnimalType.DOG, AnimalSize.SMALL),
+        _row(4, AnimalType.CAT, AnimalSize.SMALL),
+    ]
+
+    assert rank_candidates(rows, profile) == [4, 2, 3, 1]
+
+def test_nearer_animal_beats_farther_one(db):
+    profile = _profile(db, latitude=48.85, longitude=2.35)
+    rows = [_row(1, latitude=48.85, longitude=2.75), _row(2, latitude=48.86, longitude=2.36), _row(3)]
+
+    scores = score_candidates(rows, profile, now=NOW)
+
+    assert scores[1] > scores[0] > scores[2]
+
+def test_newer_animal_and_closer_age_score_higher(db):
+    profile = _profile(db, age=2, good_with_kids=True)
+    rows = [
+        _row(1, age=2, good_with_kids=True, created_at=NOW - timedelta(days=60)),
+        _row(2, age=2, good_with_kids=True, created_at=NOW),
+        _row(3, age=9, good_with_kids=True, created_at=NOW),
+        _row(4, age=2, good_with_kids=False, created_at=NOW),
+        _row(5, age=None, good_with_kids=None, created_at=None),
+    ]
+
+    scores = score_candidates(rows, profile, now=NOW)
+
+    assert scores[1] > scores[0]
+    assert scores[1] > scores[2]
+    assert scores[1] > scores[3]
+    assert list(scores).count(max(scores)) == 1
+    assert score_candidates([], profile).size == 0
+
+def test_profile_learns_from_right_swipes(db):
+    user = make_user(db)
+    owner = make_user(db, "owner")
+    for _ in range(3):
+        cat = make_animal(db, owner, type="cat", size="small", age=1)
+        db.add(Swipe(user_id=user.id, animal_id=cat.id, direction="right", is_match=True))
+    db.commit()
+
+    rows = [_row(1, AnimalType.DOG, AnimalSize.LARGE, age=8), _row(2, AnimalType.CAT, AnimalSize.SMALL, age=1)]
+
+    assert rank_candidates(rows, build_profile(db, user)) == [2, 1]
+
+def test_cold_feed_page_is_ranked(client, db, fresh_feeds):
+    user = make_user(db, preferences=json.dumps({"types": ["cat"]}))
+    owner = make_user(db, "owner")
+    cat = make_animal(db, owner, name="Tom", type="cat")
+    for i in range(5):
+        make_animal(db, owner, name=f"Dog {i}")
+
+    response = client.get("/api/v1/animals/feed", params={"limit": 2}, headers=auth_headers(user))
+
+    assert response.status_code == 200, response.text
+    assert response.json()[0]["id"] == cat.id
+
+def test_refill_ranks_beyond_the_next_id_window(db):
+    user = make_user(db, preferences=json.dumps({"types": ["cat"]}))
+    owner = make_user(db, "owner")
+    cat = make_animal(db, owner, name="Tom", type="cat")
+    dogs = [make_animal(db, owner, name=f"Dog {i}") for i in range(6)]
+    feed = FeedService(batch_size=3, pool_size=10, low_watermark=1, max_users=10)
+
+    feed.refill(user.id)
+
+    # The oldest animal wins on type; the newest dogs win the tie on recency
+    assert feed.pop(user.id, 10) == [cat.id, dogs[-1].id, dogs[-2].id]
\ No newline at end of file
@@ -0,0 +1,39 @@
+from app.services.recommendations import ItemSimilarityModel
+from scripts.evaluate_recommendations import evaluate_hit_rate, synthetic_interactions
+
+def test_recommendations_beat_popularity_on_clustered_tastes():
+    interactions = synthetic_interactions(users=400, animals=300, likes_per_user=12, clusters=10)
+
+    report = evaluate_hit_rate(interactions, k=10)
+
+    assert report["users_evaluated"] == 400
+    assert report["hit_rate@10"] > 2 * report["popularity_hit_rate@10"]
+
+def test_recommend_excludes_liked_items():
+    model = ItemSimilarityModel()
+    model.fit([(1, 10), (1, 11), (2, 10), (2, 11), (2, 12), (3, 11), (3, 12)])
+
+    recommended = [item for item, _ in model.recommend(1, 5)]
+
+    assert recommended[0] == 12
+    assert not {10, 11} & set(recommended)
+
+def test_swipes_during_a_rebuild_survive_it():
+    model = ItemSimilarityModel()
+    model.fit([(1, 10), (1, 11)])
+
+    def read_from_db():
+        yield 1, 10
+        yield 1, 11
+        # Committed after the rebuild's query started, so it never sees these
+        model.add_positive(2, 10)
+        model.add_positive(2, 12)
+        model.remove_positive(1, 11)
+        yield 3, 12
+
+    model.fit(read_from_db())
+
+    assert model.liked_items(1) == [10]
+    assert model.liked_items(2) == [10, 12]
+    assert model.liked_items(3) == [12]
+    assert [item for item, _ in model.neighbors(12)] == [10]
\ No newline at end of file
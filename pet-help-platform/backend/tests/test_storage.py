@@ -0,0 +1,74 @@
+import asyncio
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.services import storage
+from app.services.storage import LocalStorage, S3Storage, StorageBackend
+from tests.conftest import make_animal, make_user, upload_photo
+
+BUCKET = "pet-help-media"
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN"):
+        monkeypatch.setenv(name, "testing")
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        # S3's smallest part size, so the 6 MB file goes up in two parts
+        yield S3Storage(
+            bucket=BUCKET,
+            region="us-east-1",
+            multipart_threshold=5 * 1024 * 1024,
+            multipart_chunksize=5 * 1024 * 1024,
+            key_prefix="media/"
+        )
+
+def test_s3_round_trip(s3_storage, tmp_path):
+    small, large = tmp_path / "small.jpg", tmp_path / "large.jpg"
+    small.write_bytes(b"small photo")
+    large.write_bytes(bytes(range(256)) * (24 * 1024))
+
+    s3_storage.save_file("animals/small.jpg", small, "image/jpeg")
+    s3_storage.save_file("animals/large.jpg", large, "image/jpeg")
+    assert not small.exists() and not large.exists()
+
+    assert s3_storage.exists("animals/small.jpg")
+    assert s3_storage.read_bytes("animals/small.jpg") == b"small photo"
+    assert s3_storage.head("animals/small.jpg")["ContentType"] == "image/jpeg"
+    assert s3_storage.get_object("animals/large.jpg", "bytes=256-259")["Body"].read() == bytes(range(4))
+    with s3_storage.local_copy("animals/large.jpg") as path:
+        assert path.stat().st_size == 256 * 24 * 1024
+    assert not path.exists()
+
+    s3_storage.delete_many(["animals/small.jpg", "animals/large.jpg", "animals/never-stored.jpg"])
+    assert not s3_storage.exists("animals/small.jpg")
+    assert s3_storage.get_object("animals/large.jpg") is None
+    assert s3_storage.client.list_objects_v2(Bucket=BUCKET).get("KeyCount") == 0
+
+def test_backends_must_implement_every_operation():
+    class Partial(StorageBackend):
+        def read_bytes(self, key):
+            return b""
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_upload_writes_storage_off_the_event_loop(client, db, monkeypatch, no_background_work):
+    calls = []
+    save_file = LocalStorage.save_file
+
+    def recording_save_file(self, key, source_path, content_type=None):
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append("thread")
+        save_file(self, key, source_path, content_type)
+
+    monkeypatch.setattr(LocalStorage, "save_file", recording_save_file)
+    owner = make_user(db)
+    upload_photo(client, owner, make_animal(db, owner))
+    assert calls == ["thread"]
+    assert isinstance(storage.get_storage(), LocalStorage)
\ No newline at end of file
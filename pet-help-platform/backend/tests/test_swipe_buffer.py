@@ -0,0 +1,85 @@
+from app.models import Swipe
+from app.models.swipe import SwipeDirection
+from app.services import swipe_ingest
+from app.services.swipe_ingest import SwipeBuffer
+from tests.conftest import make_animal, make_user
+
+def _buffer(**overrides) -> SwipeBuffer:
+    options = {"max_rows": 100, "flush_interval_ms": 10, "max_pending": 100, "max_attempts": 3, "max_backoff_ms": 100}
+    return SwipeBuffer(**{**options, **overrides})
+
+def _fail_flushes(monkeypatch, times: int):
+    calls = {"count": 0}
+    record_swipes = swipe_ingest.record_swipes
+
+    def flaky(db, swipes):
+        calls["count"] += 1
+        if calls["count"] <= times:
+            raise RuntimeError("database unavailable")
+        return record_swipes(db, swipes)
+
+    monkeypatch.setattr(swipe_ingest, "record_swipes", flaky)
+
+def _take(buffer: SwipeBuffer):
+    rows = buffer._pending[:]
+    buffer._pending.clear()
+    return rows
+
+def test_failed_flush_requeues_rows(db, monkeypatch):
+    user = make_user(db)
+    animals = [make_animal(db, user, name=f"a{i}") for i in range(3)]
+    buffer = _buffer()
+    for animal in animals:
+        assert buffer.submit(user.id, animal.id, SwipeDirection.RIGHT)
+    _fail_flushes(monkeypatch, times=1)
+
+    assert buffer.flush(_take(buffer)) is False
+    assert len(buffer._pending) == 3 and buffer.consecutive_failures == 1
+    assert db.query(Swipe).count() == 0
+
+    assert buffer.flush(_take(buffer)) is True
+    stats = buffer.stats()
+    assert db.query(Swipe).count() == 3
+    assert stats["rows_inserted"] == 3 and stats["rows_requeued"] == 3 and stats["rows_failed"] == 0
+    assert stats["consecutive_failures"] == 0
+
+def test_rows_are_given_up_after_max_attempts(db, monkeypatch):
+    user = make_user(db)
+    animal = make_animal(db, user)
+    buffer = _buffer(max_attempts=2)
+    buffer.submit(user.id, animal.id, SwipeDirection.LEFT)
+    _fail_flushes(monkeypatch, times=10)
+
+    buffer.flush(_take(buffer))
+    buffer.flush(_take(buffer))
+
+    assert buffer._pending == []
+    assert buffer.stats()["rows_failed"] == 1
+
+def test_requeue_is_bounded_by_max_pending(db, monkeypatch):
+    user = make_user(db)
+    animals = [make_animal(db, user, name=f"a{i}") for i in range(4)]
+    buffer = _buffer(max_pending=3)
+    for animal in animals[:2]:
+        buffer.submit(user.id, animal.id, SwipeDirection.RIGHT)
+    failed = _take(buffer)
+    for animal in animals[2:]:
+        buffer.submit(user.id, animal.id, SwipeDirection.RIGHT)
+    _fail_flushes(monkeypatch, times=1)
+
+    buffer.flush(failed)
+
+    assert [row["animal_id"] for row in buffer._pending] == [animals[0].id, animals[2].id, animals[3].id]
+    assert buffer.stats()["rows_failed"] == 1
+
+def test_flusher_thread_retries_with_backoff(db, monkeypatch):
+    user = make_user(db)
+    animal = make_animal(db, user)
+    buffer = _buffer()
+    _fail_flushes(monkeypatch, times=2)
+    buffer.start()
+    buffer.submit(user.id, animal.id, SwipeDirection.SUPER_LIKE)
+    buffer.stop()
+
+    assert db.query(Swipe).count() == 1
+    assert buffer.stats()["flush_errors"] == 2
\ No newline at end of file
@@ -0,0 +1,65 @@
+import sqlalchemy as sa
+
+from app.core.database import engine
+from app.models import AnimalEngagement, PointsLedgerEntry, Swipe
+from app.models.swipe import SwipeDirection
+from app.services.points import SWIPE_MATCH_POINTS
+from tests.conftest import auth_headers, make_animal, make_user
+
+def test_batch_retry_marks_stored_swipes_as_duplicates(client, db):
+    user = make_user(db)
+    owner = make_user(db, "owner")
+    first, second, third = [make_animal(db, owner, name=f"Dog {i}") for i in range(3)]
+    # Stored by the first attempt of a batch whose response never arrived
+    db.add(Swipe(user_id=user.id, animal_id=first.id, direction="right", is_match=True))
+    db.commit()
+
+    response = client.post("/api/v1/swipes/batch", headers=auth_headers(user), json=[
+        {"animal_id": first.id, "direction": "right"},
+        {"animal_id": second.id, "direction": "right"},
+        {"animal_id": second.id, "direction": "left"},
+        {"animal_id": third.id, "direction": "left"},
+        {"animal_id": 999, "direction": "left"},
+    ])
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["status"] for result in results] == ["duplicate", "created", "duplicate", "created", "not_found"]
+    assert results[1]["swipe"]["direction"] == "right" and results[1]["swipe"]["is_match"]
+    assert db.query(Swipe).filter(Swipe.user_id == user.id).count() == 3
+
+    # Counters and points only for the rows this request inserted
+    engagement = {row.animal_id: row for row in db.query(AnimalEngagement)}
+    assert first.id not in engagement
+    assert engagement[second.id].likes == 1 and engagement[third.id].passes == 1
+    ledger = db.query(PointsLedgerEntry).filter(PointsLedgerEntry.reason == "swipe_match").all()
+    assert [(entry.user_id, entry.delta) for entry in ledger] == [(user.id, SWIPE_MATCH_POINTS)]
+
+def test_batch_survives_a_concurrent_overlapping_retry(client, db):
+    user = make_user(db)
+    owner = make_user(db, "owner")
+    first, second = make_animal(db, owner, name="Rex"), make_animal(db, owner, name="Max")
+
+    raced = []
+
+    def overlapping_retry(conn, cursor, statement, parameters, context, executemany):
+        # The other attempt commits its swipe after this request looked for existing ones
+        if statement.startswith("INSERT INTO swipes") and not raced:
+            raced.append(True)
+            with engine.begin() as other:
+                other.execute(sa.insert(Swipe).values(
+                    user_id=user.id, animal_id=first.id, direction=SwipeDirection.RIGHT, is_match=True
+                ))
+
+    sa.event.listen(engine, "before_cursor_execute", overlapping_retry)
+    try:
+        response = client.post("/api/v1/swipes/batch", headers=auth_headers(user), json=[
+            {"animal_id": first.id, "direction": "right"},
+            {"animal_id": second.id, "direction": "right"},
+        ])
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", overlapping_retry)
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()] == ["duplicate", "created"]
+    assert db.query(PointsLedgerEntry).filter(PointsLedgerEntry.reason == "swipe_match").count() == 1
\ No newline at end of file
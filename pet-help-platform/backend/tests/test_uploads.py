@@ -0,0 +1,76 @@
+import pytest
+
+from app.core.config import settings
+from app.models import AnalysisJob, StoredFile
+from app.services import content_store
+from app.services.storage import get_storage, key_for_url
+from tests.conftest import auth_headers, make_animal, make_user, upload_photo
+
+pytestmark = pytest.mark.usefixtures("no_background_work")
+
+def _stored(db, url: str):
+    db.expire_all()
+    return db.query(StoredFile).filter(StoredFile.url == url).first()
+
+def test_repeat_upload_is_queued_until_analysis_is_cached(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    owner = make_user(db)
+    first = upload_photo(client, owner, make_animal(db, owner))
+    second = upload_photo(client, owner, make_animal(db, owner, name="Max"))
+
+    assert first["url"] == second["url"]
+    assert db.query(AnalysisJob.photo_id).order_by(AnalysisJob.id).all() == [(first["id"],), (second["id"],)]
+
+    content_store.remember_analysis(db, first["url"], {"breed": "beagle"})
+    db.commit()
+    upload_photo(client, owner, make_animal(db, owner, name="Bo"))
+    assert db.query(AnalysisJob).count() == 2
+
+def test_shared_file_is_deleted_with_the_last_animal(client, db):
+    owner = make_user(db)
+    first, second = make_animal(db, owner), make_animal(db, owner, name="Max")
+    url = upload_photo(client, owner, first)["url"]
+    upload_photo(client, owner, second)
+    key = key_for_url(url)
+
+    assert client.delete(f"/api/v1/animals/{first.id}", headers=auth_headers(owner)).status_code == 200
+    assert _stored(db, url).ref_count == 1
+    assert get_storage().exists(key)
+
+    assert client.delete(f"/api/v1/animals/{second.id}", headers=auth_headers(owner)).status_code == 200
+    assert _stored(db, url) is None
+    assert not get_storage().exists(key)
+
+def test_rolled_back_release_keeps_the_file(client, db):
+    owner = make_user(db)
+    photo = upload_photo(client, owner, make_animal(db, owner))
+
+    released = content_store.release(db, photo["url"])
+    assert released is not None
+    db.rollback()
+
+    assert _stored(db, photo["url"]).ref_count == 1
+    assert get_storage().exists(key_for_url(photo["url"]))
+
+def test_upload_between_release_and_purge_keeps_the_file(client, db):
+    owner = make_user(db)
+    animal = make_animal(db, owner)
+    photo = upload_photo(client, owner, animal)
+
+    released = content_store.release(db, photo["url"])
+    db.commit()
+    again = upload_photo(client, owner, animal)
+    content_store.purge([released])
+
+    assert again["url"] == photo["url"]
+    assert _stored(db, photo["url"]).ref_count == 1
+    assert get_storage().exists(key_for_url(photo["url"]))
+
+def test_photo_delete_removes_the_file(client, db):
+    owner = make_user(db)
+    photo = upload_photo(client, owner, make_animal(db, owner))
+
+    response = client.delete(f"/api/v1/upload/animal/photo/{photo['id']}", headers=auth_headers(owner))
+    assert response.status_code == 200, response.text
+    assert _stored(db, photo["url"]) is None
+    assert not get_storage().exists(key_for_url(photo["url"]))
\ No newline at end of file